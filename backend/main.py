@@ -1,29 +1,56 @@
+from contextlib import asynccontextmanager
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from src.domain.changes.interfaces.http.route import router as changes_router
 from src.domain.identity.interfaces.http.route import router as identity_router
 from src.domain.workspaces.interfaces.http.route import router as workspace_router
+from src.domain.workspaces.interfaces.http.task_route import router as task_router
+from src.infrastructure.container import app_container, close_container
+from src.infrastructure.http.batch import router as batch_router
 from src.infrastructure.http.exception_handler import register_error_handlers
+from src.infrastructure.http.live import router as live_router
+from src.infrastructure.http.metrics import router as metrics_router
+from src.infrastructure.http.request_log import RequestLogMiddleware
+from src.infrastructure.observability.logger import configure_logging
 import dotenv
 import os
 
 dotenv.load_dotenv(".env")
+configure_logging()
 
 
 
 api_v1 = APIRouter(prefix="/api/v1")
 api_v1.include_router(identity_router)
 api_v1.include_router(workspace_router)
+api_v1.include_router(task_router)
+api_v1.include_router(batch_router)
+api_v1.include_router(live_router)
+api_v1.include_router(changes_router)
 
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # build the container before the first request instead of during it
+    container = app_container()
+    container.outbox.start()
+    container.task_counters.start()
+    yield
+    close_container()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Expires-In", "Idempotent-Replayed"],
 )
+app.add_middleware(RequestLogMiddleware)
 app.include_router(api_v1)
+app.include_router(metrics_router)
 
 register_error_handlers(app)
\ No newline at end of file
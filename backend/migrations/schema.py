@@ -1,7 +1,22 @@
-from sqlalchemy import Column, ForeignKey, Integer, DateTime, String, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    ForeignKey,
+    Integer,
+    DateTime,
+    Float,
+    LargeBinary,
+    Sequence,
+    String,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import schema
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 
 Base = declarative_base()
@@ -11,6 +26,8 @@ class Authentication(Base):
     __tablename__ = "authentication"
 
     token = Column(String, primary_key=True, nullable=False)
+    # null when refresh tokens do not expire, pruned by the token housekeeping job
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
 
 class Tenant(Base):
@@ -19,6 +36,17 @@ class Tenant(Base):
     tenant_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
 
+    # maintained by the tenant_count_rows trigger, so list totals never scan
+    workspace_count = Column(Integer, nullable=False, server_default="0")
+    account_count = Column(Integer, nullable=False, server_default="0")
+    # the last change_log seq of the tenant pruned, a feed cursor before it has gaps
+    change_log_horizon = Column(BigInteger, nullable=False, server_default="0")
+    # tasks due before this count as overdue in the task counters, moved up by
+    # TaskCounterUsecase.advance_overdue
+    overdue_horizon = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
 
 class Account(Base):
     __tablename__ = "account"
@@ -31,6 +59,30 @@ class Account(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
 
+    __table_args__ = (
+        schema.Index("account_tenant_id_account_id_idx", "tenant_id", "account_id"),
+        schema.Index(
+            "account_tenant_id_full_name_idx", "tenant_id", "full_name", "account_id"
+        ),
+        schema.Index("account_tenant_id_username_idx", "tenant_id", "username"),
+        # the assignee picker's typeahead, see trigram_match; tenant_id (through
+        # btree_gin) keeps the bitmap to the tenant's rows
+        schema.Index(
+            "account_tenant_id_full_name_trgm_idx",
+            "tenant_id",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        schema.Index(
+            "account_tenant_id_username_trgm_idx",
+            "tenant_id",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
+
 
 class Workspaces(Base):
     __tablename__ = "workspace"
@@ -46,11 +98,32 @@ class Workspaces(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("account.account_id"), nullable=False)
     updated_by = Column(Integer, ForeignKey("account.account_id"), nullable=True)
+    # the sums of its groups' counters, see task_count_rows
+    task_count = Column(Integer, nullable=False, server_default="0")
+    assigned_task_count = Column(Integer, nullable=False, server_default="0")
+    overdue_task_count = Column(Integer, nullable=False, server_default="0")
 
     groups = relationship("Group", backref="workspace", cascade="all, delete-orphan")
 
     __table_args__ = (
         schema.UniqueConstraint("tenant_id", "name", name="uq_workspace_tenant_name"),
+        schema.Index(
+            "workspace_tenant_id_workspace_id_idx", "tenant_id", "workspace_id"
+        ),
+        schema.Index(
+            "workspace_tenant_id_created_at_idx",
+            "tenant_id",
+            "created_at",
+            "workspace_id",
+        ),
+        # the workspace switcher's typeahead, see trigram_match
+        schema.Index(
+            "workspace_tenant_id_name_trgm_idx",
+            "tenant_id",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -69,6 +142,10 @@ class Group(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("account.account_id"), nullable=False)
     updated_by = Column(Integer, ForeignKey("account.account_id"), nullable=True)
+    # maintained by the task_count_rows trigger, so boards and lists never count
+    task_count = Column(Integer, nullable=False, server_default="0")
+    assigned_task_count = Column(Integer, nullable=False, server_default="0")
+    overdue_task_count = Column(Integer, nullable=False, server_default="0")
 
     tasks = relationship("Task", backref="group", cascade="all, delete-orphan")
 
@@ -78,6 +155,14 @@ class Group(Base):
     )
 
 
+# the 'simple' configuration neither stems nor drops stop words, so a word
+# being typed matches as a prefix of the words stored
+TASK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
 class Task(Base):
     __tablename__ = "task"
 
@@ -87,6 +172,8 @@ class Task(Base):
     group_id = Column(Integer, ForeignKey("group.group_id"), nullable=False)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
+    # fractional index key, compared bytewise, see src/infrastructure/database/position.py
+    position = Column(String(collation="C"), nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     assigned_to_user_id = Column(
         Integer, ForeignKey("account.account_id"), nullable=True
@@ -101,5 +188,314 @@ class Task(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("account.account_id"), nullable=False)
     updated_by = Column(Integer, ForeignKey("account.account_id"), nullable=True)
+    # kept by postgres, only task search reads it
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(TASK_SEARCH_VECTOR, persisted=True))
+    )
 
-    __table_args__ = (schema.Index("task_group_id_idx", "group_id"),)
+    __table_args__ = (
+        # the board and keyset pagination of a group's tasks walk this index in order
+        schema.Index("task_group_id_position_idx", "group_id", "position", "task_id"),
+        # task lists across workspaces walk these from a (due_date, task_id) cursor
+        schema.Index(
+            "task_tenant_id_assigned_to_user_id_due_date_idx",
+            "tenant_id",
+            "assigned_to_user_id",
+            "due_date",
+            "task_id",
+        ),
+        schema.Index("task_tenant_id_due_date_idx", "tenant_id", "due_date", "task_id"),
+        schema.Index(
+            "task_search_vector_idx", "search_vector", postgresql_using="gin"
+        ),
+    )
+
+
+class AuditEvent(Base):
+    __tablename__ = "audit_event"
+
+    audit_id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(Integer, ForeignKey("tenant.tenant_id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("account.account_id"), nullable=True)
+    action = Column(String, nullable=False)
+    request_id = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        schema.Index("audit_event_tenant_id_created_at_idx", "tenant_id", "created_at"),
+    )
+
+
+class LoginThrottleState(Base):
+    """token bucket and recent failures per login key, shared by every worker.
+
+    Unlogged: losing it on a crash only resets the limits.
+    """
+
+    __tablename__ = "login_throttle"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    failures = Column(
+        ARRAY(DateTime(timezone=True)), nullable=False, server_default="{}"
+    )
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+
+class IdempotencyKey(Base):
+    """the response to a request sent with an Idempotency-Key, replayed on retries.
+
+    Keys are the client's own, so they are scoped per user. status_code is
+    NULL while the first attempt is still running.
+    """
+
+    __tablename__ = "idempotency_key"
+
+    tenant_id = Column(Integer, ForeignKey("tenant.tenant_id"), primary_key=True)
+    account_id = Column(Integer, ForeignKey("account.account_id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class Outbox(Base):
+    """change events written in the transaction of the change, see OutboxDispatcher.
+
+    delivered_at is NULL until the dispatcher has handed the row to its
+    handlers, delivered rows are pruned after a while.
+    """
+
+    __tablename__ = "outbox"
+
+    outbox_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tenant_id = Column(Integer, ForeignKey("tenant.tenant_id"), nullable=False)
+    # no foreign keys below, an event outlives what it is about
+    workspace_id = Column(Integer, nullable=False)
+    aggregate = Column(String(32), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # the dispatcher claims the oldest undelivered rows, the prune the oldest delivered
+        schema.Index(
+            "outbox_pending_idx",
+            "outbox_id",
+            postgresql_where=delivered_at.is_(None),
+        ),
+        schema.Index(
+            "outbox_delivered_at_idx",
+            "delivered_at",
+            postgresql_where=delivered_at.isnot(None),
+        ),
+    )
+
+
+class ChangeLog(Base):
+    """the tenant's changes in the order the change feed serves them, append only.
+
+    Appended from the outbox by a single writer at a time, so seq grows in
+    commit order and a reader never sees a seq appear behind one it read.
+    """
+
+    __tablename__ = "change_log"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    tenant_id = Column(Integer, ForeignKey("tenant.tenant_id"), nullable=False)
+    workspace_id = Column(Integer, nullable=False)
+    aggregate = Column(String(32), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    type = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    # when the change was made, recorded_at when it was appended
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    recorded_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        # the feed walks a tenant's changes by seq
+        schema.Index("change_log_tenant_id_seq_idx", "tenant_id", "seq"),
+    )
+
+
+# ids of the board change events sent with NOTIFY, see notify_board
+board_event_id_seq = Sequence("board_event_id_seq", metadata=Base.metadata)
+
+
+TENANT_COUNT_ROWS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tenant_count_rows() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE 'UPDATE tenant SET ' || quote_ident(TG_ARGV[0]) || ' = '
+            || quote_ident(TG_ARGV[0]) || ' + 1 WHERE tenant_id = $1'
+        USING NEW.tenant_id;
+    ELSE
+        EXECUTE 'UPDATE tenant SET ' || quote_ident(TG_ARGV[0]) || ' = '
+            || quote_ident(TG_ARGV[0]) || ' - 1 WHERE tenant_id = $1'
+        USING OLD.tenant_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+# Keeps the task counters of groups and workspaces, once per statement over the
+# rows it changed, so an import or a bulk move costs one update per group. It
+# holds its tenant's overdue_horizon still and locks the workspace before its
+# groups, in the order advance_overdue and reconcile take them too.
+TASK_COUNT_ROWS_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_count_rows() RETURNS trigger AS $$
+DECLARE
+    tenant_ids integer[];
+    group_ids integer[];
+    due_dates timestamptz[];
+    assignees integer[];
+    signs integer[];
+BEGIN
+    -- the changed rows as arrays, so what follows is static and its plans cached
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+            array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(1)
+        INTO tenant_ids, group_ids, due_dates, assignees, signs
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+            array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(-1)
+        INTO tenant_ids, group_ids, due_dates, assignees, signs
+        FROM old_rows;
+    ELSE
+        -- most updates are titles and positions
+        IF NOT EXISTS (
+            SELECT 1 FROM old_rows o JOIN new_rows n USING (task_id)
+            WHERE o.group_id IS DISTINCT FROM n.group_id
+                OR o.due_date IS DISTINCT FROM n.due_date
+                OR (o.assigned_to_user_id IS NULL) <> (n.assigned_to_user_id IS NULL)
+        ) THEN
+            RETURN NULL;
+        END IF;
+        SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+            array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(sign)
+        INTO tenant_ids, group_ids, due_dates, assignees, signs
+        FROM (
+            SELECT tenant_id, group_id, due_date, assigned_to_user_id, -1 AS sign FROM old_rows
+            UNION ALL
+            SELECT tenant_id, group_id, due_date, assigned_to_user_id, 1 FROM new_rows
+        ) d;
+    END IF;
+    IF group_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM 1 FROM tenant WHERE tenant_id = ANY(tenant_ids)
+        ORDER BY tenant_id FOR KEY SHARE;
+    PERFORM 1 FROM workspace WHERE workspace_id IN (
+        SELECT workspace_id FROM "group" WHERE group_id = ANY(group_ids)
+    ) ORDER BY workspace_id FOR NO KEY UPDATE;
+    WITH by_group AS (
+        SELECT d.group_id,
+            sum(d.sign) AS tasks,
+            sum(d.sign * d.assigned) AS assigned,
+            coalesce(sum(d.sign) FILTER (WHERE d.due_date < t.overdue_horizon), 0) AS overdue
+        FROM unnest(tenant_ids, group_ids, due_dates, assignees, signs)
+            AS d(tenant_id, group_id, due_date, assigned, sign)
+        JOIN tenant t USING (tenant_id)
+        GROUP BY d.group_id
+    ), changed AS (
+        UPDATE "group" g SET
+            task_count = g.task_count + c.tasks,
+            assigned_task_count = g.assigned_task_count + c.assigned,
+            overdue_task_count = g.overdue_task_count + c.overdue
+        FROM by_group c
+        WHERE g.group_id = c.group_id AND (c.tasks, c.assigned, c.overdue) <> (0, 0, 0)
+        RETURNING g.workspace_id, c.tasks, c.assigned, c.overdue
+    )
+    UPDATE workspace w SET
+        task_count = w.task_count + s.tasks,
+        assigned_task_count = w.assigned_task_count + s.assigned,
+        overdue_task_count = w.overdue_task_count + s.overdue
+    FROM (
+        SELECT workspace_id,
+            sum(tasks) AS tasks, sum(assigned) AS assigned, sum(overdue) AS overdue
+        FROM changed GROUP BY workspace_id
+    ) s
+    WHERE w.workspace_id = s.workspace_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# statement level triggers with transition tables take one event each
+TASK_COUNT_TRIGGERS = [
+    "CREATE TRIGGER task_count_insert AFTER INSERT ON task "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()",
+    "CREATE TRIGGER task_count_update AFTER UPDATE ON task "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()",
+    "CREATE TRIGGER task_count_delete AFTER DELETE ON task "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()",
+]
+
+
+def tenant_count_trigger(table: str, counter: str) -> str:
+    return (
+        f"CREATE TRIGGER {table}_tenant_count AFTER INSERT OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION tenant_count_rows('{counter}')"
+    )
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gin").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Tenant.__table__,
+    "after_create",
+    DDL(TENANT_COUNT_ROWS_FUNCTION).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Account.__table__,
+    "after_create",
+    DDL(tenant_count_trigger("account", "account_count")).execute_if(
+        dialect="postgresql"
+    ),
+)
+event.listen(
+    Workspaces.__table__,
+    "after_create",
+    DDL(tenant_count_trigger("workspace", "workspace_count")).execute_if(
+        dialect="postgresql"
+    ),
+)
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL(TASK_COUNT_ROWS_FUNCTION).execute_if(dialect="postgresql"),
+)
+for trigger in TASK_COUNT_TRIGGERS:
+    event.listen(
+        Task.__table__, "after_create", DDL(trigger).execute_if(dialect="postgresql")
+    )
@@ -0,0 +1,28 @@
+"""task group keyset index
+
+Revision ID: 3f9c2a7d41b8
+Revises: 9665a6499a00
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, None] = '9665a6499a00'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('task_group_id_task_id_idx', 'task', ['group_id', 'task_id'], unique=False)
+    op.drop_index('task_group_id_idx', table_name='task')
+
+
+def downgrade() -> None:
+    op.create_index('task_group_id_idx', 'task', ['group_id'], unique=False)
+    op.drop_index('task_group_id_task_id_idx', table_name='task')
@@ -0,0 +1,28 @@
+"""task due date indexes
+
+Revision ID: a4c8e2f6b913
+Revises: f1b7c3d9a624
+Create Date: 2026-10-20 00:04:27.381906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b913'
+down_revision: Union[str, None] = 'f1b7c3d9a624'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('task_tenant_id_assigned_to_user_id_due_date_idx', 'task', ['tenant_id', 'assigned_to_user_id', 'due_date', 'task_id'], unique=False)
+    op.create_index('task_tenant_id_due_date_idx', 'task', ['tenant_id', 'due_date', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('task_tenant_id_due_date_idx', table_name='task')
+    op.drop_index('task_tenant_id_assigned_to_user_id_due_date_idx', table_name='task')
@@ -0,0 +1,26 @@
+"""board event id seq
+
+Revision ID: a6d3e8f2c914
+Revises: f1c8a2d5b367
+Create Date: 2026-10-19 19:02:11.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3e8f2c914'
+down_revision: Union[str, None] = 'f1c8a2d5b367'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('board_event_id_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('board_event_id_seq')))
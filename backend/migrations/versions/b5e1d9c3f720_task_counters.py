@@ -0,0 +1,153 @@
+"""task counters
+
+Revision ID: b5e1d9c3f720
+Revises: a4c8e2f6b913
+Create Date: 2026-10-20 01:12:44.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1d9c3f720'
+down_revision: Union[str, None] = 'a4c8e2f6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tenant', sa.Column('overdue_horizon', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    for table in ('workspace', 'group'):
+        op.add_column(table, sa.Column('task_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('assigned_task_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('overdue_task_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE "group" g SET
+            task_count = c.tasks,
+            assigned_task_count = c.assigned,
+            overdue_task_count = c.overdue
+        FROM (
+            SELECT task.group_id,
+                count(*) AS tasks,
+                count(*) FILTER (WHERE task.assigned_to_user_id IS NOT NULL) AS assigned,
+                count(*) FILTER (WHERE task.due_date < tenant.overdue_horizon) AS overdue
+            FROM task JOIN tenant USING (tenant_id)
+            GROUP BY task.group_id
+        ) c
+        WHERE g.group_id = c.group_id
+    """)
+    op.execute("""
+        UPDATE workspace w SET
+            task_count = c.tasks,
+            assigned_task_count = c.assigned,
+            overdue_task_count = c.overdue
+        FROM (
+            SELECT workspace_id,
+                sum(task_count) AS tasks,
+                sum(assigned_task_count) AS assigned,
+                sum(overdue_task_count) AS overdue
+            FROM "group" GROUP BY workspace_id
+        ) c
+        WHERE w.workspace_id = c.workspace_id
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION task_count_rows() RETURNS trigger AS $$
+        DECLARE
+            tenant_ids integer[];
+            group_ids integer[];
+            due_dates timestamptz[];
+            assignees integer[];
+            signs integer[];
+        BEGIN
+            -- the changed rows as arrays, so what follows is static and its plans cached
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+                    array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(1)
+                INTO tenant_ids, group_ids, due_dates, assignees, signs
+                FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+                    array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(-1)
+                INTO tenant_ids, group_ids, due_dates, assignees, signs
+                FROM old_rows;
+            ELSE
+                -- most updates are titles and positions
+                IF NOT EXISTS (
+                    SELECT 1 FROM old_rows o JOIN new_rows n USING (task_id)
+                    WHERE o.group_id IS DISTINCT FROM n.group_id
+                        OR o.due_date IS DISTINCT FROM n.due_date
+                        OR (o.assigned_to_user_id IS NULL) <> (n.assigned_to_user_id IS NULL)
+                ) THEN
+                    RETURN NULL;
+                END IF;
+                SELECT array_agg(tenant_id), array_agg(group_id), array_agg(due_date),
+                    array_agg((assigned_to_user_id IS NOT NULL)::integer), array_agg(sign)
+                INTO tenant_ids, group_ids, due_dates, assignees, signs
+                FROM (
+                    SELECT tenant_id, group_id, due_date, assigned_to_user_id, -1 AS sign FROM old_rows
+                    UNION ALL
+                    SELECT tenant_id, group_id, due_date, assigned_to_user_id, 1 FROM new_rows
+                ) d;
+            END IF;
+            IF group_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            PERFORM 1 FROM tenant WHERE tenant_id = ANY(tenant_ids)
+                ORDER BY tenant_id FOR KEY SHARE;
+            PERFORM 1 FROM workspace WHERE workspace_id IN (
+                SELECT workspace_id FROM "group" WHERE group_id = ANY(group_ids)
+            ) ORDER BY workspace_id FOR NO KEY UPDATE;
+            WITH by_group AS (
+                SELECT d.group_id,
+                    sum(d.sign) AS tasks,
+                    sum(d.sign * d.assigned) AS assigned,
+                    coalesce(sum(d.sign) FILTER (WHERE d.due_date < t.overdue_horizon), 0) AS overdue
+                FROM unnest(tenant_ids, group_ids, due_dates, assignees, signs)
+                    AS d(tenant_id, group_id, due_date, assigned, sign)
+                JOIN tenant t USING (tenant_id)
+                GROUP BY d.group_id
+            ), changed AS (
+                UPDATE "group" g SET
+                    task_count = g.task_count + c.tasks,
+                    assigned_task_count = g.assigned_task_count + c.assigned,
+                    overdue_task_count = g.overdue_task_count + c.overdue
+                FROM by_group c
+                WHERE g.group_id = c.group_id AND (c.tasks, c.assigned, c.overdue) <> (0, 0, 0)
+                RETURNING g.workspace_id, c.tasks, c.assigned, c.overdue
+            )
+            UPDATE workspace w SET
+                task_count = w.task_count + s.tasks,
+                assigned_task_count = w.assigned_task_count + s.assigned,
+                overdue_task_count = w.overdue_task_count + s.overdue
+            FROM (
+                SELECT workspace_id,
+                    sum(tasks) AS tasks, sum(assigned) AS assigned, sum(overdue) AS overdue
+                FROM changed GROUP BY workspace_id
+            ) s
+            WHERE w.workspace_id = s.workspace_id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("CREATE TRIGGER task_count_insert AFTER INSERT ON task REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()")
+    op.execute("CREATE TRIGGER task_count_update AFTER UPDATE ON task REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()")
+    op.execute("CREATE TRIGGER task_count_delete AFTER DELETE ON task REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION task_count_rows()")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER task_count_delete ON task")
+    op.execute("DROP TRIGGER task_count_update ON task")
+    op.execute("DROP TRIGGER task_count_insert ON task")
+    op.execute("DROP FUNCTION task_count_rows()")
+
+    for table in ('group', 'workspace'):
+        op.drop_column(table, 'overdue_task_count')
+        op.drop_column(table, 'assigned_task_count')
+        op.drop_column(table, 'task_count')
+    op.drop_column('tenant', 'overdue_horizon')
@@ -0,0 +1,68 @@
+"""sort indexes and tenant counters
+
+Revision ID: b71e04c95a2d
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 10:03:17.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e04c95a2d'
+down_revision: Union[str, None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('account_tenant_id_account_id_idx', 'account', ['tenant_id', 'account_id'], unique=False)
+    op.create_index('account_tenant_id_full_name_idx', 'account', ['tenant_id', 'full_name', 'account_id'], unique=False)
+    op.create_index('account_tenant_id_username_idx', 'account', ['tenant_id', 'username'], unique=False)
+    op.create_index('workspace_tenant_id_workspace_id_idx', 'workspace', ['tenant_id', 'workspace_id'], unique=False)
+    op.create_index('workspace_tenant_id_created_at_idx', 'workspace', ['tenant_id', 'created_at', 'workspace_id'], unique=False)
+
+    op.add_column('tenant', sa.Column('workspace_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tenant', sa.Column('account_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE tenant SET
+            workspace_count = (SELECT count(*) FROM workspace WHERE workspace.tenant_id = tenant.tenant_id),
+            account_count = (SELECT count(*) FROM account WHERE account.tenant_id = tenant.tenant_id)
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tenant_count_rows() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                EXECUTE 'UPDATE tenant SET ' || quote_ident(TG_ARGV[0]) || ' = '
+                    || quote_ident(TG_ARGV[0]) || ' + 1 WHERE tenant_id = $1'
+                USING NEW.tenant_id;
+            ELSE
+                EXECUTE 'UPDATE tenant SET ' || quote_ident(TG_ARGV[0]) || ' = '
+                    || quote_ident(TG_ARGV[0]) || ' - 1 WHERE tenant_id = $1'
+                USING OLD.tenant_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("CREATE TRIGGER account_tenant_count AFTER INSERT OR DELETE ON account FOR EACH ROW EXECUTE FUNCTION tenant_count_rows('account_count')")
+    op.execute("CREATE TRIGGER workspace_tenant_count AFTER INSERT OR DELETE ON workspace FOR EACH ROW EXECUTE FUNCTION tenant_count_rows('workspace_count')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER workspace_tenant_count ON workspace")
+    op.execute("DROP TRIGGER account_tenant_count ON account")
+    op.execute("DROP FUNCTION tenant_count_rows()")
+
+    op.drop_column('tenant', 'account_count')
+    op.drop_column('tenant', 'workspace_count')
+
+    op.drop_index('workspace_tenant_id_created_at_idx', table_name='workspace')
+    op.drop_index('workspace_tenant_id_workspace_id_idx', table_name='workspace')
+    op.drop_index('account_tenant_id_username_idx', table_name='account')
+    op.drop_index('account_tenant_id_full_name_idx', table_name='account')
+    op.drop_index('account_tenant_id_account_id_idx', table_name='account')
@@ -0,0 +1,43 @@
+"""outbox
+
+Revision ID: c3f7a9e2b158
+Revises: a6d3e8f2c914
+Create Date: 2026-10-19 20:14:37.502918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f7a9e2b158'
+down_revision: Union[str, None] = 'a6d3e8f2c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox',
+    sa.Column('outbox_id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('aggregate', sa.String(length=32), nullable=False),
+    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=64), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.tenant_id'], ),
+    sa.PrimaryKeyConstraint('outbox_id')
+    )
+    op.create_index('outbox_pending_idx', 'outbox', ['outbox_id'], unique=False, postgresql_where=sa.text('delivered_at IS NULL'))
+    op.create_index('outbox_delivered_at_idx', 'outbox', ['delivered_at'], unique=False, postgresql_where=sa.text('delivered_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('outbox_delivered_at_idx', table_name='outbox', postgresql_where=sa.text('delivered_at IS NOT NULL'))
+    op.drop_index('outbox_pending_idx', table_name='outbox', postgresql_where=sa.text('delivered_at IS NULL'))
+    op.drop_table('outbox')
@@ -0,0 +1,44 @@
+"""token expiry and audit event
+
+Revision ID: c58e0f3a9d14
+Revises: b71e04c95a2d
+Create Date: 2026-10-19 14:21:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e0f3a9d14'
+down_revision: Union[str, None] = 'b71e04c95a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('authentication', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_authentication_expires_at'), 'authentication', ['expires_at'], unique=False)
+
+    op.create_table('audit_event',
+    sa.Column('audit_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('request_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['account.account_id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.tenant_id'], ),
+    sa.PrimaryKeyConstraint('audit_id')
+    )
+    op.create_index('audit_event_tenant_id_created_at_idx', 'audit_event', ['tenant_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('audit_event_tenant_id_created_at_idx', table_name='audit_event')
+    op.drop_table('audit_event')
+
+    op.drop_index(op.f('ix_authentication_expires_at'), table_name='authentication')
+    op.drop_column('authentication', 'expires_at')
@@ -0,0 +1,43 @@
+"""change log
+
+Revision ID: d8e4f1a6c273
+Revises: c3f7a9e2b158
+Create Date: 2026-10-19 21:03:52.114730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e4f1a6c273'
+down_revision: Union[str, None] = 'c3f7a9e2b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('change_log',
+    sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('aggregate', sa.String(length=32), nullable=False),
+    sa.Column('aggregate_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=64), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.tenant_id'], ),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('change_log_tenant_id_seq_idx', 'change_log', ['tenant_id', 'seq'], unique=False)
+    op.add_column('tenant', sa.Column('change_log_horizon', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tenant', 'change_log_horizon')
+    op.drop_index('change_log_tenant_id_seq_idx', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,47 @@
+"""task position
+
+Revision ID: e4b9c3d7a215
+Revises: d2a7b6e1c930
+Create Date: 2026-10-19 16:40:27.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c3d7a215'
+down_revision: Union[str, None] = 'd2a7b6e1c930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def upgrade() -> None:
+    op.add_column('task', sa.Column('position', sa.String(collation='C'), nullable=True))
+    # existing tasks keep their id order, as evenly spaced keys "d" + 4 base 62 digits
+    digits = ' || '.join(
+        f"substr('{DIGITS}', (rank / {62 ** power}) % 62 + 1, 1)" for power in (3, 2, 1, 0)
+    )
+    op.execute(
+        f"""
+        UPDATE task SET position = 'd' || {digits}
+        FROM (
+            SELECT task_id, (row_number() OVER (PARTITION BY group_id ORDER BY task_id) - 1)::int AS rank
+            FROM task
+        ) ranked
+        WHERE task.task_id = ranked.task_id
+        """
+    )
+    op.alter_column('task', 'position', nullable=False)
+    op.create_index('task_group_id_position_idx', 'task', ['group_id', 'position', 'task_id'], unique=False)
+    op.drop_index('task_group_id_task_id_idx', table_name='task')
+
+
+def downgrade() -> None:
+    op.create_index('task_group_id_task_id_idx', 'task', ['group_id', 'task_id'], unique=False)
+    op.drop_index('task_group_id_position_idx', table_name='task')
+    op.drop_column('task', 'position')
@@ -0,0 +1,35 @@
+"""task search vector
+
+Revision ID: e9a2c5d7b481
+Revises: d8e4f1a6c273
+Create Date: 2026-10-19 21:48:06.730215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a2c5d7b481'
+down_revision: Union[str, None] = 'd8e4f1a6c273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TASK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # rewrites the table to compute the column for every existing task
+    op.add_column('task', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(TASK_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('task_search_vector_idx', 'task', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('task_search_vector_idx', table_name='task', postgresql_using='gin')
+    op.drop_column('task', 'search_vector')
@@ -0,0 +1,34 @@
+"""trigram lookup
+
+Revision ID: f1b7c3d9a624
+Revises: e9a2c5d7b481
+Create Date: 2026-10-19 23:12:40.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c3d9a624'
+down_revision: Union[str, None] = 'e9a2c5d7b481'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # both ship with postgres' contrib modules, the official images include them
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # btree_gin lets tenant_id lead the trigram indexes
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.create_index('account_tenant_id_full_name_trgm_idx', 'account', ['tenant_id', 'full_name'], unique=False, postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+    op.create_index('account_tenant_id_username_trgm_idx', 'account', ['tenant_id', 'username'], unique=False, postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.create_index('workspace_tenant_id_name_trgm_idx', 'workspace', ['tenant_id', 'name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('workspace_tenant_id_name_trgm_idx', table_name='workspace', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.drop_index('account_tenant_id_username_trgm_idx', table_name='account', postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.drop_index('account_tenant_id_full_name_trgm_idx', table_name='account', postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
@@ -0,0 +1,177 @@
+import os
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Config(BaseModel):
+    """environment configuration, read and type checked once at startup"""
+
+    model_config = ConfigDict(frozen=True)
+
+    database_url: str
+    env: str = "DEV"
+    access_token_secret: str
+    refresh_token_secret: str
+    access_token_expiry_seconds: int = 60  # 1 minute
+    refresh_token_expiry_seconds: int = 60 * 60 * 24 * 30  # 30 days
+    # expired access tokens are still accepted this long, for clock skew and late refreshes
+    access_token_grace_seconds: int = 10
+    # expiresIn is shortened by up to this fraction so clients do not refresh in lockstep
+    refresh_jitter_ratio: float = 0.2
+    # repeat refreshes of one refresh token within this window reuse the access token
+    refresh_cache_seconds: int = 10
+    cursor_secret: Optional[str] = None
+    bypass_security: bool = False
+    # /metrics answers only requests bearing this token, nobody when unset
+    metrics_token: Optional[str] = None
+    # argon2 runs in its own process pool, see PasswordPool
+    password_workers: int = max(1, (os.cpu_count() or 2) // 2)
+    password_queue_size: int = 16
+    password_retry_after_seconds: int = 1
+    # argon2 cost, see src/infrastructure/security/calibrate.py
+    argon2_params_file: str = "argon2.json"
+    argon2_calibrate: bool = False
+    argon2_target_ms: int = 250
+    argon2_max_memory_kib: int = 64 * 1024
+    argon2_parallelism: int = 2
+    # side effects kept off the request path, see JobQueue
+    job_workers: int = 2
+    job_queue_size: int = 1000
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 0.5
+    job_drain_seconds: float = 10
+    token_prune_interval_seconds: int = 60 * 60
+    # checked before the account lookup, see LoginThrottle
+    login_throttle_backend: str = "memory"  # memory | postgres
+    login_throttle_max_keys: int = 100_000
+    login_user_burst: int = 5
+    login_user_per_minute: float = 5
+    login_ip_burst: int = 30
+    login_ip_per_minute: float = 60
+    login_lockout_failures: int = 10
+    login_lockout_window_seconds: int = 15 * 60
+    login_lockout_seconds: int = 15 * 60
+    # a group is rebalanced in the background once a task position key gets this long
+    task_position_max_length: int = 24
+    # rows per COPY while staging a task import
+    task_import_chunk_rows: int = 10_000
+    # responses to requests sent with an Idempotency-Key, see IdempotentRoute
+    idempotency_ttl_seconds: int = 60 * 60 * 24
+    # how long an unfinished first attempt holds its key
+    idempotency_lease_seconds: int = 60
+    # how long a duplicate waits for the first attempt before a 409
+    idempotency_wait_seconds: float = 10
+    # longest a sub-request of /batch runs before it is answered with a 504
+    batch_item_timeout_seconds: float = 10
+    # board change streams, see BoardEvents
+    board_events_buffer_size: int = 1000
+    board_events_queue_size: int = 100
+    board_events_heartbeat_seconds: float = 15
+    # websocket fan-out, see LiveHub
+    ws_send_buffer: int = 256
+    ws_send_timeout_seconds: float = 5
+    ws_coalesce_ms: int = 50
+    ws_max_subscriptions: int = 50
+    # change events written with the change, see OutboxDispatcher
+    outbox_batch_size: int = 500
+    outbox_poll_seconds: float = 0.2
+    # how long delivered rows are kept before the prune deletes them
+    outbox_retention_seconds: int = 60 * 60
+    outbox_prune_interval_seconds: float = 60
+    # the change feed, see ChangeFeedUsecase
+    change_log_retention_seconds: int = 60 * 60 * 24 * 7
+    # longest a caught up reader is held open, and how often it looks again
+    changes_max_wait_seconds: float = 30
+    changes_poll_seconds: float = 1
+    # task search ranks this many of the newest matches, see TaskQueryUsecase
+    task_search_candidates: int = 1000
+    # how often tasks gone past due are added to the overdue counters, and how
+    # often every workspace's counters are recounted to repair any drift, both
+    # on the one worker holding the jobs lock
+    task_counters_overdue_interval_seconds: int = 60
+    task_counters_reconcile_interval_seconds: int = 60 * 60
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        values = {
+            "database_url": os.environ.get("DATABASE_URL"),
+            "env": os.environ.get("ENV"),
+            "access_token_secret": os.environ.get("ACCESS_TOKEN_SECRET"),
+            "refresh_token_secret": os.environ.get("REFRESH_TOKEN_SECRET"),
+            "access_token_expiry_seconds": os.environ.get(
+                "ACCESS_TOKEN_EXPIRY_SECONDS"
+            ),
+            "refresh_token_expiry_seconds": os.environ.get(
+                "REFRESH_TOKEN_EXPIRY_SECONDS"
+            ),
+            "access_token_grace_seconds": os.environ.get("ACCESS_TOKEN_GRACE_SECONDS"),
+            "refresh_jitter_ratio": os.environ.get("REFRESH_JITTER_RATIO"),
+            "refresh_cache_seconds": os.environ.get("REFRESH_CACHE_SECONDS"),
+            "cursor_secret": os.environ.get("CURSOR_SECRET"),
+            "bypass_security": os.environ.get("BYPASS_SECURITY", "FALSE") == "TRUE",
+            "metrics_token": os.environ.get("METRICS_TOKEN"),
+            "password_workers": os.environ.get("PASSWORD_WORKERS"),
+            "password_queue_size": os.environ.get("PASSWORD_QUEUE_SIZE"),
+            "password_retry_after_seconds": os.environ.get(
+                "PASSWORD_RETRY_AFTER_SECONDS"
+            ),
+            "argon2_params_file": os.environ.get("ARGON2_PARAMS_FILE"),
+            "argon2_calibrate": os.environ.get("ARGON2_CALIBRATE", "FALSE") == "TRUE",
+            "argon2_target_ms": os.environ.get("ARGON2_TARGET_MS"),
+            "argon2_max_memory_kib": os.environ.get("ARGON2_MAX_MEMORY_KIB"),
+            "argon2_parallelism": os.environ.get("ARGON2_PARALLELISM"),
+            "job_workers": os.environ.get("JOB_WORKERS"),
+            "job_queue_size": os.environ.get("JOB_QUEUE_SIZE"),
+            "job_max_attempts": os.environ.get("JOB_MAX_ATTEMPTS"),
+            "job_retry_backoff_seconds": os.environ.get("JOB_RETRY_BACKOFF_SECONDS"),
+            "job_drain_seconds": os.environ.get("JOB_DRAIN_SECONDS"),
+            "token_prune_interval_seconds": os.environ.get(
+                "TOKEN_PRUNE_INTERVAL_SECONDS"
+            ),
+            "login_throttle_backend": os.environ.get("LOGIN_THROTTLE_BACKEND"),
+            "login_throttle_max_keys": os.environ.get("LOGIN_THROTTLE_MAX_KEYS"),
+            "login_user_burst": os.environ.get("LOGIN_USER_BURST"),
+            "login_user_per_minute": os.environ.get("LOGIN_USER_PER_MINUTE"),
+            "login_ip_burst": os.environ.get("LOGIN_IP_BURST"),
+            "login_ip_per_minute": os.environ.get("LOGIN_IP_PER_MINUTE"),
+            "login_lockout_failures": os.environ.get("LOGIN_LOCKOUT_FAILURES"),
+            "login_lockout_window_seconds": os.environ.get(
+                "LOGIN_LOCKOUT_WINDOW_SECONDS"
+            ),
+            "login_lockout_seconds": os.environ.get("LOGIN_LOCKOUT_SECONDS"),
+            "task_position_max_length": os.environ.get("TASK_POSITION_MAX_LENGTH"),
+            "task_import_chunk_rows": os.environ.get("TASK_IMPORT_CHUNK_ROWS"),
+            "idempotency_ttl_seconds": os.environ.get("IDEMPOTENCY_TTL_SECONDS"),
+            "idempotency_lease_seconds": os.environ.get("IDEMPOTENCY_LEASE_SECONDS"),
+            "idempotency_wait_seconds": os.environ.get("IDEMPOTENCY_WAIT_SECONDS"),
+            "batch_item_timeout_seconds": os.environ.get("BATCH_ITEM_TIMEOUT_SECONDS"),
+            "board_events_buffer_size": os.environ.get("BOARD_EVENTS_BUFFER_SIZE"),
+            "board_events_queue_size": os.environ.get("BOARD_EVENTS_QUEUE_SIZE"),
+            "board_events_heartbeat_seconds": os.environ.get(
+                "BOARD_EVENTS_HEARTBEAT_SECONDS"
+            ),
+            "ws_send_buffer": os.environ.get("WS_SEND_BUFFER"),
+            "ws_send_timeout_seconds": os.environ.get("WS_SEND_TIMEOUT_SECONDS"),
+            "ws_coalesce_ms": os.environ.get("WS_COALESCE_MS"),
+            "ws_max_subscriptions": os.environ.get("WS_MAX_SUBSCRIPTIONS"),
+            "outbox_batch_size": os.environ.get("OUTBOX_BATCH_SIZE"),
+            "outbox_poll_seconds": os.environ.get("OUTBOX_POLL_SECONDS"),
+            "outbox_retention_seconds": os.environ.get("OUTBOX_RETENTION_SECONDS"),
+            "outbox_prune_interval_seconds": os.environ.get(
+                "OUTBOX_PRUNE_INTERVAL_SECONDS"
+            ),
+            "change_log_retention_seconds": os.environ.get(
+                "CHANGE_LOG_RETENTION_SECONDS"
+            ),
+            "changes_max_wait_seconds": os.environ.get("CHANGES_MAX_WAIT_SECONDS"),
+            "changes_poll_seconds": os.environ.get("CHANGES_POLL_SECONDS"),
+            "task_search_candidates": os.environ.get("TASK_SEARCH_CANDIDATES"),
+            "task_counters_overdue_interval_seconds": os.environ.get(
+                "TASK_COUNTERS_OVERDUE_INTERVAL_SECONDS"
+            ),
+            "task_counters_reconcile_interval_seconds": os.environ.get(
+                "TASK_COUNTERS_RECONCILE_INTERVAL_SECONDS"
+            ),
+        }
+        return cls(**{key: value for key, value in values.items() if value is not None})
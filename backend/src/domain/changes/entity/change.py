@@ -0,0 +1,40 @@
+import datetime
+from typing import Any, Optional
+
+from src.common.model import Model
+
+
+DEFAULT_CHANGE_LIMIT = 100
+MAX_CHANGE_LIMIT = 1000
+
+
+class ChangePagination(Model):
+    # the seq of the last change already read, 0 for the oldest one kept
+    after: int = 0
+    limit: Optional[int] = None
+    # seconds to hold the request open when there is no change after `after` yet
+    wait: float = 0
+
+    def page_size(self) -> int:
+        if not self.limit or self.limit < 1:
+            return DEFAULT_CHANGE_LIMIT
+        return min(self.limit, MAX_CHANGE_LIMIT)
+
+
+class ChangeResponse(Model):
+    seq: int
+    type: str
+    aggregate: str
+    aggregateId: int
+    workspaceId: int
+    payload: dict[str, Any]
+    createdAt: datetime.datetime
+
+
+class ChangesResponse(Model):
+    changes: list[ChangeResponse]
+    # the after of the next request
+    next: int
+    hasMore: bool
+    # how long a change stays in the feed
+    retentionSeconds: int
@@ -0,0 +1,6 @@
+class ChangesExpired(Exception):
+    def __init__(
+        self, message="Changes after this seq were pruned, resync and start over"
+    ):
+        self.message = message
+        super().__init__(self.message)
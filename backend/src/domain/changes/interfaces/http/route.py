@@ -0,0 +1,54 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+
+from src.common.config import Config
+from src.common.token import TokenPayload
+from src.domain.changes.entity.change import ChangePagination, ChangesResponse
+from src.domain.changes.usecase.changes import ChangeFeedUsecase
+from src.infrastructure.container import (
+    get_change_signal,
+    get_change_usecase,
+    get_config,
+)
+from src.infrastructure.http.guarded import get_current_user
+from src.infrastructure.http.request_log import TimedRoute
+from src.infrastructure.realtime.changeSignal import ChangeSignal
+
+router = APIRouter(tags=["changes"], route_class=TimedRoute)
+
+
+@router.get("/changes")
+async def list_changes(
+    change_usecase: Annotated[ChangeFeedUsecase, Depends(get_change_usecase)],
+    signal: Annotated[ChangeSignal, Depends(get_change_signal)],
+    config: Annotated[Config, Depends(get_config)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    pagination: Annotated[ChangePagination, Depends()],
+) -> ChangesResponse:
+    """the tenant's changes after the `after` seq, oldest first.
+
+    When there are none yet and `wait` is given, the request is held open
+    until one is appended, for at most `changes_max_wait_seconds`.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, min(pagination.wait, config.changes_max_wait_seconds))
+    # watched before reading, so an append in between still wakes the poll
+    appended = signal.watch(auth.tenant_id)
+    try:
+        while True:
+            appended.clear()
+            page = await run_in_threadpool(change_usecase.list_changes, auth, pagination)
+            remaining = deadline - loop.time()
+            if page.changes or remaining <= 0:
+                return page
+            try:
+                await asyncio.wait_for(
+                    appended.wait(), min(remaining, config.changes_poll_seconds)
+                )
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        signal.unwatch(auth.tenant_id, appended)
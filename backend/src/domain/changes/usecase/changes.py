@@ -0,0 +1,168 @@
+import threading
+import time
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from migrations.schema import ChangeLog, Tenant
+from src.common.token import TokenPayload
+from src.domain.changes.entity.change import (
+    ChangePagination,
+    ChangeResponse,
+    ChangesResponse,
+)
+from src.domain.changes.entity.exception import ChangesExpired
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.background.outboxDispatcher import OutboxMessage
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.realtime.changeSignal import ChangeSignal
+
+_PRUNE_CHUNK = 10_000
+
+
+class ChangeFeedUsecase:
+    """the tenant change feed, read by seq from the change_log.
+
+    The log is appended from the outbox, by a handler the dispatcher runs one
+    batch at a time across workers: seq grows in the order changes are
+    appended and a reader resuming after a seq misses nothing. Changes are
+    kept for `retention_seconds`, a reader still behind the pruned ones is
+    told to resync.
+    """
+
+    __repository: Repository
+    __jobs: JobQueue
+    __signal: ChangeSignal
+
+    def __init__(
+        self,
+        repository: Repository,
+        jobs: JobQueue,
+        signal: ChangeSignal,
+        retention_seconds: int,
+        prune_interval_seconds: int = 60 * 60,
+    ):
+        self.__repository = repository
+        self.__jobs = jobs
+        self.__signal = signal
+        self.__retention = retention_seconds
+        self.__prune_interval = prune_interval_seconds
+        self.__next_prune = 0.0
+        self.__prune_lock = threading.Lock()
+
+    @property
+    def retention_seconds(self) -> int:
+        return self.__retention
+
+    def append(self, session: Session, messages: list[OutboxMessage]) -> None:
+        """outbox handler, appends the batch in the dispatcher's transaction"""
+        session.execute(
+            # the transaction started before the dispatch lock was taken
+            insert(ChangeLog).values(recorded_at=func.clock_timestamp()),
+            [
+                {
+                    "tenant_id": message.tenant_id,
+                    "workspace_id": message.workspace_id,
+                    "aggregate": message.aggregate,
+                    "aggregate_id": message.aggregate_id,
+                    "type": message.type,
+                    "payload": message.payload,
+                    "created_at": message.created_at,
+                }
+                for message in messages
+            ],
+        )
+        if self.__prune_due():
+            self.__jobs.submit("prune_change_log", self.prune)
+
+    def appended(self, messages: list[OutboxMessage]) -> None:
+        """called once an appended batch committed"""
+        self.__signal.notify(message.tenant_id for message in messages)
+
+    def list_changes(
+        self, auth: TokenPayload, pagination: ChangePagination
+    ) -> ChangesResponse:
+        limit = pagination.page_size()
+        with self.__repository.session() as session:
+            horizon = session.scalar(
+                select(Tenant.change_log_horizon).where(
+                    Tenant.tenant_id == auth.tenant_id
+                )
+            )
+            # 0 starts at the oldest change kept
+            if 0 < pagination.after < (horizon or 0):
+                raise ChangesExpired()
+            rows = session.execute(
+                select(
+                    ChangeLog.seq,
+                    ChangeLog.type,
+                    ChangeLog.aggregate,
+                    ChangeLog.aggregate_id,
+                    ChangeLog.workspace_id,
+                    ChangeLog.payload,
+                    ChangeLog.created_at,
+                )
+                .where(
+                    ChangeLog.tenant_id == auth.tenant_id,
+                    ChangeLog.seq > pagination.after,
+                )
+                .order_by(ChangeLog.seq)
+                .limit(limit + 1)
+            ).all()
+
+        changes = [
+            ChangeResponse(
+                seq=row.seq,
+                type=row.type,
+                aggregate=row.aggregate,
+                aggregateId=row.aggregate_id,
+                workspaceId=row.workspace_id,
+                payload=row.payload,
+                createdAt=row.created_at,
+            )
+            for row in rows[:limit]
+        ]
+        return ChangesResponse(
+            changes=changes,
+            next=changes[-1].seq if changes else pagination.after,
+            hasMore=len(rows) > limit,
+            retentionSeconds=self.__retention,
+        )
+
+    def prune(self) -> None:
+        """deletes the changes past the retention, oldest first, and moves each
+        tenant's horizon up to the last one of its changes deleted"""
+        while True:
+            with self.__repository.session() as session:
+                pruned = session.execute(
+                    text(
+                        """
+                        WITH pruned AS (
+                            DELETE FROM change_log WHERE seq IN (
+                                SELECT seq FROM change_log
+                                WHERE recorded_at < now() - make_interval(secs => :retention)
+                                ORDER BY seq
+                                LIMIT :chunk
+                            )
+                            RETURNING tenant_id, seq
+                        ), horizons AS (
+                            SELECT tenant_id, max(seq) AS seq, count(*) AS pruned
+                            FROM pruned GROUP BY tenant_id
+                        )
+                        UPDATE tenant SET change_log_horizon =
+                            greatest(tenant.change_log_horizon, horizons.seq)
+                        FROM horizons WHERE tenant.tenant_id = horizons.tenant_id
+                        RETURNING horizons.pruned
+                        """
+                    ),
+                    {"retention": self.__retention, "chunk": _PRUNE_CHUNK},
+                ).scalars().all()
+            if sum(pruned) < _PRUNE_CHUNK:
+                return
+
+    def __prune_due(self) -> bool:
+        with self.__prune_lock:
+            now = time.monotonic()
+            if now < self.__next_prune:
+                return False
+            self.__next_prune = now + self.__prune_interval
+            return True
@@ -9,3 +9,5 @@ class LoginRequest(Model):
 class LoginResponse(Model):
     accessToken: str
     refreshToken: str
+    # seconds until the client should refresh the access token
+    expiresIn: int
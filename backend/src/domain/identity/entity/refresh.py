@@ -3,3 +3,5 @@ from src.common.model import Model
 
 class RefreshResponse(Model):
     accessToken: str
+    # seconds until the client should refresh again
+    expiresIn: int
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from src.common.model import Model
 
@@ -6,6 +6,11 @@ from src.common.model import Model
 class Pagination(Model):
     lastId: Optional[int] = None
     limit: Optional[int] = 10
+    cursor: Optional[str] = None
+    sort: Literal["id", "name", "username"] = "id"
+    withTotal: bool = False
+    # typeahead: only the accounts most like q, best first, in a single page
+    q: Optional[str] = None
 
 
 class UserResponse(Model):
@@ -17,3 +22,5 @@ class UserResponse(Model):
 
 class UsersResponses(Model):
     users: list[UserResponse]
+    nextCursor: Optional[str] = None
+    total: Optional[int] = None
@@ -1,28 +1,36 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 from migrations.schema import Account
 from src.common.token import TokenPayload
 from src.domain.identity.entity.user import Pagination, UserResponse, UsersResponses
+from src.common.config import Config
+from src.infrastructure.container import get_config, get_identity_usecase
+from src.infrastructure.http.request_log import TimedRoute
 from src.infrastructure.http.guarded import get_current_user, get_refresh_token
 from src.domain.identity.entity.logout import RefreshToken
 from src.domain.identity.entity.refresh import RefreshResponse
 from src.domain.identity.usecase.identity import IdentityUsecase
 from src.domain.identity.entity.login import LoginRequest, LoginResponse
-import os
 
-router = APIRouter(prefix="/identity", tags=["identity"])
+router = APIRouter(
+    prefix="/identity", tags=["identity"], route_class=TimedRoute
+)
 
 
 @router.post("/login")
-def login(
+async def login(
     login: LoginRequest,
+    request: Request,
     response: Response,
-    identity_usecase: Annotated[IdentityUsecase, Depends()],
+    identity_usecase: Annotated[IdentityUsecase, Depends(get_identity_usecase)],
+    config: Annotated[Config, Depends(get_config)],
 ) -> LoginResponse:
-    resp = identity_usecase.login(login)
+    resp = await identity_usecase.login(
+        login, request.client.host if request.client else None
+    )
 
-    if os.environ.get("ENV", "DEV") == "DEV":
+    if config.env == "DEV":
         response.set_cookie(
             key="access_token", value=resp.accessToken, httponly=True, samesite="lax"
         )
@@ -30,6 +38,7 @@ def login(
     response.set_cookie(
         key="refresh_token", value=resp.refreshToken, httponly=True, samesite="strict"
     )
+    response.headers["X-Expires-In"] = str(resp.expiresIn)
 
     return resp
 
@@ -38,14 +47,16 @@ def login(
 def refresh(
     response: Response,
     refresh_token: Annotated[RefreshToken, Depends(get_refresh_token)],
-    identity_usecase: Annotated[IdentityUsecase, Depends(IdentityUsecase)],
+    identity_usecase: Annotated[IdentityUsecase, Depends(get_identity_usecase)],
+    config: Annotated[Config, Depends(get_config)],
 ) -> RefreshResponse:
     resp = identity_usecase.refresh(refresh_token)
 
-    if os.environ.get("ENV", "DEV") == "DEV":
+    if config.env == "DEV":
         response.set_cookie(
             key="access_token", value=resp.accessToken, httponly=True, samesite="lax"
         )
+    response.headers["X-Expires-In"] = str(resp.expiresIn)
 
     return resp
 
@@ -54,7 +65,7 @@ def refresh(
 def logout(
     response: Response,
     refresh_token: Annotated[RefreshToken, Depends(get_refresh_token)],
-    identity_usecase: Annotated[IdentityUsecase, Depends(IdentityUsecase)],
+    identity_usecase: Annotated[IdentityUsecase, Depends(get_identity_usecase)],
 ) -> None:
     identity_usecase.logout(refresh_token)
 
@@ -65,7 +76,7 @@ def logout(
 
 @router.get("/users")
 def list_users(
-    identity_usecase: Annotated[IdentityUsecase, Depends(IdentityUsecase)],
+    identity_usecase: Annotated[IdentityUsecase, Depends(get_identity_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     pagination: Annotated[Pagination, Depends(Pagination)],
 ) -> UsersResponses:
@@ -74,7 +85,7 @@ def list_users(
 
 @router.get("/me")
 def me(
-    identity_usecase: Annotated[IdentityUsecase, Depends(IdentityUsecase)],
+    identity_usecase: Annotated[IdentityUsecase, Depends(get_identity_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
 ) -> UserResponse:
     return identity_usecase.me(auth)
@@ -3,73 +3,88 @@ from src.domain.identity.entity.login import LoginRequest, LoginResponse
 from src.domain.identity.entity.logout import RefreshToken
 from src.domain.identity.entity.refresh import RefreshResponse
 from src.domain.identity.entity.user import Pagination, UserResponse, UsersResponses
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.database.keyset import KeysetOrder
 from src.infrastructure.database.repository import Repository
-from argon2 import PasswordHasher
+from src.infrastructure.database.trigram import trigram_match
+from src.infrastructure.security.cursor import CursorCodec
+from src.infrastructure.security.loginThrottle import LoginThrottle
+from src.infrastructure.security.passwordPool import PasswordPool
+from src.infrastructure.security.refreshCache import RefreshCache
 from argon2.exceptions import VerifyMismatchError
-from migrations.schema import Account, Authentication
+from migrations.schema import Account, AuditEvent, Authentication, Tenant
+from src.infrastructure.observability.logger import request_id_var
 from src.domain.identity.entity.exception import (
     RefreshTokenNotFound,
     UserNotFound,
     InvalidCredentials,
 )
 from src.common.token import TokenPayload
+from sqlalchemy import func
+from typing import Optional
+import asyncio
+import threading
+import time
+
+
+_USER_ORDERS = {
+    "id": KeysetOrder(Account.account_id),
+    "name": KeysetOrder(Account.full_name, Account.account_id),
+    "username": KeysetOrder(Account.username),
+}
 
 
 class IdentityUsecase:
-    __hasher: PasswordHasher
+    __hasher: PasswordPool
     __repository: Repository
     __token_manager: JwtTokenManager
+    __cursor: CursorCodec
+    __jobs: JobQueue
+    __throttle: LoginThrottle
+    __refresh_cache: RefreshCache
 
-    def __init__(self):
-        self.__hasher = PasswordHasher()
-        self.__repository = Repository()
-        self.__token_manager = JwtTokenManager()
+    def __init__(
+        self,
+        repository: Repository,
+        hasher: PasswordPool,
+        token_manager: JwtTokenManager,
+        cursor: CursorCodec,
+        jobs: JobQueue,
+        throttle: LoginThrottle,
+        refresh_cache: RefreshCache,
+        token_prune_interval_seconds: int = 60 * 60,
+    ):
+        self.__hasher = hasher
+        self.__repository = repository
+        self.__token_manager = token_manager
+        self.__cursor = cursor
+        self.__jobs = jobs
+        self.__throttle = throttle
+        self.__refresh_cache = refresh_cache
+        self.__token_prune_interval = token_prune_interval_seconds
+        self.__next_token_prune = 0.0
+        self.__prune_lock = threading.Lock()
 
-    def login(self, login_request: LoginRequest) -> LoginResponse:
-
-        with self.__repository.session() as session:
-            account = (
-                session.query(Account)
-                .where(Account.username == login_request.username)
-                .first()
-            )
-            if not account:
-                raise UserNotFound()
+    async def login(
+        self, login_request: LoginRequest, client_ip: Optional[str] = None
+    ) -> LoginResponse:
+        """the database work runs on a thread, argon2 is awaited on the pool
+        so no thread waits on it"""
+        account = await asyncio.to_thread(self.__find_account, login_request, client_ip)
 
-            try:
-                self.__hasher.verify(account.hashed_password, login_request.password)
-            except VerifyMismatchError:
-                raise InvalidCredentials()
-
-            try:
-                if self.__hasher.check_needs_rehash(account.hashed_password):
-                    new_hash = self.__hasher.hash(login_request.password)
-                    account.hashed_password = new_hash
-                    session.add(account)
-            except Exception:
-                pass
-
-            access_token = self.__token_manager.create_access_token(
-                TokenPayload(
-                    id=account.account_id,
-                    tenant_id=account.tenant_id,
-                    username=account.username,
-                )
-            )
-            refresh_token = self.__token_manager.create_refresh_token(
-                TokenPayload(
-                    id=account.account_id,
-                    username=account.username,
-                    tenant_id=account.tenant_id,
-                )
+        # argon2 runs without holding a pooled connection
+        try:
+            await self.__hasher.verify_async(
+                account.hashed_password, login_request.password
             )
+        except VerifyMismatchError:
+            await asyncio.to_thread(self.__throttle.failed, login_request.username)
+            raise InvalidCredentials()
 
-            auth = Authentication(token=refresh_token)
-            session.add(auth)
-
-            return LoginResponse(accessToken=access_token, refreshToken=refresh_token)
+        return await asyncio.to_thread(self.__sign_in, account, login_request)
 
     def refresh(self, payload: RefreshToken) -> RefreshResponse:
+        # checked every time, a logout on any worker revokes the token at once
         with self.__repository.session() as session:
             token_data = self.__token_manager.verify_refresh_token(payload.token)
 
@@ -81,15 +96,22 @@ class IdentityUsecase:
             if not auth:
                 raise RefreshTokenNotFound()
 
-            return RefreshResponse(
-                accessToken=self.__token_manager.create_access_token(
-                    TokenPayload(
-                        id=token_data.id,
-                        username=token_data.username,
-                        tenant_id=token_data.tenant_id,
-                    )
-                )
+        cached = self.__refresh_cache.get(payload.token)
+        if cached:
+            access_token, expires_in = cached
+            return RefreshResponse(accessToken=access_token, expiresIn=expires_in)
+
+        access_token = self.__token_manager.create_access_token(
+            TokenPayload(
+                id=token_data.id,
+                username=token_data.username,
+                tenant_id=token_data.tenant_id,
             )
+        )
+        expires_in = self.__token_manager.access_token_expires_in()
+        self.__refresh_cache.put(payload.token, access_token, expires_in)
+
+        return RefreshResponse(accessToken=access_token, expiresIn=expires_in)
 
     def logout(self, payload: RefreshToken):
 
@@ -103,25 +125,45 @@ class IdentityUsecase:
                 raise RefreshTokenNotFound()
 
             session.delete(auth)
+        self.__refresh_cache.discard(payload.token)
+
+        token_data = self.__token_manager.read_refresh_token(payload.token)
+        if token_data:
+            self.__audit(token_data.tenant_id, token_data.id, "logout")
 
     def list_users(
         self, payload: TokenPayload, pagination: Pagination
     ) -> UsersResponses:
+        order = _USER_ORDERS[pagination.sort]
+        limit = pagination.limit if pagination.limit else 10
+        after = None
+        if pagination.cursor:
+            after = self.__cursor.decode(pagination.sort, pagination.cursor)
+        elif pagination.lastId and pagination.sort == "id":
+            after = [pagination.lastId]
+
         with self.__repository.session() as session:
-            accounts = (
-                session.query(Account)
-                .where(
-                    
-                        Account.tenant_id == payload.tenant_id,
-                        Account.account_id
-                        > (pagination.lastId if pagination.lastId else 0),
-                  
+            query = session.query(Account).where(Account.tenant_id == payload.tenant_id)
+            if pagination.q and pagination.q.strip():
+                matches, similarity = trigram_match(
+                    pagination.q.strip(), Account.full_name, Account.username
                 )
-                .order_by(Account.account_id)
-                .limit(pagination.limit if pagination.limit else 10)
-                .all()
-            )
+                accounts = (
+                    query.where(matches)
+                    .order_by(similarity.desc(), Account.account_id)
+                    .limit(limit)
+                    .all()
+                )
+            else:
+                accounts = order.paginate(query, after, limit).all()
 
+            total = None
+            if pagination.withTotal:
+                total = (
+                    session.query(Tenant.account_count)
+                    .where(Tenant.tenant_id == payload.tenant_id)
+                    .scalar()
+                )
 
             return UsersResponses(
                 users=[
@@ -131,8 +173,16 @@ class IdentityUsecase:
                         fullName=user.full_name,
                         email=user.email,
                     )
-                    for user in accounts
-                ]
+                    for user in accounts[:limit]
+                ],
+                nextCursor=(
+                    self.__cursor.encode(
+                        pagination.sort, order.values(accounts[limit - 1])
+                    )
+                    if len(accounts) > limit
+                    else None
+                ),
+                total=total,
             )
 
     def me(self, payload: TokenPayload) -> UserResponse:
@@ -152,3 +202,118 @@ class IdentityUsecase:
                 fullName=account.full_name,
                 email=account.email,
             )
+
+    # side effects below run on the job queue, off the request path
+
+    def __rehash_password(self, account_id: int, old_hash: str, password: str):
+        new_hash = self.__hasher.hash(password)
+        with self.__repository.session() as session:
+            # skipped when the password changed since the login that queued this
+            session.query(Account).where(
+                Account.account_id == account_id,
+                Account.hashed_password == old_hash,
+            ).update({Account.hashed_password: new_hash}, synchronize_session=False)
+
+    def __find_account(
+        self, login_request: LoginRequest, client_ip: Optional[str]
+    ) -> Account:
+        # throttled attempts never reach the database or argon2
+        self.__throttle.check(login_request.username, client_ip)
+
+        with self.__repository.session() as session:
+            account = (
+                session.query(Account)
+                .where(Account.username == login_request.username)
+                .first()
+            )
+            if not account:
+                self.__throttle.failed(login_request.username)
+                raise UserNotFound()
+
+            session.expunge(account)
+        return account
+
+    def __sign_in(self, account: Account, login_request: LoginRequest) -> LoginResponse:
+        self.__jobs.submit(
+            "clear_login_failures", self.__throttle.succeeded, login_request.username
+        )
+
+        if self.__hasher.check_needs_rehash(account.hashed_password):
+            self.__jobs.submit(
+                "rehash_password",
+                self.__rehash_password,
+                account.account_id,
+                account.hashed_password,
+                login_request.password,
+            )
+
+        access_token = self.__token_manager.create_access_token(
+            TokenPayload(
+                id=account.account_id,
+                tenant_id=account.tenant_id,
+                username=account.username,
+            )
+        )
+        refresh_token = self.__token_manager.create_refresh_token(
+            TokenPayload(
+                id=account.account_id,
+                username=account.username,
+                tenant_id=account.tenant_id,
+            )
+        )
+
+        with self.__repository.session() as session:
+            session.add(
+                Authentication(
+                    token=refresh_token,
+                    expires_at=self.__token_manager.refresh_token_expires_at(),
+                )
+            )
+
+        self.__audit(account.tenant_id, account.account_id, "login")
+        if self.__token_prune_due():
+            self.__jobs.submit("prune_refresh_tokens", self.__prune_refresh_tokens)
+            self.__jobs.submit("prune_login_throttle", self.__throttle.prune)
+
+        return LoginResponse(
+            accessToken=access_token,
+            refreshToken=refresh_token,
+            expiresIn=self.__token_manager.access_token_expires_in(),
+        )
+
+    def __token_prune_due(self) -> bool:
+        with self.__prune_lock:
+            now = time.monotonic()
+            if now < self.__next_token_prune:
+                return False
+            self.__next_token_prune = now + self.__token_prune_interval
+            return True
+
+    def __prune_refresh_tokens(self):
+        with self.__repository.session() as session:
+            session.query(Authentication).where(
+                Authentication.expires_at < func.now()
+            ).delete(synchronize_session=False)
+
+    def __audit(self, tenant_id: int, account_id: int, action: str):
+        self.__jobs.submit(
+            "audit",
+            self.__write_audit,
+            tenant_id,
+            account_id,
+            action,
+            request_id_var.get(),
+        )
+
+    def __write_audit(
+        self, tenant_id: int, account_id: int, action: str, request_id: str
+    ):
+        with self.__repository.session() as session:
+            session.add(
+                AuditEvent(
+                    tenant_id=tenant_id,
+                    account_id=account_id,
+                    action=action,
+                    request_id=request_id,
+                )
+            )
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from src.common.model import Model
+
+
+class MoveTasksPayload(Model):
+    # either the tasks to move, or a group whose tasks all move
+    taskIds: Optional[list[int]] = None
+    fromGroupId: Optional[int] = None
+    toGroupId: int
+
+
+class MoveTasks(Model):
+    workspaceId: int
+    taskIds: Optional[list[int]] = None
+    fromGroupId: Optional[int] = None
+    toGroupId: int
+
+
+class DeleteTasksPayload(Model):
+    # either the tasks to delete, or a group to clear
+    taskIds: Optional[list[int]] = None
+    groupId: Optional[int] = None
+
+
+class DeleteTasks(Model):
+    workspaceId: int
+    taskIds: Optional[list[int]] = None
+    groupId: Optional[int] = None
+
+
+class BulkTaskResponse(Model):
+    taskIds: list[int]
@@ -0,0 +1,19 @@
+from src.common.model import Model
+from src.domain.workspaces.entity.create import WorkspaceResponse
+
+
+class CloneWorkspacePayload(Model):
+    name: str
+    # copy the starter tasks too, not only the groups
+    includeTasks: bool = True
+
+
+class CloneWorkspace(Model):
+    workspaceId: int
+    name: str
+    includeTasks: bool = True
+
+
+class CloneWorkspaceResponse(WorkspaceResponse):
+    groupCount: int
+    taskCount: int
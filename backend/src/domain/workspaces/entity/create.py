@@ -15,3 +15,7 @@ class WorkspaceResponse(Model):
     updatedAt: Optional[datetime.datetime]
     createdBy: int
     updatedBy: Optional[int]
+    # kept by the database as tasks change, see TaskCounterUsecase
+    taskCount: int = 0
+    assignedTaskCount: int = 0
+    overdueTaskCount: int = 0
@@ -4,6 +4,9 @@ from typing import Optional
 from src.common.model import Model
 
 
+MAX_TASK_BATCH = 500
+
+
 class CreateTaskPayload(Model):
     title: str
     description: Optional[str] = None
@@ -11,15 +14,25 @@ class CreateTaskPayload(Model):
     assignedToUserId: Optional[int] = None
 
 
+class CreateTaskBatchPayload(Model):
+    tasks: list[CreateTaskPayload]
+
+
 class TaskResponse(Model):
+    # every field except taskId may be pruned by a sparse fieldset, unset
+    # fields are dropped from the serialized output
     taskId: int
-    title: str
-    description: Optional[str]
-    dueDate: Optional[datetime.datetime]
-    assignedToUserId: Optional[int]
-    assignedTo: Optional[str]
-
-    createdAt: datetime.datetime
-    updatedAt: Optional[datetime.datetime]
-    createdBy: int
-    updatedBy: Optional[int]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    dueDate: Optional[datetime.datetime] = None
+    assignedToUserId: Optional[int] = None
+    assignedTo: Optional[str] = None
+
+    createdAt: Optional[datetime.datetime] = None
+    updatedAt: Optional[datetime.datetime] = None
+    createdBy: Optional[int] = None
+    updatedBy: Optional[int] = None
+
+
+class TaskBatchResponse(Model):
+    tasks: list[TaskResponse]
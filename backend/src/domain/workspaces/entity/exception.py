@@ -17,4 +17,38 @@ class GroupNotFound(Exception):
 class TaskNotFound(Exception):
     def __init__(self, message="Task not found"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class InvalidFields(Exception):
+    def __init__(self, message="Invalid fields"):
+        self.message = message
+        super().__init__(self.message)
+
+class InvalidTaskBatch(Exception):
+    def __init__(self, message="Invalid task batch"):
+        self.message = message
+        super().__init__(self.message)
+
+class InvalidTaskPosition(Exception):
+    def __init__(self, message="Invalid task position"):
+        self.message = message
+        super().__init__(self.message)
+
+class InvalidTaskImport(Exception):
+    def __init__(self, message="Invalid task import"):
+        self.message = message
+        super().__init__(self.message)
+
+class TaskImportRejected(Exception):
+    """rows that failed validation, nothing of the import was kept"""
+
+    def __init__(self, errors, total: int, message="Task import rejected"):
+        self.message = message
+        self.errors = errors
+        self.total = total
+        super().__init__(self.message)
+
+class InvalidTaskSearch(Exception):
+    def __init__(self, message="Invalid task search"):
+        self.message = message
+        super().__init__(self.message)
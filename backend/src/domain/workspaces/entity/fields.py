@@ -0,0 +1,38 @@
+from typing import Optional
+
+from src.common.model import Model
+from src.domain.workspaces.entity.exception import InvalidFields
+
+
+TASK_FIELDS = (
+    "taskId",
+    "title",
+    "description",
+    "dueDate",
+    "assignedToUserId",
+    "assignedTo",
+    "createdAt",
+    "updatedAt",
+    "createdBy",
+    "updatedBy",
+)
+
+
+class TaskFieldset(Model):
+    fields: Optional[str] = None
+
+    def selected(self) -> Optional[list[str]]:
+        """comma separated task fields, None means every field"""
+        if not self.fields:
+            return None
+
+        selected = ["taskId"]
+        for field in self.fields.split(","):
+            field = field.strip()
+            if not field or field in selected:
+                continue
+            if field not in TASK_FIELDS:
+                raise InvalidFields(f"Unknown task field: {field}")
+            selected.append(field)
+
+        return selected
@@ -1,33 +1,28 @@
 import datetime
 from typing import Optional
 from src.common.model import Model
+from src.domain.workspaces.entity.create_task import TaskResponse
+from src.domain.workspaces.entity.list_task import DEFAULT_TASK_LIMIT
 
 
 class GroupByWorkspaceRequest(
     Model,
 ):
     name: str
-
-
-
-class TaskResponse(Model):
-    taskId: int
-    title: str
-    description: Optional[str]
-    dueDate: Optional[datetime.datetime]
-    assignedToUserId: Optional[int]
-    assignedTo: Optional[str]
-
-    createdAt: datetime.datetime
-    updatedAt: Optional[datetime.datetime]
-    createdBy: int
-    updatedBy: Optional[int]
+    limit: int = DEFAULT_TASK_LIMIT
+    fields: Optional[list[str]] = None
 
 
 class GroupResponse(Model):
     groupId: int
     name: str
     tasks: list[TaskResponse]
+    # to pass as `cursor` for the group's next page, None when exhausted
+    nextCursor: Optional[str] = None
+    # every task of the group, not only this page, see TaskCounterUsecase
+    taskCount: int = 0
+    assignedTaskCount: int = 0
+    overdueTaskCount: int = 0
 
     createdAt: datetime.datetime
     updatedAt: Optional[datetime.datetime]
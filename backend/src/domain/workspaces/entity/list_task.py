@@ -0,0 +1,33 @@
+from typing import Optional
+
+from src.common.model import Model
+from src.domain.workspaces.entity.create_task import TaskResponse
+
+
+DEFAULT_TASK_LIMIT = 50
+MAX_TASK_LIMIT = 200
+
+
+class TaskPagination(Model):
+    # a group's nextCursor, the page continues after that task's position
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+
+    def page_size(self) -> int:
+        if not self.limit or self.limit < 1:
+            return DEFAULT_TASK_LIMIT
+        return min(self.limit, MAX_TASK_LIMIT)
+
+
+class ListGroupTasks(Model):
+    workspaceId: int
+    groupId: int
+    cursor: Optional[str] = None
+    limit: int = DEFAULT_TASK_LIMIT
+    fields: Optional[list[str]] = None
+
+
+class GroupTasksResponse(Model):
+    groupId: int
+    tasks: list[TaskResponse]
+    nextCursor: Optional[str]
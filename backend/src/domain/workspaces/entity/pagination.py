@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Literal, Optional, Union
 from src.common.model import Model
 
 from src.domain.workspaces.entity.create import WorkspaceResponse
@@ -7,7 +7,14 @@ from src.domain.workspaces.entity.create import WorkspaceResponse
 class WorkspacePagination(Model):
     limit: Union[int, None] = None
     lastId: Union[int, None] = None
+    cursor: Optional[str] = None
+    sort: Literal["id", "name", "recent"] = "id"
+    withTotal: bool = False
+    # typeahead: only the workspaces most like q, best first, in a single page
+    q: Optional[str] = None
 
 
 class WorkspacePaginationResponse(Model):
     workspaces: list[WorkspaceResponse]
+    nextCursor: Optional[str] = None
+    total: Optional[int] = None
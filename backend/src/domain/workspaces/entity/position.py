@@ -0,0 +1,25 @@
+from typing import Optional
+
+from src.common.model import Model
+
+
+class MoveTaskPayload(Model):
+    # the neighbours the task lands between, a missing one is looked up, none
+    # at all puts the task last
+    afterTaskId: Optional[int] = None
+    beforeTaskId: Optional[int] = None
+    toGroupId: Optional[int] = None
+
+
+class MoveTask(Model):
+    workspaceId: int
+    taskId: int
+    afterTaskId: Optional[int] = None
+    beforeTaskId: Optional[int] = None
+    toGroupId: Optional[int] = None
+
+
+class TaskPositionResponse(Model):
+    taskId: int
+    groupId: int
+    position: str
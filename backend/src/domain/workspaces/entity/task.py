@@ -1,5 +1,6 @@
 from typing import Optional, Union
 from src.common.model import Model
+from src.domain.workspaces.entity.create_task import CreateTaskPayload
 import datetime
 
 
@@ -12,6 +13,12 @@ class CreateTask(Model):
     assignedToUserId: Optional[int]
 
 
+class CreateTasks(Model):
+    workspaceId: int
+    groupId: int
+    tasks: list[CreateTaskPayload]
+
+
 class UpdateTask(Model):
     workspaceId: int
     groupId: int
@@ -26,4 +33,5 @@ class DeleteTask(Model):
     taskId: int
 
 class GetTaskById(Model):
-    taskId: int
\ No newline at end of file
+    taskId: int
+    fields: Optional[list[str]] = None
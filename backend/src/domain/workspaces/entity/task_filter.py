@@ -0,0 +1,39 @@
+import datetime
+from typing import Literal, Optional, Union
+
+from src.common.model import Model
+
+
+DEFAULT_TASK_LIMIT = 50
+MAX_TASK_LIMIT = 200
+
+
+class TaskFilter(Model):
+    # "me" or an account id
+    assignee: Optional[Union[Literal["me"], int]] = None
+    # due at or after dueAfter and before dueBefore, either one leaves out undated tasks
+    dueBefore: Optional[datetime.datetime] = None
+    dueAfter: Optional[datetime.datetime] = None
+    workspaceId: Optional[int] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    def page_size(self) -> int:
+        if not self.limit or self.limit < 1:
+            return DEFAULT_TASK_LIMIT
+        return min(self.limit, MAX_TASK_LIMIT)
+
+
+class TaskFilterResult(Model):
+    taskId: int
+    workspaceId: int
+    groupId: int
+    title: str
+    description: Optional[str] = None
+    dueDate: Optional[datetime.datetime] = None
+    assignedToUserId: Optional[int] = None
+
+
+class TaskFilterResponse(Model):
+    tasks: list[TaskFilterResult]
+    nextCursor: Optional[str] = None
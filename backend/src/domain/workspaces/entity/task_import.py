@@ -0,0 +1,21 @@
+from typing import Literal
+
+from src.common.model import Model
+
+# one field per column of a CSV import, or key of an NDJSON line
+IMPORT_FIELDS = ("group", "title", "description", "dueDate", "assignee")
+
+
+class ImportTasks(Model):
+    workspaceId: int
+    format: Literal["csv", "ndjson"] = "csv"
+
+
+class TaskImportError(Model):
+    line: int
+    error: str
+
+
+class TaskImportResponse(Model):
+    imported: int
+    durationMs: int
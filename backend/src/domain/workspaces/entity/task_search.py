@@ -0,0 +1,43 @@
+import datetime
+from typing import Literal, Optional, Union
+
+from src.common.model import Model
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# words of q past this are ignored
+MAX_SEARCH_WORDS = 8
+
+
+class TaskSearchQuery(Model):
+    q: str
+    workspaceId: Optional[int] = None
+    groupId: Optional[int] = None
+    # "me" or an account id
+    assignee: Optional[Union[Literal["me"], int]] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    def page_size(self) -> int:
+        if not self.limit or self.limit < 1:
+            return DEFAULT_SEARCH_LIMIT
+        return min(self.limit, MAX_SEARCH_LIMIT)
+
+
+class TaskSearchResult(Model):
+    taskId: int
+    workspaceId: int
+    groupId: int
+    title: str
+    description: Optional[str] = None
+    dueDate: Optional[datetime.datetime] = None
+    assignedToUserId: Optional[int] = None
+    rank: float
+    # false for the matches past the newest ranked ones, which follow newest first
+    ranked: bool = True
+
+
+class TaskSearchResponse(Model):
+    tasks: list[TaskSearchResult]
+    nextCursor: Optional[str] = None
@@ -0,0 +1,91 @@
+"""Imports tasks from a CSV or NDJSON file straight into a workspace.
+
+    python -m src.domain.workspaces.interfaces.cli.import_tasks \\
+        --username alice --workspace-id 3 tasks.csv
+
+Rows name their group, the columns (or keys) are group, title, description,
+dueDate and assignee (a username). Runs the same import as
+POST /workspaces/{workspaceId}/tasks:import, acting as --username.
+"""
+import argparse
+import json
+import sys
+import time
+
+import dotenv
+
+from src.common.config import Config
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.exception import (
+    InvalidTaskImport,
+    TaskImportRejected,
+    WorkspaceNotFound,
+)
+from src.domain.workspaces.entity.task_import import ImportTasks
+from src.infrastructure.container import Container
+from migrations.schema import Account
+
+
+def _acting_as(container: Container, username: str) -> TokenPayload:
+    with container.repository.session() as session:
+        account = session.query(Account).where(Account.username == username).first()
+        if not account:
+            raise SystemExit(f"No account named {username}")
+        return TokenPayload(
+            tenant_id=account.tenant_id, id=account.account_id, username=username
+        )
+
+
+def main():
+    dotenv.load_dotenv()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--username", required=True, help="account the tasks are created by")
+    parser.add_argument("--workspace-id", type=int, required=True)
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="defaults from the file extension, csv unless .ndjson or .jsonl",
+    )
+    args = parser.parse_args()
+    format = args.format or (
+        "ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv"
+    )
+
+    container = Container(Config.from_env())
+    started = time.perf_counter()
+
+    def progress(rows: int):
+        rate = rows / max(time.perf_counter() - started, 1e-9)
+        print(f"staged {rows} rows ({rate:.0f} rows/s)", file=sys.stderr)
+
+    try:
+        with open(args.file, "rb") as stream:
+            result = container.workspace_usecase.import_tasks(
+                _acting_as(container, args.username),
+                ImportTasks(workspaceId=args.workspace_id, format=format),
+                stream,
+                progress,
+            )
+    except (InvalidTaskImport, WorkspaceNotFound) as exc:
+        raise SystemExit(exc.message)
+    except TaskImportRejected as exc:
+        for error in exc.errors:
+            print(f"line {error.line}: {error.error}", file=sys.stderr)
+        raise SystemExit(f"{exc.total} invalid rows, nothing was imported")
+    finally:
+        container.close()
+
+    print(
+        json.dumps(
+            {
+                **result.model_dump(),
+                "rowsPerSecond": round(result.imported / max(result.durationMs, 1) * 1000),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
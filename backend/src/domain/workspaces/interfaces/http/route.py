@@ -1,41 +1,79 @@
 import datetime
-from typing import Annotated, Union
+import io
+from typing import Annotated, Literal, Optional, Union
 from src.common.model import Model
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from src.domain.workspaces.entity.update_group import (
     UpdateGroupPayload,
     UpdateGroupRequest,
     UpdateGroupResponse,
 )
+from src.domain.workspaces.entity.bulk_task import (
+    BulkTaskResponse,
+    DeleteTasks,
+    DeleteTasksPayload,
+    MoveTasks,
+    MoveTasksPayload,
+)
 from src.domain.workspaces.entity.create_task import (
+    CreateTaskBatchPayload,
     CreateTaskPayload,
+    TaskBatchResponse,
     TaskResponse,
 )
+from src.domain.workspaces.entity.clone import (
+    CloneWorkspace,
+    CloneWorkspacePayload,
+    CloneWorkspaceResponse,
+)
 from src.domain.workspaces.entity.create import WorkspaceRequest, WorkspaceResponse
+from src.domain.workspaces.entity.position import (
+    MoveTask,
+    MoveTaskPayload,
+    TaskPositionResponse,
+)
 from src.domain.workspaces.entity.list_group import (
     GroupByWorkspaceRequest,
     GroupByWorkspaceResponse,
 )
 from src.domain.workspaces.entity.task import (
     CreateTask,
+    CreateTasks,
     DeleteTask,
     GetTaskById,
     UpdateTask,
 )
+from src.domain.workspaces.entity.fields import TaskFieldset
+from src.domain.workspaces.entity.task_import import ImportTasks, TaskImportResponse
+from src.domain.workspaces.entity.list_task import (
+    GroupTasksResponse,
+    ListGroupTasks,
+    TaskPagination,
+)
 from src.domain.workspaces.entity.pagination import (
     WorkspacePagination,
     WorkspacePaginationResponse,
 )
+from src.infrastructure.container import get_board_events, get_workspace_usecase
+from src.infrastructure.http.idempotency import IdempotentRoute
+from src.infrastructure.http.stream import BlockingBodyReader
+from src.infrastructure.observability.logger import get_logger
+from src.infrastructure.realtime.boardEvents import BoardEvents
 from src.infrastructure.http.guarded import get_current_user
 from src.common.token import TokenPayload
 from src.domain.workspaces.usecase.workspace import WorkspaceUsecase
 
-router = APIRouter(prefix="/workspaces", tags=["workspaces"])
+router = APIRouter(
+    prefix="/workspaces", tags=["workspaces"], route_class=IdempotentRoute
+)
+logger = get_logger(__name__)
 
 
 @router.get("/")
 def list_workspaces(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     pagination: Annotated[WorkspacePagination, Depends()],
 ) -> WorkspacePaginationResponse:
@@ -44,27 +82,136 @@ def list_workspaces(
 
 @router.post("/")
 def create_workspace(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspace: WorkspaceRequest,
 ) -> WorkspaceResponse:
     return workspace_usecase.create_workspace(auth, workspace)
 
 
-@router.get("/by-name/{workspace}")
+@router.post("/{workspaceId}/clone")
+def clone_workspace(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    payload: CloneWorkspacePayload,
+) -> CloneWorkspaceResponse:
+    return workspace_usecase.clone_workspace(
+        auth, CloneWorkspace(workspaceId=workspaceId, **payload.model_dump())
+    )
+
+
+@router.get("/by-name/{workspace}", response_model_exclude_unset=True)
 def get_workspace_by_name(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspace: str,
+    fieldset: Annotated[TaskFieldset, Depends()],
+    pagination: Annotated[TaskPagination, Depends()],
 ) -> GroupByWorkspaceResponse:
     return workspace_usecase.workspace_detail(
-        auth, GroupByWorkspaceRequest(name=workspace)
+        auth,
+        GroupByWorkspaceRequest(
+            name=workspace,
+            limit=pagination.page_size(),
+            fields=fieldset.selected(),
+        ),
+    )
+
+
+@router.patch("/{workspaceId}/tasks:move")
+def move_tasks(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    payload: MoveTasksPayload,
+) -> BulkTaskResponse:
+    return workspace_usecase.move_tasks(
+        auth, MoveTasks(workspaceId=workspaceId, **payload.model_dump())
+    )
+
+
+@router.put("/{workspaceId}/tasks/{taskId}/position")
+def move_task(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    taskId: int,
+    payload: MoveTaskPayload,
+) -> TaskPositionResponse:
+    return workspace_usecase.move_task(
+        auth, MoveTask(workspaceId=workspaceId, taskId=taskId, **payload.model_dump())
+    )
+
+
+@router.post("/{workspaceId}/tasks:import")
+async def import_tasks(
+    request: Request,
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+) -> TaskImportResponse:
+    """streams a CSV or NDJSON body into the workspace, the format defaults
+    from the content type"""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    def progress(rows: int):
+        logger.info(
+            "task import progress",
+            extra={"fields": {"workspaceId": workspaceId, "rows": rows}},
+        )
+
+    return await run_in_threadpool(
+        workspace_usecase.import_tasks,
+        auth,
+        ImportTasks(workspaceId=workspaceId, format=format),
+        io.BufferedReader(BlockingBodyReader(request.stream())),
+        progress,
+    )
+
+
+@router.get("/{workspaceId}/events")
+async def board_events(
+    request: Request,
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    events: Annotated[BoardEvents, Depends(get_board_events)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    lastEventId: Optional[int] = None,
+) -> StreamingResponse:
+    """server-sent events for changes to the workspace's board, resuming after
+    the Last-Event-ID header (or lastEventId) when reconnecting"""
+    await run_in_threadpool(workspace_usecase.ensure_workspace, auth, workspaceId)
+    await run_in_threadpool(events.start)
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id is not None:
+        lastEventId = int(last_event_id) if last_event_id.isdigit() else 0
+    return StreamingResponse(
+        events.stream(workspaceId, lastEventId),
+        media_type="text/event-stream",
+        # proxies must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/{workspaceId}/tasks")
+def delete_tasks(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    payload: DeleteTasksPayload,
+) -> BulkTaskResponse:
+    return workspace_usecase.delete_tasks(
+        auth, DeleteTasks(workspaceId=workspaceId, **payload.model_dump())
     )
 
 
 @router.put("/{workspaceId}/groups/{groupId}")
 def update_group(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspaceId: int,
     groupId: int,
@@ -80,7 +227,7 @@ def update_group(
 
 @router.post("/{workspaceId}/groups/{groupId}/tasks")
 def create_task(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspaceId: int,
     groupId: int,
@@ -93,6 +240,41 @@ def create_task(
     )
 
 
+@router.post("/{workspaceId}/groups/{groupId}/tasks/batch")
+def create_tasks(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    groupId: int,
+    batch: CreateTaskBatchPayload,
+) -> TaskBatchResponse:
+    return workspace_usecase.create_tasks(
+        auth,
+        CreateTasks(workspaceId=workspaceId, groupId=groupId, tasks=batch.tasks),
+    )
+
+
+@router.get("/{workspaceId}/groups/{groupId}/tasks", response_model_exclude_unset=True)
+def list_group_tasks(
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    workspaceId: int,
+    groupId: int,
+    fieldset: Annotated[TaskFieldset, Depends()],
+    pagination: Annotated[TaskPagination, Depends()],
+) -> GroupTasksResponse:
+    return workspace_usecase.list_group_tasks(
+        auth,
+        ListGroupTasks(
+            workspaceId=workspaceId,
+            groupId=groupId,
+            cursor=pagination.cursor,
+            limit=pagination.page_size(),
+            fields=fieldset.selected(),
+        ),
+    )
+
+
 class UpdateTaskPayload(Model):
     title: Union[str, None] = None
     description: Union[str, None] = None
@@ -103,7 +285,7 @@ class UpdateTaskPayload(Model):
 
 @router.patch("/{workspaceId}/groups/{groupId}/tasks/{taskId}")
 def update_task(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspaceId: int,
     groupId: int,
@@ -122,20 +304,25 @@ def update_task(
     )
 
 
-@router.get("/{workspaceId}/groups/{groupId}/tasks/{taskId}")
+@router.get(
+    "/{workspaceId}/groups/{groupId}/tasks/{taskId}", response_model_exclude_unset=True
+)
 def get_task(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspaceId: int,
     groupId: int,
     taskId: int,
+    fieldset: Annotated[TaskFieldset, Depends()],
 ) -> TaskResponse:
-    return workspace_usecase.get_task(auth, GetTaskById(taskId=taskId))
+    return workspace_usecase.get_task(
+        auth, GetTaskById(taskId=taskId, fields=fieldset.selected())
+    )
 
 
 @router.delete("/{workspaceId}/groups/{groupId}/tasks/{taskId}", status_code=204)
 def delete_task(
-    workspace_usecase: Annotated[WorkspaceUsecase, Depends(WorkspaceUsecase)],
+    workspace_usecase: Annotated[WorkspaceUsecase, Depends(get_workspace_usecase)],
     auth: Annotated[TokenPayload, Depends(get_current_user)],
     workspaceId: int,
     groupId: int,
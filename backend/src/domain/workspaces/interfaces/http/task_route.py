@@ -0,0 +1,36 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.task_filter import TaskFilter, TaskFilterResponse
+from src.domain.workspaces.entity.task_search import (
+    TaskSearchQuery,
+    TaskSearchResponse,
+)
+from src.domain.workspaces.usecase.task_query import TaskQueryUsecase
+from src.infrastructure.container import get_task_query_usecase
+from src.infrastructure.http.guarded import get_current_user
+from src.infrastructure.http.request_log import TimedRoute
+
+router = APIRouter(prefix="/tasks", tags=["tasks"], route_class=TimedRoute)
+
+
+@router.get("")
+def list_tasks(
+    task_query_usecase: Annotated[TaskQueryUsecase, Depends(get_task_query_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    task_filter: Annotated[TaskFilter, Depends()],
+) -> TaskFilterResponse:
+    """the tenant's tasks across workspaces by due date, "my tasks" with assignee=me"""
+    return task_query_usecase.list_tasks(auth, task_filter)
+
+
+@router.get("/search")
+def search_tasks(
+    task_query_usecase: Annotated[TaskQueryUsecase, Depends(get_task_query_usecase)],
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    query: Annotated[TaskSearchQuery, Depends()],
+) -> TaskSearchResponse:
+    """full text search over the titles and descriptions of the tenant's tasks"""
+    return task_query_usecase.search(auth, query)
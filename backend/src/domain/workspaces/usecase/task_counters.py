@@ -0,0 +1,287 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import select, text
+
+from migrations.schema import Tenant, Workspaces
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.observability.logger import get_logger
+
+logger = get_logger(__name__)
+
+# held for as long as a worker runs the counter jobs, by its own connection
+_COUNTER_JOBS_LOCK = 0x746374
+
+# both jobs lock the tenant, then the workspaces in id order, then their
+# groups, the order the task_count_rows trigger takes them in
+
+_ADVANCE_OVERDUE = text(
+    """
+    WITH due AS (
+        SELECT group_id, count(*) AS overdue FROM task
+        WHERE tenant_id = :tenant_id AND due_date >= :since AND due_date < :until
+        GROUP BY group_id
+    ), groups AS (
+        UPDATE "group" g SET overdue_task_count = g.overdue_task_count + due.overdue
+        FROM due WHERE g.group_id = due.group_id
+        RETURNING g.workspace_id, due.overdue
+    )
+    UPDATE workspace w SET overdue_task_count = w.overdue_task_count + s.overdue
+    FROM (SELECT workspace_id, sum(overdue) AS overdue FROM groups GROUP BY workspace_id) s
+    WHERE w.workspace_id = s.workspace_id
+    RETURNING s.overdue
+    """
+)
+
+_LOCK_DUE_WORKSPACES = text(
+    """
+    SELECT workspace_id FROM workspace WHERE workspace_id IN (
+        SELECT g.workspace_id FROM "group" g JOIN task t USING (group_id)
+        WHERE t.tenant_id = :tenant_id AND t.due_date >= :since AND t.due_date < :until
+    )
+    ORDER BY workspace_id FOR NO KEY UPDATE
+    """
+)
+
+_RECOUNT_GROUPS = text(
+    """
+    WITH counted AS (
+        SELECT g.group_id,
+            count(t.task_id) AS tasks,
+            count(t.assigned_to_user_id) AS assigned,
+            count(*) FILTER (WHERE t.due_date < :horizon) AS overdue
+        FROM "group" g LEFT JOIN task t USING (group_id)
+        WHERE g.workspace_id = :workspace_id
+        GROUP BY g.group_id
+    )
+    UPDATE "group" g SET
+        task_count = c.tasks,
+        assigned_task_count = c.assigned,
+        overdue_task_count = c.overdue
+    FROM counted c
+    WHERE g.group_id = c.group_id
+        AND (g.task_count, g.assigned_task_count, g.overdue_task_count)
+            IS DISTINCT FROM (c.tasks, c.assigned, c.overdue)
+    RETURNING g.group_id
+    """
+)
+
+_RECOUNT_WORKSPACE = text(
+    """
+    UPDATE workspace w SET
+        task_count = s.tasks,
+        assigned_task_count = s.assigned,
+        overdue_task_count = s.overdue
+    FROM (
+        SELECT coalesce(sum(task_count), 0) AS tasks,
+            coalesce(sum(assigned_task_count), 0) AS assigned,
+            coalesce(sum(overdue_task_count), 0) AS overdue
+        FROM "group" WHERE workspace_id = :workspace_id
+    ) s
+    WHERE w.workspace_id = :workspace_id
+        AND (w.task_count, w.assigned_task_count, w.overdue_task_count)
+            IS DISTINCT FROM (s.tasks, s.assigned, s.overdue)
+    RETURNING w.workspace_id
+    """
+)
+
+
+class TaskCounterUsecase:
+    """keeps the task counters of groups and workspaces right over time.
+
+    The task_count_rows trigger keeps them in step with every task change, a
+    task counting as overdue when due before its tenant's overdue_horizon.
+    `advance_overdue` moves the horizon up to now every
+    `overdue_interval_seconds`, adding the tasks that went past due since.
+    `reconcile` recounts every workspace every `reconcile_interval_seconds`
+    and repairs what drifted, which a trigger-maintained counter should
+    never do. Both run on one worker only, the one whose dedicated
+    connection holds the _COUNTER_JOBS_LOCK session lock. The others try to
+    take the lock every `overdue_interval_seconds`, so the jobs move on when
+    that worker exits.
+    """
+
+    __repository: Repository
+    __lock: threading.Lock
+    __thread: Optional[threading.Thread]
+
+    def __init__(
+        self,
+        repository: Repository,
+        overdue_interval_seconds: float = 60,
+        reconcile_interval_seconds: float = 60 * 60,
+    ):
+        self.__repository = repository
+        self.__overdue_interval = overdue_interval_seconds
+        self.__reconcile_interval = reconcile_interval_seconds
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__closing = threading.Event()
+        self.__leading = False
+        self.__advanced = 0
+        self.__reconciled = 0
+        self.__repaired = 0
+
+    def start(self) -> None:
+        """starts the thread running the jobs once"""
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="task-counters", daemon=True
+                )
+                self.__thread.start()
+
+    def close(self) -> None:
+        self.__closing.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=5)
+
+    def advance_overdue(self) -> int:
+        """moves every tenant's overdue horizon up to now, each in its own
+        transaction, returns the tasks that became overdue"""
+        with self.__repository.session() as session:
+            tenant_ids = session.scalars(
+                select(Tenant.tenant_id).order_by(Tenant.tenant_id)
+            ).all()
+        advanced = 0
+        for tenant_id in tenant_ids:
+            with self.__repository.session() as session:
+                # holds off the triggers counting against the old horizon
+                row = session.execute(
+                    text(
+                        "SELECT overdue_horizon, now() AS until FROM tenant "
+                        "WHERE tenant_id = :tenant_id FOR UPDATE"
+                    ),
+                    {"tenant_id": tenant_id},
+                ).one_or_none()
+                if row is None or row.overdue_horizon >= row.until:
+                    continue
+                window = {
+                    "tenant_id": tenant_id,
+                    "since": row.overdue_horizon,
+                    "until": row.until,
+                }
+                session.execute(_LOCK_DUE_WORKSPACES, window)
+                advanced += sum(session.scalars(_ADVANCE_OVERDUE, window).all())
+                session.execute(
+                    text(
+                        "UPDATE tenant SET overdue_horizon = :until "
+                        "WHERE tenant_id = :tenant_id"
+                    ),
+                    window,
+                )
+        with self.__lock:
+            self.__advanced += advanced
+        return advanced
+
+    def reconcile(self) -> int:
+        """recounts every workspace, each in its own transaction, returns the
+        groups and workspaces whose counters were repaired"""
+        with self.__repository.session() as session:
+            workspaces = session.execute(
+                select(Workspaces.workspace_id, Workspaces.tenant_id).order_by(
+                    Workspaces.workspace_id
+                )
+            ).all()
+        repaired = 0
+        for workspace_id, tenant_id in workspaces:
+            with self.__repository.session() as session:
+                horizon = session.scalar(
+                    text(
+                        "SELECT overdue_horizon FROM tenant "
+                        "WHERE tenant_id = :tenant_id FOR KEY SHARE"
+                    ),
+                    {"tenant_id": tenant_id},
+                )
+                locked = session.scalar(
+                    text(
+                        "SELECT workspace_id FROM workspace "
+                        "WHERE workspace_id = :workspace_id FOR NO KEY UPDATE"
+                    ),
+                    {"workspace_id": workspace_id},
+                )
+                if horizon is None or locked is None:
+                    continue
+                groups = session.scalars(
+                    _RECOUNT_GROUPS, {"workspace_id": workspace_id, "horizon": horizon}
+                ).all()
+                workspace = session.scalars(
+                    _RECOUNT_WORKSPACE, {"workspace_id": workspace_id}
+                ).all()
+            if groups or workspace:
+                repaired += len(groups) + len(workspace)
+                logger.warning(
+                    "task counters repaired",
+                    extra={
+                        "fields": {
+                            "workspaceId": workspace_id,
+                            "groups": len(groups),
+                        }
+                    },
+                )
+        with self.__lock:
+            self.__reconciled += len(workspaces)
+            self.__repaired += repaired
+        return repaired
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "leading": self.__leading,
+                "overdueAdvanced": self.__advanced,
+                "workspacesReconciled": self.__reconciled,
+                "countersRepaired": self.__repaired,
+            }
+
+    def __run(self) -> None:
+        connection = None
+        next_overdue = next_reconcile = 0.0
+        while not self.__closing.is_set():
+            try:
+                if connection is None:
+                    connection = self.__lead()
+                    # the last worker to lead recounted a moment ago, or the
+                    # counters were just migrated
+                    next_reconcile = time.monotonic() + self.__reconcile_interval
+                else:
+                    # the lock lasts as long as the connection
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                if connection is not None:
+                    now = time.monotonic()
+                    if now >= next_overdue:
+                        next_overdue = now + self.__overdue_interval
+                        self.advance_overdue()
+                    if now >= next_reconcile:
+                        next_reconcile = now + self.__reconcile_interval
+                        self.reconcile()
+            except Exception:
+                logger.exception("task counter jobs failed")
+                if connection is not None:
+                    connection.close()
+                    connection = None
+            with self.__lock:
+                self.__leading = connection is not None
+            self.__closing.wait(self.__overdue_interval)
+        if connection is not None:
+            connection.close()
+        with self.__lock:
+            self.__leading = False
+
+    def __lead(self):
+        """a connection holding the jobs lock, None when another worker has it"""
+        connection = self.__repository.dedicated_connection()
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", (_COUNTER_JOBS_LOCK,))
+                (locked,) = cursor.fetchone()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            return None
+        logger.info("running the task counter jobs")
+        return connection
@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator, Optional
+
+from src.domain.workspaces.entity.exception import InvalidTaskImport
+from src.domain.workspaces.entity.task_import import IMPORT_FIELDS
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = value if isinstance(value, str) else str(value)
+    return value if value.strip() else None
+
+
+def read_import_rows(stream: BinaryIO, format: str) -> Iterator[tuple]:
+    """(line, *IMPORT_FIELDS) for each row of the upload, read as it streams in.
+
+    Only the shape of the file is checked here, the values are validated once
+    the rows are staged.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if format == "ndjson":
+        return _ndjson_rows(text)
+    return _csv_rows(text)
+
+
+def _csv_rows(text: io.TextIOWrapper) -> Iterator[tuple]:
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        raise InvalidTaskImport("The CSV upload is empty")
+    header = [name.strip() for name in header]
+    unknown = set(header) - set(IMPORT_FIELDS)
+    if unknown:
+        raise InvalidTaskImport(f"Unknown CSV columns: {', '.join(sorted(unknown))}")
+    if "group" not in header or "title" not in header:
+        raise InvalidTaskImport("The CSV header needs group and title columns")
+
+    index = [header.index(name) if name in header else None for name in IMPORT_FIELDS]
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != len(header):
+            raise InvalidTaskImport(
+                f"Line {reader.line_num}: expected {len(header)} columns, got {len(row)}"
+            )
+        yield (reader.line_num, *[None if i is None else _text(row[i]) for i in index])
+
+
+def _ndjson_rows(text: io.TextIOWrapper) -> Iterator[tuple]:
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            raise InvalidTaskImport(f"Line {line}: invalid JSON")
+        if not isinstance(record, dict):
+            raise InvalidTaskImport(f"Line {line}: expected a JSON object")
+        yield (line, *[_text(record.get(name)) for name in IMPORT_FIELDS])
@@ -0,0 +1,281 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Float, cast, false, func, select, true
+
+from migrations.schema import Group, Task
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.exception import InvalidTaskSearch
+from src.domain.workspaces.entity.task_filter import (
+    TaskFilter,
+    TaskFilterResponse,
+    TaskFilterResult,
+)
+from src.domain.workspaces.entity.task_search import (
+    MAX_SEARCH_WORDS,
+    TaskSearchQuery,
+    TaskSearchResponse,
+    TaskSearchResult,
+)
+from src.infrastructure.database.keyset import KeysetOrder
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.security.cursor import CursorCodec
+
+# letters and digits only, so nothing typed can be tsquery syntax
+_WORD = re.compile(r"[^\W_]+")
+
+# task lists go soonest due first, then the undated tasks oldest first
+_DUE_ORDER = KeysetOrder(Task.due_date, Task.task_id)
+
+
+def search_terms(q: str) -> Optional[str]:
+    """the tsquery of q: every word, each one also matching as a prefix"""
+    words = _WORD.findall(q)[:MAX_SEARCH_WORDS]
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+class TaskQueryUsecase:
+    """reads tasks across the tenant's workspaces, without loading any board"""
+
+    __repository: Repository
+    __cursor: CursorCodec
+
+    def __init__(self, repository: Repository, cursor: CursorCodec, candidates: int = 1000):
+        self.__repository = repository
+        self.__cursor = cursor
+        self.__candidates = candidates
+
+    def search(self, auth: TokenPayload, query: TaskSearchQuery) -> TaskSearchResponse:
+        """tasks whose title or description has every word of q, best match
+        first (a match in the title weighs more), then newest.
+
+        Only the newest `candidates` matches are ranked: a word in a quarter of
+        millions of tasks would otherwise rank every one of them to return 20.
+        Those are found walking the primary key backwards for common words and
+        through the GIN index for rare ones, either way in milliseconds. Once
+        the ranked ones run out the cursor carries on through the older
+        matches, newest first and with `ranked` false, so every match can be
+        paged to.
+        """
+        terms = search_terms(query.q)
+        if terms is None:
+            raise InvalidTaskSearch("q needs at least one word")
+        limit = query.page_size()
+        tsquery = func.to_tsquery("simple", terms)
+
+        matches = select(
+            Task.task_id,
+            Task.group_id,
+            Task.title,
+            Task.description,
+            Task.due_date,
+            Task.assigned_to_user_id,
+            Task.search_vector,
+        ).where(
+            Task.tenant_id == auth.tenant_id,
+            Task.search_vector.op("@@")(tsquery),
+        )
+        if query.groupId is not None:
+            matches = matches.where(Task.group_id == query.groupId)
+        if query.workspaceId is not None:
+            matches = matches.where(_in_workspace(auth, query.workspaceId))
+        if query.assignee is not None:
+            matches = matches.where(_assigned_to(auth, query.assignee))
+
+        # a cursor only continues the search it came from, its rank is None
+        # once it is past the ranked matches
+        sort = f"search {terms}"
+        after = self.__cursor.decode(sort, query.cursor) if query.cursor else None
+
+        with self.__repository.session() as session:
+            rows: list = []
+            below = None
+            if after is None or after[0] is not None:
+                rows = self.__ranked(session, matches, tsquery, after, limit)
+                # a short first page is the whole window, it is only full when
+                # the window is smaller than a page
+                if len(rows) <= limit and (after is not None or len(rows) >= self.__candidates):
+                    below = self.__window_end(session, matches)
+            else:
+                below = after[1]
+            if below is not None:
+                rows += self.__older(session, matches, tsquery, below, limit + 1 - len(rows))
+
+        next_cursor = None
+        if len(rows) > limit:
+            last, following = rows[limit - 1], rows[limit]
+            if following.ranked:
+                next_cursor = [last.rank, last.task_id]
+            else:
+                next_cursor = [None, below if last.ranked else last.task_id]
+        return TaskSearchResponse(
+            tasks=[
+                TaskSearchResult(
+                    taskId=row.task_id,
+                    workspaceId=row.workspace_id,
+                    groupId=row.group_id,
+                    title=row.title,
+                    description=row.description,
+                    dueDate=row.due_date,
+                    assignedToUserId=row.assigned_to_user_id,
+                    rank=row.rank,
+                    ranked=row.ranked,
+                )
+                for row in rows[:limit]
+            ],
+            nextCursor=self.__cursor.encode(sort, next_cursor) if next_cursor else None,
+        )
+
+    def __ranked(self, session, matches, tsquery, after: Optional[list], limit: int) -> list:
+        """the page of the newest `candidates` matches, best rank first"""
+        candidates = (
+            matches.order_by(Task.task_id.desc()).limit(self.__candidates).subquery("candidates")
+        )
+        ranked = select(
+            candidates.c.task_id,
+            candidates.c.group_id,
+            candidates.c.title,
+            candidates.c.description,
+            candidates.c.due_date,
+            candidates.c.assigned_to_user_id,
+            # ts_rank is a real, as a double it round trips through the cursor exactly
+            cast(func.ts_rank(candidates.c.search_vector, tsquery), Float).label("rank"),
+        ).subquery("ranked")
+        order = KeysetOrder(ranked.c.rank, ranked.c.task_id, descending=True)
+        page = order.paginate(select(ranked), after, limit).subquery("page")
+        return session.execute(
+            select(page, Group.workspace_id, true().label("ranked"))
+            .join(Group, Group.group_id == page.c.group_id)
+            .order_by(page.c.rank.desc(), page.c.task_id.desc())
+        ).all()
+
+    def __window_end(self, session, matches) -> Optional[int]:
+        """the oldest ranked match's id when older ones may follow it, read
+        once the ranked matches run out"""
+        window = (
+            matches.with_only_columns(Task.task_id)
+            .order_by(Task.task_id.desc())
+            .limit(self.__candidates)
+            .subquery("window")
+        )
+        filled, oldest = session.execute(
+            select(func.count(), func.min(window.c.task_id))
+        ).one()
+        return oldest if filled >= self.__candidates else None
+
+    def __older(self, session, matches, tsquery, below: int, limit: int) -> list:
+        """matches older than the ranked window, newest first"""
+        page = (
+            matches.where(Task.task_id < below)
+            .order_by(Task.task_id.desc())
+            .limit(limit)
+            .subquery("page")
+        )
+        return session.execute(
+            select(
+                page.c.task_id,
+                page.c.group_id,
+                page.c.title,
+                page.c.description,
+                page.c.due_date,
+                page.c.assigned_to_user_id,
+                cast(func.ts_rank(page.c.search_vector, tsquery), Float).label("rank"),
+                Group.workspace_id,
+                false().label("ranked"),
+            )
+            .join(Group, Group.group_id == page.c.group_id)
+            .order_by(page.c.task_id.desc())
+        ).all()
+
+    def list_tasks(self, auth: TokenPayload, task_filter: TaskFilter) -> TaskFilterResponse:
+        """the tenant's tasks across its workspaces, soonest due first, undated last.
+
+        A page walks task_tenant_id_assigned_to_user_id_due_date_idx, or
+        task_tenant_id_due_date_idx without an assignee, from the cursor on
+        and reads about `limit` rows however many tasks the tenant has. The
+        undated tasks are a second walk once the dated ones run out.
+        """
+        limit = task_filter.page_size()
+        after = self.__cursor.decode("due", task_filter.cursor) if task_filter.cursor else None
+
+        stmt = select(
+            Task.task_id,
+            Task.group_id,
+            Task.title,
+            Task.description,
+            Task.due_date,
+            Task.assigned_to_user_id,
+        ).where(Task.tenant_id == auth.tenant_id)
+        if task_filter.assignee is not None:
+            stmt = stmt.where(_assigned_to(auth, task_filter.assignee))
+        if task_filter.workspaceId is not None:
+            stmt = stmt.where(_in_workspace(auth, task_filter.workspaceId))
+        if task_filter.dueAfter is not None:
+            stmt = stmt.where(Task.due_date >= task_filter.dueAfter)
+        if task_filter.dueBefore is not None:
+            stmt = stmt.where(Task.due_date < task_filter.dueBefore)
+        undated = task_filter.dueAfter is None and task_filter.dueBefore is None
+
+        with self.__repository.session() as session:
+            rows = []
+            # a cursor is [due date, task id], with no due date once past the dated tasks
+            if after is None or after[0] is not None:
+                rows = session.execute(
+                    _with_workspace(
+                        _DUE_ORDER.paginate(stmt.where(Task.due_date.isnot(None)), after, limit)
+                    )
+                ).all()
+            if undated and len(rows) <= limit:
+                after_id = after[1] if after is not None and after[0] is None else 0
+                rows += session.execute(
+                    _with_workspace(
+                        stmt.where(Task.due_date.is_(None), Task.task_id > after_id)
+                        # due_date is NULL throughout, ordering by it too keeps
+                        # the walk on the due date index rather than the primary key
+                        .order_by(Task.due_date, Task.task_id)
+                        .limit(limit - len(rows) + 1)
+                    )
+                ).all()
+
+        return TaskFilterResponse(
+            tasks=[
+                TaskFilterResult(
+                    taskId=row.task_id,
+                    workspaceId=row.workspace_id,
+                    groupId=row.group_id,
+                    title=row.title,
+                    description=row.description,
+                    dueDate=row.due_date,
+                    assignedToUserId=row.assigned_to_user_id,
+                )
+                for row in rows[:limit]
+            ],
+            nextCursor=(
+                self.__cursor.encode("due", [rows[limit - 1].due_date, rows[limit - 1].task_id])
+                if len(rows) > limit
+                else None
+            ),
+        )
+
+
+def _in_workspace(auth: TokenPayload, workspace_id: int):
+    return Task.group_id.in_(
+        select(Group.group_id).where(
+            Group.workspace_id == workspace_id,
+            Group.tenant_id == auth.tenant_id,
+        )
+    )
+
+
+def _assigned_to(auth: TokenPayload, assignee):
+    return Task.assigned_to_user_id == (auth.id if assignee == "me" else assignee)
+
+
+def _with_workspace(stmt):
+    # the page first, then the workspace of each of its tasks
+    page = stmt.subquery("page")
+    return (
+        select(page, Group.workspace_id)
+        .join(Group, Group.group_id == page.c.group_id)
+        .order_by(page.c.due_date, page.c.task_id)
+    )
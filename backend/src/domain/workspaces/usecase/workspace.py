@@ -1,30 +1,96 @@
 import datetime
+import time
+from typing import BinaryIO, Callable, Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    Select,
+    String,
+    Table,
+    and_,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import aliased
 
 from src.domain.workspaces.entity.update_group import (
     UpdateGroupRequest,
     UpdateGroupResponse,
 )
-from src.domain.workspaces.entity.create_task import TaskResponse
+from src.domain.workspaces.entity.bulk_task import (
+    BulkTaskResponse,
+    DeleteTasks,
+    MoveTasks,
+)
+from src.domain.workspaces.entity.create_task import (
+    MAX_TASK_BATCH,
+    TaskBatchResponse,
+    TaskResponse,
+)
+from src.domain.workspaces.entity.clone import CloneWorkspace, CloneWorkspaceResponse
 from src.domain.workspaces.entity.create import WorkspaceRequest, WorkspaceResponse
+from src.domain.workspaces.entity.position import MoveTask, TaskPositionResponse
+from src.domain.workspaces.entity.task_import import (
+    ImportTasks,
+    TaskImportError,
+    TaskImportResponse,
+)
+from src.domain.workspaces.usecase.task_import import read_import_rows
 from src.common.token import TokenPayload
+from src.domain.workspaces.entity.list_task import (
+    GroupTasksResponse,
+    ListGroupTasks,
+)
 from src.domain.workspaces.entity.pagination import (
     WorkspacePagination,
     WorkspacePaginationResponse,
 )
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.database.copy import copy_rows
+from src.infrastructure.database.keyset import KeysetOrder
+from src.infrastructure.database.notify import notify_board
+from src.infrastructure.database.outbox import write_outbox
+from src.infrastructure.database.position import (
+    appended_key,
+    key_between,
+    keys_between,
+    spaced_key,
+)
 from src.infrastructure.database.repository import Repository
+from src.infrastructure.database.trigram import trigram_match
+from src.infrastructure.observability.logger import get_logger
+from src.infrastructure.security.cursor import CursorCodec
 from src.domain.workspaces.entity.task import (
     CreateTask,
+    CreateTasks,
     DeleteTask,
     GetTaskById,
     UpdateTask,
 )
 from src.domain.workspaces.entity.exception import (
     GroupNotFound,
+    InvalidTaskBatch,
+    InvalidTaskImport,
+    InvalidTaskPosition,
+    TaskImportRejected,
     TaskNotFound,
     WorkspaceAlreadyExists,
     WorkspaceNotFound,
 )
-from migrations.schema import Account, Group, Workspaces, Task
+from migrations.schema import Account, Group, Tenant, Workspaces, Task
 from src.domain.workspaces.entity.list_group import (
     GroupByWorkspaceRequest,
     GroupByWorkspaceResponse,
@@ -32,29 +98,218 @@ from src.domain.workspaces.entity.list_group import (
     TaskResponse,
 )
 
+logger = get_logger(__name__)
+
+
+# TaskResponse field -> selected column, so sparse fieldsets never read the
+# columns the client did not ask for
+_TASK_COLUMNS = {
+    "title": Task.title,
+    "description": Task.description,
+    "dueDate": Task.due_date,
+    "assignedToUserId": Task.assigned_to_user_id,
+    "assignedTo": Account.full_name,
+    "createdAt": Task.created_at,
+    "updatedAt": Task.updated_at,
+    "createdBy": Task.created_by,
+    "updatedBy": Task.updated_by,
+}
+
+
+def _task_names(fields: Optional[list[str]]) -> list[str]:
+    return [name for name in (fields or _TASK_COLUMNS) if name in _TASK_COLUMNS]
+
+
+def _select_tasks(fields: Optional[list[str]]) -> Select:
+    names = _task_names(fields)
+    stmt = select(
+        Task.task_id,
+        Task.group_id,
+        Task.tenant_id,
+        Task.position,
+        *[_TASK_COLUMNS[name].label(name) for name in names],
+    )
+    if "assignedTo" in names:
+        stmt = stmt.outerjoin(Account, Task.assigned_to_user_id == Account.account_id)
+    return stmt
+
+
+def _task_response(row, fields: Optional[list[str]]) -> TaskResponse:
+    return TaskResponse(
+        taskId=row.task_id, **{name: getattr(row, name) for name in _task_names(fields)}
+    )
+
+
+def _task_page(
+    rows: list, limit: int, fields: Optional[list[str]], cursor: CursorCodec
+):
+    """rows are fetched with limit + 1 so the extra row tells if there is a next page.
+
+    The cursor carries the last row's (position, task_id) rather than its id,
+    so the next page follows on even once that task was moved or deleted.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = cursor.encode("position", _GROUP_TASK_ORDER.values(rows[limit - 1]))
+    return [_task_response(row, fields) for row in rows[:limit]], next_cursor
+
+
+def _task_counters(row) -> dict:
+    """the response fields of a workspace's or group's counters, read with the row"""
+    return {
+        "taskCount": row.task_count,
+        "assignedTaskCount": row.assigned_task_count,
+        "overdueTaskCount": row.overdue_task_count,
+    }
+
+
+def _task_change(
+    task_id: int,
+    group_id: int,
+    title: str,
+    description: Optional[str],
+    due_date: Optional[datetime.datetime],
+    assigned_to_user_id: Optional[int],
+) -> dict:
+    """a created or updated task as written to the outbox"""
+    return {
+        "taskId": task_id,
+        "groupId": group_id,
+        "title": title,
+        "description": description,
+        "dueDate": due_date,
+        "assignedToUserId": assigned_to_user_id,
+    }
+
+
+# moves of a group share this advisory lock, appends and rebalances take it alone
+_POSITION_LOCK = 0x706F73
+
+
+def _lock_positions(session, group_id: int) -> None:
+    """the group's position lock alone, until the transaction ends"""
+    session.execute(select(func.pg_advisory_xact_lock(_POSITION_LOCK, group_id)))
+
+
+def _last_position(session, group_id: int) -> Optional[str]:
+    """one backward step on the (group_id, position) index.
+
+    Locks the group's positions first, so no other append gets the same key
+    and no rebalance rewrites the keys before the caller's commit.
+    """
+    _lock_positions(session, group_id)
+    return session.scalar(
+        select(Task.position)
+        .where(Task.group_id == group_id)
+        .order_by(Task.position.desc())
+        .limit(1)
+    )
+
+
+def _bulk_selection(
+    workspace_id: int, task_ids: Optional[list[int]], group_id: Optional[int]
+):
+    """tasks of the workspace picked by id, or every task of one of its groups"""
+    if (task_ids is None) == (group_id is None):
+        raise InvalidTaskBatch("Pass either taskIds or a group, not both")
+    if task_ids is not None and not task_ids:
+        raise InvalidTaskBatch("taskIds is empty")
+    if task_ids is not None and len(task_ids) > MAX_TASK_BATCH:
+        raise InvalidTaskBatch(f"At most {MAX_TASK_BATCH} taskIds at once")
+
+    conditions = [
+        Task.group_id == Group.group_id,
+        Group.workspace_id == workspace_id,
+    ]
+    if task_ids is not None:
+        conditions.append(Task.task_id.in_(task_ids))
+    else:
+        conditions.append(Task.group_id == group_id)
+    return conditions
+
+
+# a group's tasks in board order, see _task_page
+_GROUP_TASK_ORDER = KeysetOrder(Task.position, Task.task_id)
+
+_WORKSPACE_ORDERS = {
+    "id": KeysetOrder(Workspaces.workspace_id),
+    "name": KeysetOrder(Workspaces.name),
+    "recent": KeysetOrder(
+        Workspaces.created_at, Workspaces.workspace_id, descending=True
+    ),
+}
+
+
+# imported rows land here first, one temporary table per import transaction
+_STAGED_TASKS = Table(
+    "task_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("group_name", String),
+    Column("title", String),
+    Column("description", String),
+    Column("due_date", String),
+    Column("assignee", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+MAX_IMPORT_ERRORS = 20
+
 
 class WorkspaceUsecase:
     __repository: Repository
+    __cursor: CursorCodec
+    __jobs: JobQueue
 
-    def __init__(self):
-        self.__repository = Repository()
+    def __init__(
+        self,
+        repository: Repository,
+        cursor: CursorCodec,
+        jobs: JobQueue,
+        position_max_length: int,
+        import_chunk_rows: int,
+    ):
+        self.__repository = repository
+        self.__cursor = cursor
+        self.__jobs = jobs
+        self.__position_max_length = position_max_length
+        self.__import_chunk_rows = import_chunk_rows
 
     def list_workspaces(
         self, auth: TokenPayload, pagination: WorkspacePagination
     ) -> WorkspacePaginationResponse:
-        print("here on list workspace")
+        logger.debug(
+            "list workspaces",
+            extra={"fields": {"tenantId": auth.tenant_id, "sort": pagination.sort}},
+        )
+        order = _WORKSPACE_ORDERS[pagination.sort]
+        limit = pagination.limit if pagination.limit else 10
+        after = None
+        if pagination.cursor:
+            after = self.__cursor.decode(pagination.sort, pagination.cursor)
+        elif pagination.lastId and pagination.sort == "id":
+            after = [pagination.lastId]
+
         with self.__repository.session() as session:
-            workspaces = (
-                session.query(Workspaces)
-                .where(
-                    Workspaces.tenant_id == auth.tenant_id,
-                    Workspaces.workspace_id
-                    > (pagination.lastId if pagination.lastId else 0),
+            query = session.query(Workspaces).where(Workspaces.tenant_id == auth.tenant_id)
+            if pagination.q and pagination.q.strip():
+                matches, similarity = trigram_match(pagination.q.strip(), Workspaces.name)
+                workspaces = (
+                    query.where(matches)
+                    .order_by(similarity.desc(), Workspaces.workspace_id)
+                    .limit(limit)
+                    .all()
+                )
+            else:
+                workspaces = order.paginate(query, after, limit).all()
+
+            total = None
+            if pagination.withTotal:
+                total = (
+                    session.query(Tenant.workspace_count)
+                    .where(Tenant.tenant_id == auth.tenant_id)
+                    .scalar()
                 )
-                .order_by(Workspaces.workspace_id)
-                .limit(pagination.limit if pagination.limit else 10)
-                .all()
-            )
 
             return WorkspacePaginationResponse(
                 workspaces=[
@@ -65,9 +320,18 @@ class WorkspaceUsecase:
                         updatedAt=workspace.updated_at,
                         createdBy=workspace.created_by,
                         updatedBy=workspace.updated_by,
+                        **_task_counters(workspace),
+                    )
+                    for workspace in workspaces[:limit]
+                ],
+                nextCursor=(
+                    self.__cursor.encode(
+                        pagination.sort, order.values(workspaces[limit - 1])
                     )
-                    for workspace in workspaces
-                ]
+                    if len(workspaces) > limit
+                    else None
+                ),
+                total=total,
             )
 
     def create_workspace(
@@ -96,6 +360,14 @@ class WorkspaceUsecase:
                     created_by=auth.id,
                 )
                 session.add(group)
+            write_outbox(
+                session,
+                auth.tenant_id,
+                new_workspace.workspace_id,
+                "workspace",
+                "workspace.created",
+                [{"workspaceId": new_workspace.workspace_id, "name": new_workspace.name}],
+            )
 
             return WorkspaceResponse(
                 workspaceId=new_workspace.workspace_id,
@@ -106,10 +378,119 @@ class WorkspaceUsecase:
                 updatedBy=new_workspace.updated_by,
             )
 
+    def clone_workspace(
+        self, auth: TokenPayload, payload: CloneWorkspace
+    ) -> CloneWorkspaceResponse:
+        """copies a workspace's groups, and optionally its tasks, into a new
+        workspace of the caller without the rows leaving the database"""
+        with self.__repository.session() as session:
+            self.__ensure_workspace(session, auth, payload.workspaceId)
+            if session.query(Workspaces).where(
+                Workspaces.name == payload.name,
+                Workspaces.tenant_id == auth.tenant_id,
+            ).first():
+                raise WorkspaceAlreadyExists()
+
+            new_workspace = Workspaces(
+                name=payload.name, tenant_id=auth.tenant_id, created_by=auth.id
+            )
+            session.add(new_workspace)
+            session.flush()
+
+            # groups then tasks in one statement, new groups are matched to the
+            # source ones by name, which is unique within a workspace
+            new_groups = (
+                insert(Group)
+                .from_select(
+                    ["tenant_id", "workspace_id", "name", "created_by"],
+                    select(
+                        literal(auth.tenant_id),
+                        literal(new_workspace.workspace_id),
+                        Group.name,
+                        literal(auth.id),
+                    )
+                    .where(Group.workspace_id == payload.workspaceId)
+                    .order_by(Group.group_id),
+                )
+                .returning(Group.group_id, Group.name)
+                .cte("new_groups")
+            )
+            counts = [select(func.count()).select_from(new_groups).scalar_subquery()]
+            if payload.includeTasks:
+                source = aliased(Group)
+                new_tasks = (
+                    insert(Task)
+                    .from_select(
+                        [
+                            "tenant_id",
+                            "group_id",
+                            "position",
+                            "title",
+                            "description",
+                            "due_date",
+                            "assigned_to_user_id",
+                            "created_by",
+                        ],
+                        select(
+                            literal(auth.tenant_id),
+                            new_groups.c.group_id,
+                            Task.position,
+                            Task.title,
+                            Task.description,
+                            Task.due_date,
+                            Task.assigned_to_user_id,
+                            literal(auth.id),
+                        )
+                        .join(source, Task.group_id == source.group_id)
+                        .join(new_groups, new_groups.c.name == source.name)
+                        .where(source.workspace_id == payload.workspaceId)
+                        .order_by(Task.group_id, Task.position, Task.task_id),
+                    )
+                    .returning(Task.task_id)
+                    .cte("new_tasks")
+                )
+                counts.append(
+                    select(func.count()).select_from(new_tasks).scalar_subquery()
+                )
+            else:
+                counts.append(literal(0))
+            group_count, task_count = session.execute(select(*counts)).one()
+            # counted by the trigger as the tasks went in
+            session.refresh(
+                new_workspace,
+                ["task_count", "assigned_task_count", "overdue_task_count"],
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                new_workspace.workspace_id,
+                "workspace",
+                "workspace.created",
+                [
+                    {
+                        "workspaceId": new_workspace.workspace_id,
+                        "name": new_workspace.name,
+                        "clonedFrom": payload.workspaceId,
+                        "groupCount": group_count,
+                        "taskCount": task_count,
+                    }
+                ],
+            )
+
+            return CloneWorkspaceResponse(
+                workspaceId=new_workspace.workspace_id,
+                name=new_workspace.name,
+                createdAt=new_workspace.created_at,
+                updatedAt=new_workspace.updated_at,
+                createdBy=new_workspace.created_by,
+                updatedBy=new_workspace.updated_by,
+                groupCount=group_count,
+                **_task_counters(new_workspace),
+            )
+
     def workspace_detail(
         self, auth: TokenPayload, payload: GroupByWorkspaceRequest
     ) -> GroupByWorkspaceResponse:
-
         with self.__repository.session() as session:
             workspace = (
                 session.query(Workspaces)
@@ -126,41 +507,46 @@ class WorkspaceUsecase:
             groups = (
                 session.query(Group)
                 .where(Group.workspace_id == workspace.workspace_id)
-                .join(Task, Task.group_id == Group.group_id, isouter=True)
-                .join(
-                    Account,
-                    Task.assigned_to_user_id == Account.account_id,
-                    isouter=True,
-                )
                 .order_by(Group.group_id)
                 .all()
             )
 
+            # one scan of the (group_id, position) index per group, bounded by
+            # the limit no matter how many tasks the group holds
+            tasks = (
+                _select_tasks(payload.fields)
+                .where(Task.group_id == Group.group_id)
+                .order_by(Task.position, Task.task_id)
+                .limit(payload.limit + 1)
+                .lateral("tasks")
+            )
+            rows = session.execute(
+                select(tasks)
+                .select_from(Group)
+                .join(tasks, true())
+                .where(Group.workspace_id == workspace.workspace_id)
+                .order_by(tasks.c.group_id, tasks.c.position, tasks.c.task_id)
+            ).all()
+
+            rows_by_group: dict[int, list] = {group.group_id: [] for group in groups}
+            for row in rows:
+                rows_by_group[row.group_id].append(row)
+            pages = {
+                group_id: _task_page(
+                    group_rows, payload.limit, payload.fields, self.__cursor
+                )
+                for group_id, group_rows in rows_by_group.items()
+            }
+
             return GroupByWorkspaceResponse(
-                workspaceId=groups[0].workspace_id,
+                workspaceId=workspace.workspace_id,
                 groups=[
                     GroupResponse(
                         groupId=group.group_id,
                         name=group.name,
-                        tasks=[
-                            TaskResponse(
-                                taskId=task.task_id,
-                                title=task.title,
-                                description=task.description,
-                                dueDate=task.due_date,
-                                assignedToUserId=task.assigned_to_user_id,
-                                assignedTo=(
-                                    task.assigned_to_user.full_name
-                                    if task.assigned_to_user_id
-                                    else None
-                                ),
-                                createdAt=task.created_at,
-                                updatedAt=task.updated_at,
-                                createdBy=task.created_by,
-                                updatedBy=task.updated_by,
-                            )
-                            for task in group.tasks
-                        ],
+                        tasks=pages[group.group_id][0],
+                        nextCursor=pages[group.group_id][1],
+                        **_task_counters(group),
                         createdAt=group.created_at,
                         updatedAt=group.updated_at,
                         createdBy=group.created_by,
@@ -199,6 +585,20 @@ class WorkspaceUsecase:
             existing_group.updated_at = datetime.datetime.now(datetime.timezone.utc)
             session.add(existing_group)
             session.flush()
+            notify_board(
+                session,
+                workspace.workspace_id,
+                "group.updated",
+                groupId=existing_group.group_id,
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                workspace.workspace_id,
+                "group",
+                "group.updated",
+                [{"groupId": existing_group.group_id, "name": existing_group.name}],
+            )
 
             return UpdateGroupResponse(
                 groupId=existing_group.group_id,
@@ -230,6 +630,7 @@ class WorkspaceUsecase:
             new_task = Task(
                 group_id=group.group_id,
                 tenant_id=auth.tenant_id,
+                position=key_between(_last_position(session, group.group_id), None),
                 title=task.title,
                 description=task.description,
                 due_date=task.dueDate,
@@ -238,6 +639,30 @@ class WorkspaceUsecase:
             )
             session.add(new_task)
             session.flush()
+            notify_board(
+                session,
+                workspace.workspace_id,
+                "task.created",
+                groupId=group.group_id,
+                taskId=new_task.task_id,
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                workspace.workspace_id,
+                "task",
+                "task.created",
+                [
+                    _task_change(
+                        new_task.task_id,
+                        new_task.group_id,
+                        new_task.title,
+                        new_task.description,
+                        new_task.due_date,
+                        new_task.assigned_to_user_id,
+                    )
+                ],
+            )
 
             session.query(Task).where(Task.task_id == new_task.task_id).join(
                 Account, Task.assigned_to_user_id == Account.account_id, isouter=True
@@ -260,10 +685,97 @@ class WorkspaceUsecase:
                 updatedBy=new_task.updated_by,
             )
 
+    def create_tasks(self, auth: TokenPayload, batch: CreateTasks) -> TaskBatchResponse:
+        if not batch.tasks:
+            raise InvalidTaskBatch("A task batch needs at least one task")
+        if len(batch.tasks) > MAX_TASK_BATCH:
+            raise InvalidTaskBatch(f"A task batch holds at most {MAX_TASK_BATCH} tasks")
+
+        with self.__repository.session() as session:
+            # workspace and group ownership checked once for the whole batch
+            owner = session.execute(
+                select(Workspaces.workspace_id, Group.group_id)
+                .outerjoin(
+                    Group,
+                    (Group.workspace_id == Workspaces.workspace_id)
+                    & (Group.group_id == batch.groupId),
+                )
+                .where(
+                    Workspaces.workspace_id == batch.workspaceId,
+                    Workspaces.tenant_id == auth.tenant_id,
+                )
+            ).first()
+            if not owner:
+                raise WorkspaceNotFound()
+            if owner.group_id is None:
+                raise GroupNotFound()
+
+            positions = keys_between(
+                _last_position(session, batch.groupId), None, len(batch.tasks)
+            )
+            inserted = (
+                insert(Task)
+                .values(
+                    [
+                        {
+                            "group_id": batch.groupId,
+                            "tenant_id": auth.tenant_id,
+                            "position": position,
+                            "title": task.title,
+                            "description": task.description,
+                            "due_date": task.dueDate,
+                            "assigned_to_user_id": task.assignedToUserId,
+                            "created_by": auth.id,
+                        }
+                        for task, position in zip(batch.tasks, positions)
+                    ]
+                )
+                .returning(*Task.__table__.c)
+                .cte("inserted")
+            )
+            rows = session.execute(
+                select(
+                    inserted.c.task_id,
+                    *[
+                        (
+                            Account.full_name
+                            if name == "assignedTo"
+                            else inserted.c[column.key]
+                        ).label(name)
+                        for name, column in _TASK_COLUMNS.items()
+                    ],
+                )
+                .outerjoin(Account, inserted.c.assigned_to_user_id == Account.account_id)
+                .order_by(inserted.c.task_id)
+            ).all()
+            notify_board(
+                session, batch.workspaceId, "tasks.created", groupId=batch.groupId
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                batch.workspaceId,
+                "task",
+                "task.created",
+                [
+                    _task_change(
+                        row.task_id,
+                        batch.groupId,
+                        row.title,
+                        row.description,
+                        row.dueDate,
+                        row.assignedToUserId,
+                    )
+                    for row in rows
+                ],
+            )
+
+            return TaskBatchResponse(tasks=[_task_response(row, None) for row in rows])
+
     def update_task(self, auth: TokenPayload, payload: UpdateTask) -> Task:
 
         update_data = payload.model_dump(exclude_unset=True)
-        print(update_data)
+        logger.debug("update task", extra={"fields": {"update": update_data}})
         with self.__repository.session() as session:
             workspace = (
                 session.query(Workspaces)
@@ -297,42 +809,568 @@ class WorkspaceUsecase:
                     existing_task.title = value
                     continue
 
-                if field == "toGroupId":
+                if field == "toGroupId" and value != existing_task.group_id:
                     existing_task.group_id = value
+                    existing_task.position = key_between(
+                        _last_position(session, value), None
+                    )
                     continue
 
             existing_task.updated_by = auth.id
             existing_task.updated_at = datetime.datetime.now(datetime.timezone.utc)
 
             session.flush()
+            notify_board(
+                session,
+                workspace.workspace_id,
+                "task.updated",
+                groupId=existing_task.group_id,
+                taskId=existing_task.task_id,
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                workspace.workspace_id,
+                "task",
+                "task.updated",
+                [
+                    _task_change(
+                        existing_task.task_id,
+                        existing_task.group_id,
+                        existing_task.title,
+                        existing_task.description,
+                        existing_task.due_date,
+                        existing_task.assigned_to_user_id,
+                    )
+                ],
+            )
 
             return existing_task
 
-    def get_task(self, auth: TokenPayload, payload: GetTaskById) -> TaskResponse:
+    def move_tasks(self, auth: TokenPayload, payload: MoveTasks) -> BulkTaskResponse:
+        selection = _bulk_selection(
+            payload.workspaceId, payload.taskIds, payload.fromGroupId
+        )
+        # aliased, or the subquery would correlate with the source group
+        to_group = aliased(Group)
+        target = (
+            select(to_group.group_id)
+            .where(
+                to_group.group_id == payload.toGroupId,
+                to_group.workspace_id == payload.workspaceId,
+                to_group.tenant_id == auth.tenant_id,
+            )
+            .exists()
+        )
+
+        # the moved tasks go after the target group's last task, in their old order
+        ranked = (
+            select(
+                Task.task_id,
+                (
+                    func.row_number().over(order_by=(Task.position, Task.task_id)) - 1
+                ).label("rank"),
+            )
+            .where(Task.tenant_id == auth.tenant_id, *selection)
+            .subquery("ranked")
+        )
+        # aliased, or the subquery would correlate with the updated row
+        target_task = aliased(Task)
+        last = (
+            select(func.max(target_task.position))
+            .where(target_task.group_id == payload.toGroupId)
+            .scalar_subquery()
+        )
 
         with self.__repository.session() as session:
-            existing_task = (
-                session.query(Task).where(Task.task_id == payload.taskId).first()
+            _lock_positions(session, payload.toGroupId)
+            moved = session.execute(
+                update(Task)
+                .where(Task.task_id == ranked.c.task_id, target)
+                .values(
+                    group_id=payload.toGroupId,
+                    position=appended_key(last, ranked.c.rank),
+                    updated_by=auth.id,
+                )
+                .returning(Task.task_id, Task.position)
+            ).all()
+
+            if not moved:
+                # only the empty result pays for telling the reasons apart
+                self.__ensure_group(session, auth, payload.workspaceId, payload.toGroupId)
+                if payload.fromGroupId is not None:
+                    self.__ensure_group(
+                        session, auth, payload.workspaceId, payload.fromGroupId
+                    )
+            else:
+                notify_board(
+                    session, payload.workspaceId, "tasks.moved", groupId=payload.toGroupId
+                )
+                write_outbox(
+                    session,
+                    auth.tenant_id,
+                    payload.workspaceId,
+                    "task",
+                    "task.moved",
+                    [
+                        {
+                            "taskId": row.task_id,
+                            "groupId": payload.toGroupId,
+                            "position": row.position,
+                        }
+                        for row in moved
+                    ],
+                )
+
+        if moved and max(len(row.position) for row in moved) > self.__position_max_length:
+            self.__schedule_rebalance(payload.toGroupId)
+        return BulkTaskResponse(taskIds=sorted(row.task_id for row in moved))
+
+    def delete_tasks(
+        self, auth: TokenPayload, payload: DeleteTasks
+    ) -> BulkTaskResponse:
+        selection = _bulk_selection(payload.workspaceId, payload.taskIds, payload.groupId)
+
+        with self.__repository.session() as session:
+            deleted = session.execute(
+                delete(Task)
+                .where(Task.tenant_id == auth.tenant_id, *selection)
+                .returning(Task.task_id, Task.group_id)
+            ).all()
+
+            if not deleted:
+                if payload.groupId is None:
+                    self.__ensure_workspace(session, auth, payload.workspaceId)
+                else:
+                    self.__ensure_group(
+                        session, auth, payload.workspaceId, payload.groupId
+                    )
+            else:
+                notify_board(
+                    session, payload.workspaceId, "tasks.deleted", groupId=payload.groupId
+                )
+                write_outbox(
+                    session,
+                    auth.tenant_id,
+                    payload.workspaceId,
+                    "task",
+                    "task.deleted",
+                    [{"taskId": row.task_id, "groupId": row.group_id} for row in deleted],
+                )
+
+            return BulkTaskResponse(taskIds=sorted(row.task_id for row in deleted))
+
+    def import_tasks(
+        self,
+        auth: TokenPayload,
+        payload: ImportTasks,
+        stream: BinaryIO,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> TaskImportResponse:
+        """loads a CSV or NDJSON upload into the workspace's groups, by name.
+
+        Rows are COPYed into a temporary table as the upload streams in, then
+        validated and merged into task with one statement each, in a single
+        transaction: either every row is imported or none is.
+        """
+        started = time.perf_counter()
+        staged = _STAGED_TASKS.c
+        with self.__repository.session() as session:
+            self.__ensure_workspace(session, auth, payload.workspaceId)
+            _STAGED_TASKS.create(session.connection())
+            rows = copy_rows(
+                session,
+                _STAGED_TASKS.name,
+                [column.name for column in staged],
+                read_import_rows(stream, payload.format),
+                self.__import_chunk_rows,
+                progress,
             )
-            if not existing_task or existing_task.tenant_id != auth.tenant_id:
+            if not rows:
+                raise InvalidTaskImport("The upload has no tasks")
+            # temporary tables are never analyzed on their own
+            session.execute(text(f"ANALYZE {_STAGED_TASKS.name}"))
+            # every group may be appended to, locked in id order
+            workspace_groups = (
+                select(Group.group_id)
+                .where(Group.workspace_id == payload.workspaceId)
+                .order_by(Group.group_id)
+                .subquery()
+            )
+            session.execute(
+                select(
+                    func.pg_advisory_xact_lock(_POSITION_LOCK, workspace_groups.c.group_id)
+                )
+            )
+
+            groups = (
+                select(
+                    Group.group_id,
+                    Group.name,
+                    select(func.max(Task.position))
+                    .where(Task.group_id == Group.group_id)
+                    .scalar_subquery()
+                    .label("last"),
+                )
+                .where(Group.workspace_id == payload.workspaceId)
+                # the last keys are looked up once per group, not once per row
+                .cte("groups")
+                .prefix_with("MATERIALIZED")
+            )
+            assignee = and_(
+                Account.username == staged.assignee,
+                Account.tenant_id == auth.tenant_id,
+            )
+
+            problems = (
+                select(
+                    staged.line,
+                    case(
+                        (staged.title.is_(None), "title is required"),
+                        (
+                            groups.c.group_id.is_(None),
+                            literal("unknown group ").concat(
+                                func.coalesce(staged.group_name, "")
+                            ),
+                        ),
+                        (
+                            and_(
+                                staged.due_date.is_not(None),
+                                ~func.pg_input_is_valid(staged.due_date, "timestamptz"),
+                            ),
+                            "invalid dueDate",
+                        ),
+                        (
+                            and_(
+                                staged.assignee.is_not(None),
+                                Account.account_id.is_(None),
+                            ),
+                            literal("unknown assignee ").concat(staged.assignee),
+                        ),
+                    ).label("error"),
+                )
+                .select_from(_STAGED_TASKS)
+                .outerjoin(groups, groups.c.name == staged.group_name)
+                .outerjoin(Account, assignee)
+                .subquery("problems")
+            )
+            errors = session.execute(
+                select(problems, func.count().over().label("total"))
+                .where(problems.c.error.is_not(None))
+                .order_by(problems.c.line)
+                .limit(MAX_IMPORT_ERRORS)
+            ).all()
+            if errors:
+                raise TaskImportRejected(
+                    [TaskImportError(line=row.line, error=row.error) for row in errors],
+                    errors[0].total,
+                )
+
+            # each group's rows go after its last task, in file order
+            ranked = select(
+                _STAGED_TASKS,
+                (
+                    func.row_number().over(
+                        partition_by=staged.group_name, order_by=staged.line
+                    )
+                    - 1
+                ).label("rank"),
+            ).subquery("ranked")
+            session.execute(
+                insert(Task).from_select(
+                    [
+                        "tenant_id",
+                        "group_id",
+                        "position",
+                        "title",
+                        "description",
+                        "due_date",
+                        "assigned_to_user_id",
+                        "created_by",
+                    ],
+                    select(
+                        literal(auth.tenant_id),
+                        groups.c.group_id,
+                        appended_key(groups.c.last, ranked.c.rank),
+                        ranked.c.title,
+                        ranked.c.description,
+                        cast(ranked.c.due_date, DateTime(timezone=True)),
+                        Account.account_id,
+                        literal(auth.id),
+                    )
+                    .join(groups, groups.c.name == ranked.c.group_name)
+                    .outerjoin(
+                        Account,
+                        and_(
+                            Account.username == ranked.c.assignee,
+                            Account.tenant_id == auth.tenant_id,
+                        ),
+                    )
+                    .order_by(ranked.c.line),
+                )
+            )
+            imported_groups = session.scalars(
+                select(groups.c.group_id).where(
+                    exists().where(staged.group_name == groups.c.name)
+                )
+            ).all()
+            notify_board(session, payload.workspaceId, "tasks.imported")
+            # one event for the whole import, however many rows it had
+            write_outbox(
+                session,
+                auth.tenant_id,
+                payload.workspaceId,
+                "workspace",
+                "tasks.imported",
+                [
+                    {
+                        "workspaceId": payload.workspaceId,
+                        "groupIds": imported_groups,
+                        "count": rows,
+                    }
+                ],
+            )
+
+        # appended keys are longer than the group's last one
+        for group_id in imported_groups:
+            self.__schedule_rebalance(group_id)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            "tasks imported",
+            extra={
+                "fields": {
+                    "workspaceId": payload.workspaceId,
+                    "rows": rows,
+                    "durationMs": duration_ms,
+                }
+            },
+        )
+        return TaskImportResponse(imported=rows, durationMs=duration_ms)
+
+    def move_task(self, auth: TokenPayload, payload: MoveTask) -> TaskPositionResponse:
+        """places one task between two neighbours of its (new) group, by only
+        rewriting that task's position key"""
+        with self.__repository.session() as session:
+            task = session.execute(
+                select(Task.task_id, Task.group_id)
+                .join(Group, Task.group_id == Group.group_id)
+                .where(
+                    Task.task_id == payload.taskId,
+                    Task.tenant_id == auth.tenant_id,
+                    Group.workspace_id == payload.workspaceId,
+                )
+            ).first()
+            if not task:
+                self.__ensure_workspace(session, auth, payload.workspaceId)
                 raise TaskNotFound()
 
-            return TaskResponse(
-                taskId=existing_task.task_id,
-                title=existing_task.title,
-                description=existing_task.description,
-                dueDate=existing_task.due_date,
-                assignedToUserId=existing_task.assigned_to_user_id,
-                assignedTo=(
-                    existing_task.assigned_to_user.full_name
-                    if existing_task.assigned_to_user_id
-                    else None
-                ),
-                createdAt=existing_task.created_at,
-                updatedAt=existing_task.updated_at,
-                createdBy=existing_task.created_by,
-                updatedBy=existing_task.updated_by,
+            group_id = payload.toGroupId or task.group_id
+            if group_id != task.group_id:
+                self.__ensure_group(session, auth, payload.workspaceId, group_id)
+
+            # the shared lock is taken in a savepoint, a rebalance rolls it back
+            # and takes the lock alone, two moves upgrading theirs would deadlock
+            with session.begin_nested() as attempt:
+                session.execute(
+                    select(func.pg_advisory_xact_lock_shared(_POSITION_LOCK, group_id))
+                )
+                lower, upper = self.__neighbours(session, group_id, payload)
+                # neighbours share a key, two tasks were moved to one spot concurrently
+                collided = lower is not None and upper is not None and lower >= upper
+                if collided:
+                    attempt.rollback()
+            if collided:
+                self.__rebalance(session, group_id)
+                lower, upper = self.__neighbours(session, group_id, payload)
+                if lower >= upper:
+                    raise InvalidTaskPosition(
+                        "afterTaskId must come before beforeTaskId"
+                    )
+            position = key_between(lower, upper)
+
+            session.execute(
+                update(Task)
+                .where(Task.task_id == task.task_id)
+                .values(group_id=group_id, position=position, updated_by=auth.id)
+            )
+            notify_board(
+                session,
+                payload.workspaceId,
+                "task.moved",
+                groupId=group_id,
+                taskId=task.task_id,
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                payload.workspaceId,
+                "task",
+                "task.moved",
+                [{"taskId": task.task_id, "groupId": group_id, "position": position}],
+            )
+
+        if len(position) > self.__position_max_length:
+            self.__schedule_rebalance(group_id)
+        return TaskPositionResponse(
+            taskId=task.task_id, groupId=group_id, position=position
+        )
+
+    def rebalance_positions(self, group_id: int) -> None:
+        """rewrites a group's position keys evenly spaced, once any got long"""
+        with self.__repository.session() as session:
+            longest = session.scalar(
+                select(func.max(func.length(Task.position))).where(
+                    Task.group_id == group_id
+                )
+            )
+            if longest and longest > self.__position_max_length:
+                self.__rebalance(session, group_id)
+
+    def __schedule_rebalance(self, group_id: int) -> None:
+        self.__jobs.submit("rebalance_positions", self.rebalance_positions, group_id)
+
+    def __rebalance(self, session, group_id: int) -> None:
+        _lock_positions(session, group_id)
+        ranked = (
+            select(
+                Task.task_id,
+                (
+                    func.row_number().over(order_by=(Task.position, Task.task_id)) - 1
+                ).label("rank"),
+            )
+            .where(Task.group_id == group_id)
+            .subquery("ranked")
+        )
+        session.execute(
+            update(Task)
+            .where(Task.task_id == ranked.c.task_id)
+            .values(position=spaced_key(ranked.c.rank))
+        )
+        logger.info("task positions rebalanced", extra={"fields": {"groupId": group_id}})
+
+    def __neighbours(self, session, group_id: int, payload: MoveTask):
+        """position keys the moved task goes between, None for an open end"""
+        lower = upper = None
+        if payload.afterTaskId is not None:
+            lower = self.__anchor(session, group_id, payload, payload.afterTaskId)
+        if payload.beforeTaskId is not None:
+            upper = self.__anchor(session, group_id, payload, payload.beforeTaskId)
+
+        others = [Task.group_id == group_id, Task.task_id != payload.taskId]
+        if payload.beforeTaskId is None and payload.afterTaskId is None:
+            lower = session.scalar(select(func.max(Task.position)).where(*others))
+        elif payload.beforeTaskId is None:
+            upper = session.scalar(
+                select(Task.position)
+                .where(
+                    *others,
+                    tuple_(Task.position, Task.task_id)
+                    > tuple_(lower, payload.afterTaskId),
+                )
+                .order_by(Task.position, Task.task_id)
+                .limit(1)
             )
+        elif payload.afterTaskId is None:
+            lower = session.scalar(
+                select(Task.position)
+                .where(
+                    *others,
+                    tuple_(Task.position, Task.task_id)
+                    < tuple_(upper, payload.beforeTaskId),
+                )
+                .order_by(Task.position.desc(), Task.task_id.desc())
+                .limit(1)
+            )
+        return lower, upper
+
+    def __anchor(self, session, group_id: int, payload: MoveTask, task_id: int) -> str:
+        if task_id == payload.taskId:
+            raise InvalidTaskPosition("A task cannot be placed next to itself")
+        position = session.scalar(
+            select(Task.position).where(
+                Task.task_id == task_id, Task.group_id == group_id
+            )
+        )
+        if position is None:
+            raise InvalidTaskPosition(f"Task {task_id} is not in group {group_id}")
+        return position
+
+    def ensure_workspace(self, auth: TokenPayload, workspace_id: int) -> None:
+        """raises WorkspaceNotFound unless the workspace is the caller's tenant's"""
+        with self.__repository.session() as session:
+            self.__ensure_workspace(session, auth, workspace_id)
+
+    def __ensure_workspace(self, session, auth: TokenPayload, workspace_id: int):
+        if not session.scalar(
+            select(
+                exists().where(
+                    Workspaces.workspace_id == workspace_id,
+                    Workspaces.tenant_id == auth.tenant_id,
+                )
+            )
+        ):
+            raise WorkspaceNotFound()
+
+    def __ensure_group(
+        self, session, auth: TokenPayload, workspace_id: int, group_id: int
+    ):
+        self.__ensure_workspace(session, auth, workspace_id)
+        if not session.scalar(
+            select(
+                exists().where(
+                    Group.group_id == group_id, Group.workspace_id == workspace_id
+                )
+            )
+        ):
+            raise GroupNotFound()
+
+    def list_group_tasks(
+        self, auth: TokenPayload, payload: ListGroupTasks
+    ) -> GroupTasksResponse:
+
+        with self.__repository.session() as session:
+            workspace = (
+                session.query(Workspaces)
+                .where(Workspaces.workspace_id == payload.workspaceId)
+                .first()
+            )
+            if not workspace or workspace.tenant_id != auth.tenant_id:
+                raise WorkspaceNotFound()
+
+            group = (
+                session.query(Group).where(Group.group_id == payload.groupId).first()
+            )
+            if not group or group.workspace_id != workspace.workspace_id:
+                raise GroupNotFound()
+
+            after = None
+            if payload.cursor:
+                after = self.__cursor.decode("position", payload.cursor)
+            rows = session.execute(
+                _GROUP_TASK_ORDER.paginate(
+                    _select_tasks(payload.fields).where(Task.group_id == group.group_id),
+                    after,
+                    payload.limit,
+                )
+            ).all()
+            tasks, next_cursor = _task_page(
+                rows, payload.limit, payload.fields, self.__cursor
+            )
+
+            return GroupTasksResponse(
+                groupId=group.group_id, tasks=tasks, nextCursor=next_cursor
+            )
+
+    def get_task(self, auth: TokenPayload, payload: GetTaskById) -> TaskResponse:
+
+        with self.__repository.session() as session:
+            existing_task = session.execute(
+                _select_tasks(payload.fields).where(Task.task_id == payload.taskId)
+            ).first()
+            if not existing_task or existing_task.tenant_id != auth.tenant_id:
+                raise TaskNotFound()
+
+            return _task_response(existing_task, payload.fields)
 
     def delete_task(self, auth: TokenPayload, payload: DeleteTask) -> None:
 
@@ -343,5 +1381,23 @@ class WorkspaceUsecase:
             if not existing_task or existing_task.tenant_id != auth.tenant_id:
                 raise TaskNotFound()
 
+            workspace_id = session.scalar(
+                select(Group.workspace_id).where(Group.group_id == existing_task.group_id)
+            )
             session.delete(existing_task)
             session.flush()
+            notify_board(
+                session,
+                workspace_id,
+                "task.deleted",
+                groupId=existing_task.group_id,
+                taskId=existing_task.task_id,
+            )
+            write_outbox(
+                session,
+                auth.tenant_id,
+                workspace_id,
+                "task",
+                "task.deleted",
+                [{"taskId": existing_task.task_id, "groupId": existing_task.group_id}],
+            )
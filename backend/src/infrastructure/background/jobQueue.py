@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from src.common.config import Config
+from src.infrastructure.observability.logger import get_logger, request_id_var
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Job:
+    name: str
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    # the worker threads cannot see the submitting request's contextvars
+    request_id: Optional[str] = field(default_factory=request_id_var.get)
+
+
+_STOP = object()
+
+
+class JobQueue:
+    """in-process queue for side effects that must not hold up the response.
+
+    `submit` never blocks: past `job_queue_size` pending jobs the job is dropped
+    and counted. A failing job is retried with exponential backoff up to
+    `job_max_attempts` times. `close` stops accepting jobs and drains the queue
+    for at most `job_drain_seconds`.
+    """
+
+    __queue: queue.Queue
+    __workers: list[threading.Thread]
+    __lock: threading.Lock
+    __closing: threading.Event
+
+    def __init__(self, config: Config):
+        self.__queue = queue.Queue(maxsize=config.job_queue_size)
+        self.__queue_size = config.job_queue_size
+        self.__max_attempts = config.job_max_attempts
+        self.__backoff = config.job_retry_backoff_seconds
+        self.__drain_seconds = config.job_drain_seconds
+        self.__lock = threading.Lock()
+        self.__closing = threading.Event()
+        self.__submitted = 0
+        self.__completed = 0
+        self.__retried = 0
+        self.__failed = 0
+        self.__dropped = 0
+        self.__workers = [
+            threading.Thread(target=self.__work, name=f"job-worker-{i}", daemon=True)
+            for i in range(config.job_workers)
+        ]
+        for worker in self.__workers:
+            worker.start()
+
+    def submit(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> bool:
+        """queues fn(*args, **kwargs), False when it was dropped"""
+        if self.__closing.is_set():
+            return self.__drop(name, "closing")
+        try:
+            self.__queue.put_nowait(_Job(name, fn, args, kwargs))
+        except queue.Full:
+            return self.__drop(name, "full")
+        with self.__lock:
+            self.__submitted += 1
+        return True
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "workers": len(self.__workers),
+                "queueDepth": self.__queue.qsize(),
+                "queueLimit": self.__queue_size,
+                "submitted": self.__submitted,
+                "completed": self.__completed,
+                "retried": self.__retried,
+                "failed": self.__failed,
+                "dropped": self.__dropped,
+            }
+
+    def close(self) -> None:
+        if self.__closing.is_set():
+            return
+        self.__closing.set()
+        deadline = time.monotonic() + self.__drain_seconds
+        try:
+            for _ in self.__workers:
+                # the stop markers queue up behind the pending jobs, so those run first
+                self.__queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            pass
+        for worker in self.__workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+        if any(worker.is_alive() for worker in self.__workers):
+            logger.warning(
+                "job queue closed before draining",
+                extra={"fields": {"pending": self.__queue.qsize()}},
+            )
+
+    def __drop(self, name: str, reason: str) -> bool:
+        with self.__lock:
+            self.__dropped += 1
+        logger.warning("job dropped", extra={"fields": {"job": name, "reason": reason}})
+        return False
+
+    def __work(self) -> None:
+        while True:
+            job = self.__queue.get()
+            if job is _STOP:
+                return
+            token = request_id_var.set(job.request_id)
+            try:
+                self.__run(job)
+            finally:
+                request_id_var.reset(token)
+
+    def __run(self, job: _Job) -> None:
+        for attempt in range(1, self.__max_attempts + 1):
+            try:
+                job.fn(*job.args, **job.kwargs)
+            except Exception:
+                if attempt == self.__max_attempts:
+                    with self.__lock:
+                        self.__failed += 1
+                    logger.exception(
+                        "job failed",
+                        extra={"fields": {"job": job.name, "attempts": attempt}},
+                    )
+                    return
+                with self.__lock:
+                    self.__retried += 1
+                # a closing queue still retries, just without waiting
+                self.__closing.wait(self.__backoff * 2 ** (attempt - 1))
+            else:
+                with self.__lock:
+                    self.__completed += 1
+                return
@@ -0,0 +1,221 @@
+import datetime
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from migrations.schema import Outbox
+from src.common.config import Config
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.observability.logger import get_logger
+
+logger = get_logger(__name__)
+
+_MAX_BACKOFF_SECONDS = 30
+_PRUNE_CHUNK = 10_000
+# held by a dispatch with an ordered handler from before its claim to its commit
+_ORDERED_DISPATCH_LOCK = 0x6F7574
+
+
+class OutboxMessage(NamedTuple):
+    id: int
+    tenant_id: int
+    workspace_id: int
+    aggregate: str
+    aggregate_id: int
+    type: str
+    payload: dict[str, Any]
+    created_at: datetime.datetime
+
+
+# called with the claiming transaction, whatever it writes commits with the
+# batch being marked delivered; raising hands the whole batch back
+OutboxHandler = Callable[[Session, list[OutboxMessage]], None]
+
+
+class _Handler(NamedTuple):
+    name: str
+    deliver: OutboxHandler
+    ordered: bool
+    # called once the batch committed
+    committed: Optional[Callable[[list[OutboxMessage]], None]]
+
+
+class OutboxDispatcher:
+    """delivers the outbox rows written by write_outbox to its handlers.
+
+    A batch of up to `outbox_batch_size` of the oldest undelivered rows is
+    claimed with FOR UPDATE SKIP LOCKED, so every worker can run a dispatcher
+    without two of them delivering the same row. A row is delivered at least
+    once: a failing handler rolls the batch back and it is retried with
+    backoff. Delivered rows are kept for `outbox_retention_seconds`, then
+    pruned. An idle dispatcher polls every `outbox_poll_seconds`.
+
+    With an ordered handler, one dispatch at a time runs across workers, so
+    that handler sees the batches one after the other, in claim order.
+    """
+
+    __repository: Repository
+    __handlers: list[_Handler]
+    __lock: threading.Lock
+    __thread: Optional[threading.Thread]
+
+    def __init__(self, config: Config, repository: Repository):
+        self.__repository = repository
+        self.__batch_size = config.outbox_batch_size
+        self.__poll = config.outbox_poll_seconds
+        self.__retention = config.outbox_retention_seconds
+        self.__prune_interval = config.outbox_prune_interval_seconds
+        self.__handlers = []
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__closing = threading.Event()
+        self.__dispatched = 0
+        self.__batches = 0
+        self.__failures = 0
+        self.__pruned = 0
+        self.__lag_ms = 0.0
+        self.__max_lag_ms = 0.0
+        self.__batch_ms = 0.0
+
+    def add_handler(
+        self,
+        name: str,
+        handler: OutboxHandler,
+        ordered: bool = False,
+        committed: Optional[Callable[[list[OutboxMessage]], None]] = None,
+    ) -> None:
+        with self.__lock:
+            self.__handlers.append(_Handler(name, handler, ordered, committed))
+
+    def start(self) -> None:
+        """starts the dispatcher thread once"""
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="outbox-dispatcher", daemon=True
+                )
+                self.__thread.start()
+
+    def dispatch(self) -> int:
+        """claims and delivers one batch, the number of rows delivered"""
+        started = time.perf_counter()
+        with self.__lock:
+            handlers = list(self.__handlers)
+        with self.__repository.session() as session:
+            if any(handler.ordered for handler in handlers):
+                session.execute(select(func.pg_advisory_xact_lock(_ORDERED_DISPATCH_LOCK)))
+            rows = session.execute(
+                select(
+                    Outbox.outbox_id,
+                    Outbox.tenant_id,
+                    Outbox.workspace_id,
+                    Outbox.aggregate,
+                    Outbox.aggregate_id,
+                    Outbox.type,
+                    Outbox.payload,
+                    Outbox.created_at,
+                    func.extract("epoch", func.clock_timestamp() - Outbox.created_at).label(
+                        "age"
+                    ),
+                )
+                .where(Outbox.delivered_at.is_(None))
+                .order_by(Outbox.outbox_id)
+                .limit(self.__batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return 0
+            messages = [OutboxMessage(*row[:-1]) for row in rows]
+            for handler in handlers:
+                try:
+                    handler.deliver(session, messages)
+                except Exception:
+                    logger.exception(
+                        "outbox handler failed",
+                        extra={"fields": {"handler": handler.name, "batch": len(messages)}},
+                    )
+                    raise
+            session.execute(
+                update(Outbox)
+                .where(Outbox.outbox_id.in_([message.id for message in messages]))
+                .values(delivered_at=func.now())
+            )
+
+        for handler in handlers:
+            if handler.committed is not None:
+                handler.committed(messages)
+        lag_ms = float(rows[0].age) * 1000
+        with self.__lock:
+            self.__dispatched += len(messages)
+            self.__batches += 1
+            self.__lag_ms = lag_ms
+            self.__max_lag_ms = max(self.__max_lag_ms, lag_ms)
+            self.__batch_ms = (time.perf_counter() - started) * 1000
+        return len(messages)
+
+    def prune(self) -> int:
+        """deletes the rows delivered more than `outbox_retention_seconds` ago"""
+        pruned = 0
+        while True:
+            with self.__repository.session() as session:
+                expired = (
+                    select(Outbox.outbox_id)
+                    .where(
+                        Outbox.delivered_at
+                        < func.now() - datetime.timedelta(seconds=self.__retention)
+                    )
+                    .limit(_PRUNE_CHUNK)
+                    .scalar_subquery()
+                )
+                deleted = session.execute(
+                    delete(Outbox).where(Outbox.outbox_id.in_(expired))
+                ).rowcount
+            pruned += deleted
+            if deleted < _PRUNE_CHUNK:
+                break
+        with self.__lock:
+            self.__pruned += pruned
+        return pruned
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "running": self.__thread is not None and self.__thread.is_alive(),
+                "dispatched": self.__dispatched,
+                "batches": self.__batches,
+                "failures": self.__failures,
+                "pruned": self.__pruned,
+                # age of the oldest row of the last batch when it was claimed
+                "lagMs": round(self.__lag_ms, 1),
+                "maxLagMs": round(self.__max_lag_ms, 1),
+                "lastBatchMs": round(self.__batch_ms, 1),
+            }
+
+    def close(self) -> None:
+        self.__closing.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=5)
+
+    def __run(self) -> None:
+        backoff = self.__poll
+        next_prune = time.monotonic()
+        while not self.__closing.is_set():
+            try:
+                dispatched = self.dispatch()
+                if time.monotonic() >= next_prune:
+                    self.prune()
+                    next_prune = time.monotonic() + self.__prune_interval
+            except Exception:
+                with self.__lock:
+                    self.__failures += 1
+                logger.exception("outbox dispatch failed")
+                self.__closing.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+                continue
+            backoff = self.__poll
+            # a full batch means there is more waiting
+            if dispatched < self.__batch_size:
+                self.__closing.wait(self.__poll)
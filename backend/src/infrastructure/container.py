@@ -0,0 +1,203 @@
+import threading
+from typing import Annotated, Optional
+
+from argon2 import PasswordHasher
+from fastapi import Depends
+
+from src.common.config import Config
+from src.domain.changes.usecase.changes import ChangeFeedUsecase
+from src.domain.identity.usecase.identity import IdentityUsecase
+from src.domain.workspaces.usecase.task_counters import TaskCounterUsecase
+from src.domain.workspaces.usecase.task_query import TaskQueryUsecase
+from src.domain.workspaces.usecase.workspace import WorkspaceUsecase
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.background.outboxDispatcher import OutboxDispatcher
+from src.infrastructure.database.idempotency import IdempotencyStore
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.realtime.boardEvents import BoardEvents
+from src.infrastructure.realtime.changeSignal import ChangeSignal
+from src.infrastructure.realtime.liveHub import LiveHub
+from src.infrastructure.security.calibrate import build_hasher
+from src.infrastructure.security.cursor import CursorCodec
+from src.infrastructure.security.loginThrottle import LoginThrottle, build_throttle_store
+from src.infrastructure.security.passwordPool import PasswordPool
+from src.infrastructure.security.refreshCache import RefreshCache
+from src.infrastructure.security.tokenManager import JwtTokenManager
+
+
+class Container:
+    """everything that lives as long as the app, built once instead of per request"""
+
+    config: Config
+    repository: Repository
+    hasher: PasswordHasher
+    password_pool: PasswordPool
+    token_manager: JwtTokenManager
+    job_queue: JobQueue
+    outbox: OutboxDispatcher
+    login_throttle: LoginThrottle
+    refresh_cache: RefreshCache
+    cursor: CursorCodec
+    idempotency: IdempotencyStore
+    board_events: BoardEvents
+    live_hub: LiveHub
+    change_signal: ChangeSignal
+    identity_usecase: IdentityUsecase
+    task_counters: TaskCounterUsecase
+    workspace_usecase: WorkspaceUsecase
+    task_query_usecase: TaskQueryUsecase
+    change_usecase: ChangeFeedUsecase
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.repository = Repository(config)
+        self.hasher = build_hasher(config)
+        self.password_pool = PasswordPool(config, self.hasher)
+        self.token_manager = JwtTokenManager(config)
+        self.cursor = CursorCodec(config)
+        self.job_queue = JobQueue(config)
+        # started by the app's lifespan, not by every process building a container
+        self.outbox = OutboxDispatcher(config, self.repository)
+        self.login_throttle = LoginThrottle(
+            config, build_throttle_store(config, self.repository)
+        )
+        self.refresh_cache = RefreshCache(config.refresh_cache_seconds)
+        self.idempotency = IdempotencyStore(
+            self.repository,
+            self.job_queue,
+            config.idempotency_ttl_seconds,
+            config.idempotency_lease_seconds,
+        )
+        self.board_events = BoardEvents(config, self.repository)
+        self.live_hub = LiveHub(config, self.board_events)
+        self.identity_usecase = IdentityUsecase(
+            self.repository,
+            self.password_pool,
+            self.token_manager,
+            self.cursor,
+            self.job_queue,
+            self.login_throttle,
+            self.refresh_cache,
+            config.token_prune_interval_seconds,
+        )
+        self.task_counters = TaskCounterUsecase(
+            self.repository,
+            config.task_counters_overdue_interval_seconds,
+            config.task_counters_reconcile_interval_seconds,
+        )
+        self.workspace_usecase = WorkspaceUsecase(
+            self.repository,
+            self.cursor,
+            self.job_queue,
+            config.task_position_max_length,
+            config.task_import_chunk_rows,
+        )
+        self.task_query_usecase = TaskQueryUsecase(
+            self.repository, self.cursor, config.task_search_candidates
+        )
+        self.change_signal = ChangeSignal()
+        self.change_usecase = ChangeFeedUsecase(
+            self.repository,
+            self.job_queue,
+            self.change_signal,
+            config.change_log_retention_seconds,
+        )
+        # ordered, so the change log is appended one batch at a time
+        self.outbox.add_handler(
+            "change_log",
+            self.change_usecase.append,
+            ordered=True,
+            committed=self.change_usecase.appended,
+        )
+
+    def metrics(self) -> dict:
+        return {
+            "passwordPool": self.password_pool.stats(),
+            "jobQueue": self.job_queue.stats(),
+            "outbox": self.outbox.stats(),
+            "loginThrottle": self.login_throttle.stats(),
+            "refreshCache": self.refresh_cache.stats(),
+            "boardEvents": self.board_events.stats(),
+            "liveHub": self.live_hub.stats(),
+            "changeFeed": self.change_signal.stats(),
+            "taskCounters": self.task_counters.stats(),
+        }
+
+    def close(self) -> None:
+        self.board_events.close()
+        self.task_counters.close()
+        self.outbox.close()
+        # queued jobs still need the password pool and the database
+        self.job_queue.close()
+        self.password_pool.close()
+        self.repository.dispose()
+
+
+_container: Optional[Container] = None
+_lock = threading.Lock()
+
+
+def app_container() -> Container:
+    """the lifespan builds it at startup, anything running before that builds it lazily"""
+    global _container
+    if _container is None:
+        with _lock:
+            if _container is None:
+                _container = Container(Config.from_env())
+    return _container
+
+
+def close_container() -> None:
+    global _container
+    with _lock:
+        if _container is not None:
+            _container.close()
+            _container = None
+
+
+# the dependencies are async so FastAPI resolves them on the event loop
+# instead of paying a threadpool hop for each one
+
+
+async def get_container() -> Container:
+    return app_container()
+
+
+async def get_config(container: Annotated[Container, Depends(get_container)]) -> Config:
+    return container.config
+
+
+async def get_identity_usecase(
+    container: Annotated[Container, Depends(get_container)],
+) -> IdentityUsecase:
+    return container.identity_usecase
+
+
+async def get_workspace_usecase(
+    container: Annotated[Container, Depends(get_container)],
+) -> WorkspaceUsecase:
+    return container.workspace_usecase
+
+
+async def get_task_query_usecase(
+    container: Annotated[Container, Depends(get_container)],
+) -> TaskQueryUsecase:
+    return container.task_query_usecase
+
+
+async def get_board_events(
+    container: Annotated[Container, Depends(get_container)],
+) -> BoardEvents:
+    return container.board_events
+
+
+async def get_change_usecase(
+    container: Annotated[Container, Depends(get_container)],
+) -> ChangeFeedUsecase:
+    return container.change_usecase
+
+
+async def get_change_signal(
+    container: Annotated[Container, Depends(get_container)],
+) -> ChangeSignal:
+    return container.change_signal
@@ -0,0 +1,42 @@
+import csv
+import io
+from typing import Callable, Iterable, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+
+def copy_rows(
+    session: Session,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    chunk_rows: int,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """streams rows into `table` with COPY inside the session's transaction.
+
+    Rows are written as CSV, `chunk_rows` at a time, so only one chunk is ever
+    held in memory however long `rows` is. None becomes NULL. `progress` gets
+    the running row count after each chunk. Returns the number of rows copied.
+    """
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    copied = 0
+    with session.connection().connection.cursor() as cursor:
+        chunk = io.StringIO()
+        writer = csv.writer(chunk)
+        for row in rows:
+            writer.writerow(row)
+            copied += 1
+            if copied % chunk_rows == 0:
+                chunk.seek(0)
+                cursor.copy_expert(statement, chunk)
+                if progress is not None:
+                    progress(copied)
+                chunk = io.StringIO()
+                writer = csv.writer(chunk)
+        if copied % chunk_rows:
+            chunk.seek(0)
+            cursor.copy_expert(statement, chunk)
+            if progress is not None:
+                progress(copied)
+    return copied
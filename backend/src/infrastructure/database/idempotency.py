@@ -0,0 +1,156 @@
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from sqlalchemy import text
+
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.database.repository import Repository
+
+_PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    # None while the first attempt is still running
+    status_code: Optional[int]
+    content_type: Optional[str]
+    body: Optional[bytes]
+
+
+class IdempotencyStore:
+    """responses to requests sent with an Idempotency-Key, per user and key.
+
+    The first attempt claims the key with a row holding no response yet, for
+    at most `lease_seconds` so a crashed attempt does not hold it forever. Its
+    response is then kept for `ttl_seconds`. Expired rows are reclaimed on
+    the next claim and pruned in the background.
+    """
+
+    __repository: Repository
+    __jobs: JobQueue
+    __prune_lock: threading.Lock
+
+    def __init__(
+        self,
+        repository: Repository,
+        jobs: JobQueue,
+        ttl_seconds: int,
+        lease_seconds: int,
+    ):
+        self.__repository = repository
+        self.__jobs = jobs
+        self.__ttl = ttl_seconds
+        self.__lease = lease_seconds
+        self.__next_prune = 0.0
+        self.__prune_lock = threading.Lock()
+
+    def claim(
+        self, tenant_id: int, account_id: int, key: str, fingerprint: str
+    ) -> Optional[StoredResponse]:
+        """None when this attempt now owns the key, the existing row otherwise"""
+        while True:
+            with self.__repository.session() as session:
+                claimed = session.execute(
+                    text(
+                        """
+                        INSERT INTO idempotency_key AS k
+                            (tenant_id, account_id, key, fingerprint, expires_at)
+                        VALUES (:tenant_id, :account_id, :key, :fingerprint,
+                            now() + make_interval(secs => :lease))
+                        ON CONFLICT (tenant_id, account_id, key) DO UPDATE SET
+                            fingerprint = excluded.fingerprint,
+                            status_code = NULL,
+                            content_type = NULL,
+                            body = NULL,
+                            created_at = now(),
+                            expires_at = excluded.expires_at
+                        WHERE k.expires_at < now()
+                        RETURNING 1
+                        """
+                    ),
+                    {
+                        "tenant_id": tenant_id,
+                        "account_id": account_id,
+                        "key": key,
+                        "fingerprint": fingerprint,
+                        "lease": self.__lease,
+                    },
+                ).first()
+            if claimed:
+                return None
+            existing = self.get(tenant_id, account_id, key)
+            # released between the insert and the read, try again
+            if existing is not None:
+                return existing
+
+    def get(
+        self, tenant_id: int, account_id: int, key: str
+    ) -> Optional[StoredResponse]:
+        with self.__repository.session() as session:
+            row = session.execute(
+                text(
+                    "SELECT fingerprint, status_code, content_type, body "
+                    "FROM idempotency_key WHERE tenant_id = :tenant_id "
+                    "AND account_id = :account_id AND key = :key AND expires_at >= now()"
+                ),
+                {"tenant_id": tenant_id, "account_id": account_id, "key": key},
+            ).first()
+        if row is None:
+            return None
+        body = bytes(row.body) if row.body is not None else None
+        return StoredResponse(row.fingerprint, row.status_code, row.content_type, body)
+
+    def complete(
+        self,
+        tenant_id: int,
+        account_id: int,
+        key: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes,
+    ) -> None:
+        with self.__repository.session() as session:
+            session.execute(
+                text(
+                    "UPDATE idempotency_key SET status_code = :status_code, "
+                    "content_type = :content_type, body = :body, "
+                    "expires_at = now() + make_interval(secs => :ttl) "
+                    "WHERE tenant_id = :tenant_id AND account_id = :account_id "
+                    "AND key = :key"
+                ),
+                {
+                    "tenant_id": tenant_id,
+                    "account_id": account_id,
+                    "key": key,
+                    "status_code": status_code,
+                    "content_type": content_type,
+                    "body": body,
+                    "ttl": self.__ttl,
+                },
+            )
+        if self.__prune_due():
+            self.__jobs.submit("prune_idempotency_keys", self.prune)
+
+    def release(self, tenant_id: int, account_id: int, key: str) -> None:
+        """gives up a claim, the next attempt with the key runs again"""
+        with self.__repository.session() as session:
+            session.execute(
+                text(
+                    "DELETE FROM idempotency_key WHERE tenant_id = :tenant_id "
+                    "AND account_id = :account_id AND key = :key AND status_code IS NULL"
+                ),
+                {"tenant_id": tenant_id, "account_id": account_id, "key": key},
+            )
+
+    def prune(self) -> None:
+        with self.__repository.session() as session:
+            session.execute(text("DELETE FROM idempotency_key WHERE expires_at < now()"))
+
+    def __prune_due(self) -> bool:
+        with self.__prune_lock:
+            now = time.monotonic()
+            if now < self.__next_prune:
+                return False
+            self.__next_prune = now + _PRUNE_INTERVAL_SECONDS
+            return True
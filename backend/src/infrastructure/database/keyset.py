@@ -0,0 +1,39 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+
+class KeysetOrder:
+    """An index-backed sort order, the last column must be unique so every row has a distinct key"""
+
+    columns: tuple
+    descending: bool
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def paginate(self, query: Query, after: Optional[list], limit: int) -> Query:
+        """fetches limit + 1 rows, the extra row tells if there is a next page"""
+        if after is not None:
+            key = tuple_(*self.columns)
+            bound = tuple_(
+                *[_coerce(column, value) for column, value in zip(self.columns, after)]
+            )
+            query = query.where(key < bound if self.descending else key > bound)
+
+        return query.order_by(
+            *[column.desc() if self.descending else column for column in self.columns]
+        ).limit(limit + 1)
+
+    def values(self, row) -> list:
+        return [getattr(row, column.key) for column in self.columns]
+
+
+def _coerce(column, value):
+    # cursor values round trip through json, timestamps come back as strings
+    if isinstance(column.type, DateTime) and isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return value
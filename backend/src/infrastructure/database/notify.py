@@ -0,0 +1,21 @@
+from sqlalchemy import String, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from migrations.schema import board_event_id_seq
+
+BOARD_CHANNEL = "board_changes"
+
+
+def notify_board(session: Session, workspace_id: int, type: str, **fields) -> None:
+    """sends a board change event through NOTIFY in the session's transaction.
+
+    Postgres delivers it to the listeners once the transaction commits, and
+    drops it on rollback. Each event gets the next board_event_id_seq value as
+    its id. Keep `fields` to a few ids, a payload is capped at 8000 bytes.
+    """
+    pairs = [literal("id"), board_event_id_seq.next_value()]
+    for key, value in {"workspaceId": workspace_id, "type": type, **fields}.items():
+        pairs += [literal(key), literal(value)]
+    session.execute(
+        select(func.pg_notify(BOARD_CHANNEL, cast(func.json_build_object(*pairs), String)))
+    )
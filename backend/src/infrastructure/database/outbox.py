@@ -0,0 +1,36 @@
+from typing import Iterable
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from migrations.schema import Outbox
+
+
+def write_outbox(
+    session: Session,
+    tenant_id: int,
+    workspace_id: int,
+    aggregate: str,
+    type: str,
+    changes: Iterable[dict],
+) -> None:
+    """queues change events for the OutboxDispatcher in the session's transaction.
+
+    One row per change, each change carries the id of what it is about under
+    `<aggregate>Id`, like `taskId` for a "task". The rows commit or roll back
+    with the change itself, so no event is lost or sent for nothing.
+    """
+    rows = [
+        {
+            "tenant_id": tenant_id,
+            "workspace_id": workspace_id,
+            "aggregate": aggregate,
+            "aggregate_id": change[f"{aggregate}Id"],
+            "type": type,
+            "payload": to_jsonable_python(change),
+        }
+        for change in changes
+    ]
+    if rows:
+        session.execute(insert(Outbox), rows)
@@ -0,0 +1,183 @@
+"""fractional index keys, strings that sort between any two other keys.
+
+A key is an integer part followed by an optional fraction, both in base 62
+digits, compared byte by byte (the column uses the "C" collation). The head
+character of the integer part tells its length, so appending after the last
+key stays short for a long time. Placing between two keys only grows the
+fraction, by one digit per ~6 placements at the same spot, until the group is
+rebalanced with `spaced_key`. Same scheme as the fractional-indexing library.
+"""
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Integer, cast, func, literal
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+INTEGER_ZERO = "a0"
+_SMALLEST_INTEGER = "A" + "0" * 26
+# evenly spaced keys are "d" and four digits, up to 62 ** 4 tasks per group
+_SPACED_WIDTH = 4
+
+
+class InvalidPosition(Exception):
+    def __init__(self, message="Invalid position key"):
+        self.message = message
+        super().__init__(self.message)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """a fraction between a and b, b None meaning 1"""
+    if b is not None:
+        # the common prefix is kept as is, a is padded with zeros
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # consecutive digits
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise InvalidPosition(f"Invalid position key head: {head}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    if not key:
+        raise InvalidPosition("Empty position key")
+    length = _integer_length(key[0])
+    if len(key) < length or key.endswith("0") and len(key) > length:
+        raise InvalidPosition(f"Invalid position key: {key}")
+    return key[:length], key[length:]
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = "0"
+    # every digit carried, the integer part grows by one digit
+    if head == "Z":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """a key sorting after a and before b, None for an open end"""
+    if a is None and b is None:
+        return INTEGER_ZERO
+    if a is None:
+        integer, fraction = _split(b)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if fraction:
+            return integer
+        lower = _decrement(integer)
+        if lower is None:
+            raise InvalidPosition("Cannot place before the smallest key")
+        return lower
+    if b is None:
+        integer, fraction = _split(a)
+        higher = _increment(integer)
+        return integer + _midpoint(fraction, None) if higher is None else higher
+
+    if a >= b:
+        raise InvalidPosition(f"Position keys out of order: {a} >= {b}")
+    integer_a, fraction_a = _split(a)
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    higher = _increment(integer_a)
+    if higher is None:
+        raise InvalidPosition("Cannot place after the largest key")
+    if higher < b:
+        return higher
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], n: int) -> list[str]:
+    """n ascending keys between a and b"""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(n - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = key_between(a, b)
+    half = n // 2
+    return keys_between(a, middle, half) + [middle] + keys_between(middle, b, n - half - 1)
+
+
+def _base62(rank: ColumnElement, width: int) -> ColumnElement:
+    # row_number() is a bigint, substr only takes an int
+    rank = cast(rank, Integer)
+    digits = [
+        func.substr(DIGITS, rank // 62**power % 62 + 1, 1)
+        for power in reversed(range(width))
+    ]
+    key = digits[0]
+    for digit in digits[1:]:
+        key = key.concat(digit)
+    return key
+
+
+def spaced_key(rank: ColumnElement) -> ColumnElement:
+    """SQL for the rank-th (from 0) of a run of evenly spaced, equally long keys"""
+    return literal("d").concat(_base62(rank, _SPACED_WIDTH))
+
+
+def appended_key(last: ColumnElement, rank: ColumnElement) -> ColumnElement:
+    """SQL for the rank-th (from 0) of a run of keys all sorting after `last`,
+    `last` being NULL for an empty group"""
+    return (
+        func.coalesce(last, INTEGER_ZERO)
+        .concat(_base62(rank, _SPACED_WIDTH))
+        .concat("V")
+    )
@@ -1,25 +1,85 @@
 from contextlib import contextmanager, AbstractContextManager
-import os
-from sqlalchemy import create_engine
+import contextvars
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from typing import Annotated, Any, Generator
+from typing import Annotated, Any, Generator, Optional
+from src.common.config import Config
+from src.infrastructure.observability.logger import record_timing
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    record_timing("db", (time.perf_counter() - start) * 1000)
+
+
+# set by use_session, every Repository.session() inside joins this session
+# instead of opening its own, the owner commits or rolls it back
+_shared_session: contextvars.ContextVar[Optional[Session]] = contextvars.ContextVar(
+    "shared_session", default=None
+)
+
+
+def _read_only_snapshot(session, transaction, connection):
+    connection.exec_driver_sql(
+        "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"
+    )
+
+
+@contextmanager
+def use_session(session: Session):
+    token = _shared_session.set(session)
+    try:
+        yield session
+    finally:
+        _shared_session.reset(token)
 
 
 class Repository:
     __engine: Engine
     __session_factory: sessionmaker
 
-    def __init__(self):
-        self.__engine = create_engine(os.environ.get("DATABASE_URL"))
+    def __init__(self, config: Config):
+        self.__engine = create_engine(config.database_url)
+        event.listen(self.__engine, "before_cursor_execute", _before_execute)
+        event.listen(self.__engine, "after_cursor_execute", _after_execute)
         with Session(self.__engine) as session:
             session.execute
         self.__session_factory = scoped_session(
             sessionmaker(bind=self.__engine),
         )
 
+    def shared_session(self, read_only: bool = False) -> Session:
+        """a session owned by the caller, to be shared through use_session.
+
+        A read only one runs as one REPEATABLE READ snapshot, so every read
+        sees the same state.
+        """
+        session = Session(bind=self.__engine)
+        if read_only:
+            event.listen(session, "after_begin", _read_only_snapshot)
+        return session
+
+    def dedicated_connection(self):
+        """a DBAPI connection of its own outside the pool, for LISTEN or session locks"""
+        args, params = self.__engine.dialect.create_connect_args(self.__engine.url)
+        return self.__engine.dialect.connect(*args, **params)
+
+    def dispose(self) -> None:
+        self.__engine.dispose()
+
     @contextmanager
     def session(self) -> Generator[Any, Any, Annotated[Session, AbstractContextManager[Session]]]:
+        shared = _shared_session.get()
+        if shared is not None:
+            yield shared
+            return
+
         session: Annotated[Session, AbstractContextManager[Session]] = self.__session_factory()
         try:
             yield session
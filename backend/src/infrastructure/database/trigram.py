@@ -0,0 +1,20 @@
+from sqlalchemy import func, or_
+
+# longer input only adds trigrams to look up, a typeahead never needs them
+MAX_QUERY_LENGTH = 64
+
+
+def trigram_match(q: str, *columns) -> tuple:
+    """the condition that one of columns has a word like q, and how alike.
+
+    Uses pg_trgm's word similarity: `column %> q` holds when some stretch of
+    the column is at least `pg_trgm.word_similarity_threshold` (0.6) alike q,
+    so a prefix being typed ("jo" for "John Smith") or a typo still matches,
+    case aside. Each column's (tenant_id, column gin_trgm_ops) index answers
+    it together with the caller's tenant_id condition, so only that tenant's
+    rows are fetched and rechecked; order by the similarity, best first.
+    """
+    q = q[:MAX_QUERY_LENGTH]
+    condition = or_(*[column.op("%>")(q) for column in columns])
+    similarity = func.greatest(*[func.word_similarity(q, column) for column in columns])
+    return condition, similarity
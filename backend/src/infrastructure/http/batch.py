@@ -0,0 +1,195 @@
+import asyncio
+import re
+from typing import Annotated, Any, Literal, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
+
+from src.common.model import Model
+from src.common.token import TokenPayload
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.database.repository import use_session
+from src.infrastructure.http.guarded import batch_auth, get_current_user
+from src.infrastructure.http.idempotency import IdempotentRoute
+from src.infrastructure.observability.logger import request_id_var
+
+router = APIRouter(tags=["batch"], route_class=IdempotentRoute)
+
+MAX_BATCH_REQUESTS = 20
+# sub-request paths are relative to the api version the batch is mounted on
+API_PREFIX = "/api/v1"
+# a sub-request's response is buffered whole, so streams, long-polls and
+# streamed uploads never finish inside a batch, nor does a nested batch
+_UNBATCHABLE = re.compile(r"^/batch$|/events$|:import$")
+
+
+class BatchItem(Model):
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str
+    body: Optional[Any] = None
+
+
+class BatchRequest(Model):
+    requests: list[BatchItem]
+    # writes all commit or all roll back, the first failure stops the batch
+    atomic: bool = False
+
+
+class BatchItemResponse(Model):
+    id: Optional[str]
+    status: int
+    body: Optional[Any]
+
+
+class BatchResponse(Model):
+    responses: list[BatchItemResponse]
+
+
+class InvalidBatch(Exception):
+    def __init__(self, message="Invalid batch"):
+        self.message = message
+        super().__init__(self.message)
+
+
+def _validate(batch: BatchRequest) -> None:
+    if not batch.requests:
+        raise InvalidBatch("A batch needs at least one request")
+    if len(batch.requests) > MAX_BATCH_REQUESTS:
+        raise InvalidBatch(f"A batch holds at most {MAX_BATCH_REQUESTS} requests")
+    for item in batch.requests:
+        if not item.path.startswith("/") or not _batchable(item.path):
+            raise InvalidBatch(f"Invalid batch path: {item.path}")
+
+
+def _batchable(path: str) -> bool:
+    url = urlsplit(path)
+    route = url.path.rstrip("/") or "/"
+    if _UNBATCHABLE.search(route):
+        return False
+    query = dict(parse_qsl(url.query, keep_blank_values=True))
+    return not (route == "/changes" and "wait" in query)
+
+
+async def _dispatch(
+    client: httpx.AsyncClient,
+    item: BatchItem,
+    headers: dict,
+    timeout: float,
+    pending: Optional[set] = None,
+) -> BatchItemResponse:
+    # the transport awaits the app itself, httpx's own timeouts do not apply
+    request = asyncio.ensure_future(
+        client.request(
+            item.method,
+            API_PREFIX + item.path,
+            json=item.body if item.method != "GET" else None,
+            headers=headers,
+        )
+    )
+    done, _ = await asyncio.wait({request}, timeout=timeout)
+    if not done:
+        if pending is None:
+            request.cancel()
+        else:
+            # cancelling would not stop its handler's thread, which holds the
+            # shared session until it returns, so it is left to finish
+            pending.add(request)
+        return BatchItemResponse(
+            id=item.id, status=504, body={"detail": "Sub-request timed out"}
+        )
+    response = request.result()
+    if not response.content:
+        return BatchItemResponse(id=item.id, status=response.status_code, body=None)
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = response.json()
+    else:
+        body = response.text
+    return BatchItemResponse(id=item.id, status=response.status_code, body=body)
+
+
+@router.post("/batch")
+async def batch(
+    request: Request,
+    payload: BatchRequest,
+    auth: Annotated[TokenPayload, Depends(get_current_user)],
+    container: Annotated[Container, Depends(get_container)],
+) -> BatchResponse:
+    """runs the sub-requests in order through the app, under the batch's auth.
+
+    A batch of only GETs reads from one session and one snapshot. An atomic
+    batch runs everything in one transaction. Any other batch runs each
+    sub-request with its own sessions, as if it was sent alone. A sub-request
+    running past `batch_item_timeout_seconds` is answered with a 504, and in a
+    shared session nothing after it runs and the session is rolled back once
+    its handler returns.
+    """
+    _validate(payload)
+    read_only = all(item.method == "GET" for item in payload.requests)
+    shared = None
+    if read_only or payload.atomic:
+        shared = container.repository.shared_session(read_only=read_only)
+
+    timeout = container.config.batch_item_timeout_seconds
+    headers = {"X-Request-ID": request_id_var.get() or ""}
+    if request.headers.get("Authorization"):
+        headers["Authorization"] = request.headers["Authorization"]
+
+    responses: list[BatchItemResponse] = []
+    failed = False
+    auth_token = batch_auth.set(auth)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=request.app, raise_app_exceptions=False),
+            base_url="http://batch",
+            cookies=request.cookies,
+        ) as client:
+            if shared is None:
+                for item in payload.requests:
+                    responses.append(await _dispatch(client, item, headers, timeout))
+            else:
+                pending: set = set()
+                with use_session(shared):
+                    try:
+                        for item in payload.requests:
+                            if failed:
+                                # nothing after a failure runs in an atomic batch, nor
+                                # after a timeout in any batch sharing the session
+                                responses.append(
+                                    BatchItemResponse(id=item.id, status=424, body=None)
+                                )
+                                continue
+                            response = await _dispatch(
+                                client, item, headers, timeout, pending
+                            )
+                            failed = response.status == 504 or (
+                                payload.atomic and response.status >= 400
+                            )
+                            responses.append(response)
+                    finally:
+                        # the session is only rolled back and closed once no
+                        # timed out handler uses it any more
+                        if pending:
+                            await asyncio.wait(pending)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        batch_auth.reset(auth_token)
+        if shared is not None:
+            # the session is closed off the event loop, it may still talk to the database
+            await run_in_threadpool(_finish, shared, failed)
+
+    return BatchResponse(responses=responses)
+
+
+def _finish(session, failed: bool) -> None:
+    try:
+        if failed:
+            session.rollback()
+        else:
+            session.commit()
+    finally:
+        session.close()
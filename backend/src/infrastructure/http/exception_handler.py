@@ -1,8 +1,19 @@
 from fastapi.responses import JSONResponse
+from src.domain.changes.entity.exception import ChangesExpired
 from src.domain.identity.entity import exception as identity_exception
 from src.domain.workspaces.entity import exception as workspace_exception
 from src.infrastructure.security.tokenManager import JwtExpired, InvalidJwtToken
 from src.infrastructure.http.guarded import AuthException
+from src.infrastructure.security.cursor import InvalidCursor
+from src.infrastructure.http.batch import InvalidBatch
+from src.infrastructure.http.idempotency import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyMismatch,
+    InvalidIdempotencyKey,
+)
+from src.infrastructure.security.passwordPool import PasswordQueueFull
+from src.infrastructure.security.loginThrottle import LoginThrottled
+from src.infrastructure.realtime.boardEvents import BoardEventsUnavailable
 def register_error_handlers(app):
     @app.exception_handler(identity_exception.UserNotFound)
     def user_not_found_exception_handler(request, exc):
@@ -53,6 +64,119 @@ def register_error_handlers(app):
             content={"detail": "Task not found"},
         )
 
+    @app.exception_handler(workspace_exception.InvalidFields)
+    def invalid_fields_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(workspace_exception.InvalidTaskBatch)
+    def invalid_task_batch_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(workspace_exception.InvalidTaskSearch)
+    def invalid_task_search_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(workspace_exception.InvalidTaskPosition)
+    def invalid_task_position_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(workspace_exception.InvalidTaskImport)
+    def invalid_task_import_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(workspace_exception.TaskImportRejected)
+    def task_import_rejected_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=422,
+            content={
+                "detail": exc.message,
+                "errorCount": exc.total,
+                "errors": [error.model_dump() for error in exc.errors],
+            },
+        )
+
+    @app.exception_handler(InvalidBatch)
+    def invalid_batch_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(InvalidIdempotencyKey)
+    def invalid_idempotency_key_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(IdempotencyKeyMismatch)
+    def idempotency_key_mismatch_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=422,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(IdempotencyKeyInProgress)
+    def idempotency_key_in_progress_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=409,
+            content={"detail": exc.message},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(InvalidCursor)
+    def invalid_cursor_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(PasswordQueueFull)
+    def password_queue_full_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": exc.message},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(BoardEventsUnavailable)
+    def board_events_unavailable_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": exc.message},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(LoginThrottled)
+    def login_throttled_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=429,
+            content={"detail": exc.message},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(ChangesExpired)
+    def changes_expired_exception_handler(request, exc):
+        return JSONResponse(
+            status_code=410,
+            content={"detail": exc.message},
+        )
+
     @app.exception_handler(JwtExpired)
     def jwt_expired_exception_handler(request, exc):
         return JSONResponse(
@@ -1,9 +1,10 @@
-import os
-from fastapi import Request
-import jwt
+import contextvars
+from typing import Annotated, Optional
+from fastapi import Depends, Request
 from src.domain.identity.entity.logout import RefreshToken
 from src.common.token import TokenPayload
-from src.infrastructure.security.tokenManager import JwtTokenManager
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.observability.logger import timed
 
 
 class AuthException(Exception):
@@ -14,43 +15,40 @@ class AuthException(Exception):
         super().__init__(self.message)
 
 
-def get_current_user(request: Request) -> TokenPayload:
+# set by the batch endpoint, its sub-requests reuse the batch's auth
+batch_auth: contextvars.ContextVar[Optional[TokenPayload]] = contextvars.ContextVar(
+    "batch_auth", default=None
+)
+
+
+async def get_current_user(
+    request: Request, container: Annotated[Container, Depends(get_container)]
+) -> TokenPayload:
+    resolved = batch_auth.get() or getattr(request.state, "auth", None)
+    if resolved is not None:
+        return resolved
+
+    with timed("auth"):
+        # kept on the request, a second caller like IdempotentRoute reuses it
+        request.state.auth = _authenticate(request, container)
+    return request.state.auth
+
+
+def _authenticate(request: Request, container: Container) -> TokenPayload:
     token = request.cookies.get("access_token")
     if token:
-        res = jwt.decode(
-            token,
-            os.environ.get("ACCESS_TOKEN_SECRET"),
-            algorithms=["HS256"],
-            options={
-                "verify_signature": (
-                    False if os.getenv("BYPASS_SECURITY", "FALSE") == "TRUE" else True
-                )
-            },
-        )
-        return TokenPayload.model_validate(res)
+        return container.token_manager.verify_access_token(token)
 
     auth = request.headers.get("Authorization")
     if auth and auth.startswith("Bearer "):
         token = auth.split(" ", maxsplit=1)[1]
         if token:
-            res = jwt.decode(
-                token,
-                os.environ.get("ACCESS_TOKEN_SECRET"),
-                algorithms=["HS256"],
-                options={
-                    "verify_signature": (
-                        False
-                        if os.getenv("BYPASS_SECURITY", "FALSE") == "TRUE"
-                        else True
-                    )
-                },
-            )
-            return TokenPayload.model_validate(res)
+            return container.token_manager.verify_access_token(token)
 
     raise AuthException()
 
 
-def get_refresh_token(request: Request) -> RefreshToken:
+async def get_refresh_token(request: Request) -> RefreshToken:
     token = request.cookies.get("refresh_token")
     if token:
         return RefreshToken(token=token)
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import time
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.database.idempotency import StoredResponse
+from src.infrastructure.http.guarded import AuthException, get_current_user
+from src.infrastructure.http.request_log import TimedRoute
+from src.infrastructure.observability.logger import timed
+from src.infrastructure.security.tokenManager import InvalidJwtToken, JwtExpired
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# a duplicate polls for the first attempt's response, backing off up to this
+_MAX_POLL_SECONDS = 0.5
+
+
+class InvalidIdempotencyKey(Exception):
+    def __init__(self, message="Invalid Idempotency-Key"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class IdempotencyKeyMismatch(Exception):
+    def __init__(
+        self, message="Idempotency-Key was already used for a different request"
+    ):
+        self.message = message
+        super().__init__(self.message)
+
+
+class IdempotencyKeyInProgress(Exception):
+    def __init__(
+        self,
+        message="A request with this Idempotency-Key is still in progress",
+        retry_after: int = 1,
+    ):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class IdempotentRoute(TimedRoute):
+    """POST and PATCH requests sent with an Idempotency-Key run at most once.
+
+    The response is stored per user and key, a retry gets it back with an
+    Idempotent-Replayed header instead of running the endpoint again. A
+    duplicate arriving while the first attempt runs waits for its response.
+    Reusing a key for a different method, path, query or body is rejected.
+    Requests without auth or with a streamed, non JSON body pass through,
+    and so does anything the endpoint fails with, the key is released and a
+    retry runs again.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None or request.method not in ("POST", "PATCH"):
+                return await handler(request)
+            content_type = request.headers.get("content-type", "")
+            if content_type and not content_type.startswith("application/json"):
+                return await handler(request)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                raise InvalidIdempotencyKey(
+                    f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+                )
+
+            container: Container = await request.app.dependency_overrides.get(
+                get_container, get_container
+            )()
+            try:
+                # kept on the request, the endpoint's own dependency reuses it
+                auth = await get_current_user(request, container)
+            except (AuthException, JwtExpired, InvalidJwtToken):
+                # the endpoint answers with the auth error itself
+                return await handler(request)
+
+            scope = (auth.tenant_id, auth.id, key)
+            fingerprint = await _fingerprint(request)
+            stored = await _claim(container, scope, fingerprint)
+            if stored is not None:
+                return _replay(stored)
+
+            store = container.idempotency
+            try:
+                response = await handler(request)
+            except BaseException:
+                await run_in_threadpool(store.release, *scope)
+                raise
+            body = getattr(response, "body", None)
+            if response.status_code >= 500 or body is None:
+                await run_in_threadpool(store.release, *scope)
+            else:
+                await run_in_threadpool(
+                    store.complete,
+                    *scope,
+                    response.status_code,
+                    response.headers.get("content-type"),
+                    bytes(body),
+                )
+            return response
+
+        return idempotent_handler
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def _claim(
+    container: Container, scope: tuple[int, int, str], fingerprint: str
+) -> StoredResponse | None:
+    """None once this request owns the (tenant, user, key) scope, else the
+    response to replay"""
+    store = container.idempotency
+    deadline = time.monotonic() + container.config.idempotency_wait_seconds
+    delay = 0.05
+    with timed("idempotency"):
+        stored = await run_in_threadpool(store.claim, *scope, fingerprint)
+        while stored is not None:
+            if stored.fingerprint != fingerprint:
+                raise IdempotencyKeyMismatch()
+            if stored.status_code is not None:
+                return stored
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_POLL_SECONDS)
+            stored = await run_in_threadpool(store.get, *scope)
+            if stored is None:
+                # the first attempt failed and released the key
+                stored = await run_in_threadpool(store.claim, *scope, fingerprint)
+    return None
+
+
+def _replay(stored: StoredResponse) -> Response:
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type=stored.content_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.exception import WorkspaceNotFound
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.realtime.liveHub import LiveConnection
+from src.infrastructure.security.tokenManager import InvalidJwtToken, JwtExpired
+
+router = APIRouter(tags=["live"])
+
+# a client authenticating by message has this long to send it
+AUTH_TIMEOUT_SECONDS = 10
+POLICY_VIOLATION = 1008
+UNSUPPORTED_DATA = 1003
+
+
+def _handshake_auth(websocket: WebSocket, container: Container) -> Optional[TokenPayload]:
+    token = websocket.cookies.get("access_token")
+    auth = websocket.headers.get("Authorization")
+    if not token and auth and auth.startswith("Bearer "):
+        token = auth.split(" ", maxsplit=1)[1]
+    if not token:
+        return None
+    return container.token_manager.verify_access_token(token)
+
+
+async def _message_auth(websocket: WebSocket, container: Container) -> TokenPayload:
+    message = await asyncio.wait_for(websocket.receive_json(), AUTH_TIMEOUT_SECONDS)
+    if not isinstance(message, dict) or message.get("type") != "auth":
+        raise InvalidJwtToken()
+    return container.token_manager.verify_access_token(str(message.get("token")))
+
+
+@router.websocket("/live")
+async def live(
+    websocket: WebSocket,
+    container: Annotated[Container, Depends(get_container)],
+):
+    """board events of the workspaces the client subscribes to, on one socket.
+
+    Authenticates with the access token cookie or bearer header of the
+    handshake, or else a first `{"type": "auth", "token": ...}` message.
+    Then takes `{"type": "subscribe" | "unsubscribe", "workspaceId": 3}` and
+    `{"type": "ping"}`, see LiveHub for what is sent back.
+    """
+    hub = container.live_hub
+    await run_in_threadpool(hub.start)
+    await websocket.accept()
+    try:
+        auth = _handshake_auth(websocket, container) or await _message_auth(
+            websocket, container
+        )
+    except (InvalidJwtToken, JwtExpired, asyncio.TimeoutError, ValueError):
+        await websocket.close(POLICY_VIOLATION, "Authentication failed")
+        return
+    except WebSocketDisconnect:
+        return
+
+    connection = hub.connect(websocket)
+    try:
+        await websocket.send_json({"type": "ready"})
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, json.JSONDecodeError):
+                await websocket.close(UNSUPPORTED_DATA, "Messages are JSON")
+                return
+            reply = await _handle(container, connection, auth, message)
+            if reply is not None and not connection.closed:
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(connection)
+
+
+async def _handle(
+    container: Container, connection: LiveConnection, auth: TokenPayload, message
+) -> Optional[dict]:
+    kind = message.get("type") if isinstance(message, dict) else None
+    if kind == "ping":
+        return {"type": "pong"}
+    workspace_id = message.get("workspaceId") if isinstance(message, dict) else None
+    if kind not in ("subscribe", "unsubscribe") or not isinstance(workspace_id, int):
+        return {"type": "error", "detail": "Unknown message"}
+
+    hub = container.live_hub
+    if kind == "unsubscribe":
+        hub.unsubscribe(connection, workspace_id)
+        return {"type": "unsubscribed", "workspaceId": workspace_id}
+    try:
+        await run_in_threadpool(
+            container.workspace_usecase.ensure_workspace, auth, workspace_id
+        )
+    except WorkspaceNotFound as exc:
+        return {"type": "error", "workspaceId": workspace_id, "detail": exc.message}
+    if not hub.subscribe(connection, workspace_id):
+        return {
+            "type": "error",
+            "workspaceId": workspace_id,
+            "detail": "Too many subscriptions",
+        }
+    return {"type": "subscribed", "workspaceId": workspace_id}
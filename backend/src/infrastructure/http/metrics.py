@@ -0,0 +1,19 @@
+import hmac
+from typing import Annotated
+from fastapi import APIRouter, Depends, Request
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.http.guarded import AuthException
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def metrics(
+    request: Request, container: Annotated[Container, Depends(get_container)]
+) -> dict:
+    """internal counters, for whoever holds METRICS_TOKEN"""
+    token = container.config.metrics_token
+    auth = request.headers.get("Authorization", "")
+    if not token or not hmac.compare_digest(auth.encode(), f"Bearer {token}".encode()):
+        raise AuthException()
+    return container.metrics()
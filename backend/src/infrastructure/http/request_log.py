@@ -0,0 +1,127 @@
+import functools
+import inspect
+import os
+import random
+import time
+import uuid
+
+from fastapi.routing import APIRoute
+
+from src.infrastructure.observability.logger import (
+    get_logger,
+    request_id_var,
+    timings_var,
+)
+
+logger = get_logger("request")
+
+
+def _parse_rates(raw: str) -> dict[str, float]:
+    """LOG_SAMPLE_ROUTES looks like `/api/v1/identity/me=0.05,/api/v1/workspaces/=0.1`"""
+    rates = {}
+    for item in raw.split(","):
+        route, _, rate = item.strip().rpartition("=")
+        if route:
+            rates[route] = float(rate)
+    return rates
+
+
+class RequestLogMiddleware:
+    """assigns a request id and logs one sampled summary record per request"""
+
+    def __init__(self, app):
+        self.app = app
+        self.__default_rate = float(os.environ.get("LOG_SAMPLE_RATE", 1.0))
+        self.__route_rates = _parse_rates(os.environ.get("LOG_SAMPLE_ROUTES", ""))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = (
+            dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+            or uuid.uuid4().hex
+        )
+        timings: dict[str, float] = {}
+        request_id_token = request_id_var.set(request_id)
+        timings_token = timings_var.set(timings)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            route = scope.get("route")
+            path = route.path if route else scope["path"]
+            rate = self.__route_rates.get(path, self.__default_rate)
+            # failures are always kept, successes are sampled per route
+            if status >= 500 or random.random() < rate:
+                logger.info(
+                    "request",
+                    extra={
+                        "fields": {
+                            "method": scope["method"],
+                            "route": path,
+                            "status": status,
+                            "durationMs": round((time.perf_counter() - start) * 1000, 2),
+                            "timings": {
+                                name: round(elapsed, 2)
+                                for name, elapsed in timings.items()
+                                if not name.startswith("_")
+                            },
+                        }
+                    },
+                )
+            request_id_var.reset(request_id_token)
+            timings_var.reset(timings_token)
+
+
+class TimedRoute(APIRoute):
+    """records the endpoint body as `handler` and response serialization as `serialize`"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = timings_var.get()
+            if timings is not None and "_endpoint_end" in timings:
+                timings["serialize"] = (
+                    time.perf_counter() - timings.pop("_endpoint_end")
+                ) * 1000
+            return response
+
+        return timed_handler
+
+
+def _timed_endpoint(endpoint):
+    # include_router rebuilds every route from the already wrapped endpoint
+    if getattr(endpoint, "__timed__", False) or inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            timings = timings_var.get()
+            if timings is not None:
+                timings["handler"] = (end - start) * 1000
+                timings["_endpoint_end"] = end
+
+    wrapper.__timed__ = True
+    return wrapper
@@ -0,0 +1,31 @@
+import io
+from typing import AsyncIterator
+
+from anyio import from_thread
+
+
+class BlockingBodyReader(io.RawIOBase):
+    """a file over an async request body stream, for code running in the threadpool.
+
+    Each read pulls the next chunk from the event loop, so the body is consumed
+    as it arrives instead of being buffered whole.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self.__chunks = chunks
+        self.__pending = b""
+        self.__done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.__pending and not self.__done:
+            try:
+                self.__pending = from_thread.run(self.__chunks.__anext__)
+            except StopAsyncIteration:
+                self.__done = True
+        size = min(len(buffer), len(self.__pending))
+        buffer[:size] = self.__pending[:size]
+        self.__pending = self.__pending[size:]
+        return size
@@ -0,0 +1,119 @@
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+timings_var: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "timings", default=None
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_plain = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """one json object per line, `extra={"fields": {...}}` is merged into it"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None) or request_id_var.get()
+        if request_id:
+            entry["requestId"] = request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """never blocks the caller, records are dropped and counted when the writer falls behind"""
+
+    dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # the request id lives in a contextvar that the writer thread cannot see
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging() -> None:
+    """routes every record through a bounded queue to a background stdout writer"""
+    global _listener
+    if _listener:
+        return
+
+    log_queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", 10000)))
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    root.handlers = [DroppingQueueHandler(log_queue)]
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """flushes whatever is still queued"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+@contextmanager
+def timed(name: str):
+    """adds the elapsed milliseconds to the current request timings"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, (time.perf_counter() - start) * 1000)
+
+
+def record_timing(name: str, elapsed_ms: float) -> None:
+    timings = timings_var.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed_ms
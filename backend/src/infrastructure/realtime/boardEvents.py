@@ -0,0 +1,286 @@
+import asyncio
+import json
+import select
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable, NamedTuple, Optional
+
+from src.common.config import Config
+from src.infrastructure.database.notify import BOARD_CHANNEL
+from src.infrastructure.database.repository import Repository
+from src.infrastructure.observability.logger import get_logger
+
+logger = get_logger(__name__)
+
+# how long an EventSource waits before reconnecting
+RETRY_MS = 3000
+_START_TIMEOUT_SECONDS = 5
+_MAX_RECONNECT_BACKOFF_SECONDS = 30
+
+
+class BoardEventsUnavailable(Exception):
+    def __init__(self, message="Board events are unavailable", retry_after: int = 5):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+class BoardEvent(NamedTuple):
+    id: int
+    workspace_id: int
+    type: str
+    task_id: Optional[int]
+    # the NOTIFY payload, sent to the client as is
+    data: str
+
+
+class BoardEventListener(NamedTuple):
+    """called on the listener thread, must hand the work over and return"""
+
+    on_event: Callable[[BoardEvent], None]
+    # events up to this id may have been missed
+    on_missed: Callable[[int], None]
+
+
+class Subscription:
+    """one stream's events for one workspace, handed over on the stream's loop.
+
+    A stream that falls `queue_size` events behind is marked lagged instead of
+    buffering more, it tells its client to reload the board and carries on.
+    """
+
+    def __init__(self, workspace_id: int, queue_size: int):
+        self.workspace_id = workspace_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[Optional[BoardEvent]] = asyncio.Queue(queue_size)
+        self.replay: list[BoardEvent] = []
+        # set when events were missed, the id the client resumes from after a reload
+        self.reset_id: Optional[int] = None
+
+    def deliver(self, event: BoardEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.missed(event.id)
+
+    def missed(self, event_id: int) -> None:
+        # handed over in delivery order, the last one is the latest
+        self.reset_id = event_id
+        try:
+            # wakes the stream up
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class BoardEvents:
+    """fans board change events out from one LISTEN connection per process.
+
+    The listener thread starts with the first subscriber. The last
+    `buffer_size` events are kept in the order they were delivered, so a
+    client reconnecting with Last-Event-ID gets every event delivered after
+    that one. Ids come from a sequence when the event is written, not when it
+    commits, so they are not in delivery order and are only used to find the
+    event in the buffer. An event no longer buffered, or one from before the
+    listener last connected, cannot be resumed from and the client is told
+    to reload.
+    """
+
+    __repository: Repository
+    __subscribers: dict[int, set[Subscription]]
+    __buffer: deque[BoardEvent]
+    __lock: threading.Lock
+    __thread: Optional[threading.Thread]
+    __listeners: list[BoardEventListener]
+
+    def __init__(self, config: Config, repository: Repository):
+        self.__repository = repository
+        self.__buffer_size = config.board_events_buffer_size
+        self.__queue_size = config.board_events_queue_size
+        self.__heartbeat = config.board_events_heartbeat_seconds
+        self.__subscribers = {}
+        self.__listeners = []
+        self.__buffer = deque()
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__ready = threading.Event()
+        self.__closing = threading.Event()
+        # the id resuming from which replays the whole buffer, the last event
+        # dropped from it, or the sequence's value when the listener connected
+        self.__origin = 0
+        self.__received = 0
+        self.__lagged = 0
+
+    def start(self) -> None:
+        """starts the listener once, blocks until it is listening"""
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__listen, name="board-events", daemon=True
+                )
+                self.__thread.start()
+        if not self.__ready.wait(_START_TIMEOUT_SECONDS):
+            raise BoardEventsUnavailable()
+
+    def add_listener(self, listener: BoardEventListener) -> None:
+        """gets every event of every workspace, for another fan-out like LiveHub"""
+        with self.__lock:
+            self.__listeners.append(listener)
+
+    def subscribe(self, workspace_id: int, last_event_id: Optional[int]) -> Subscription:
+        """called on the stream's event loop, after `start`"""
+        subscription = Subscription(workspace_id, self.__queue_size)
+        with self.__lock:
+            if last_event_id is not None:
+                replay = self.__after(last_event_id)
+                if replay is None:
+                    subscription.reset_id = (
+                        self.__buffer[-1].id if self.__buffer else self.__origin
+                    )
+                else:
+                    subscription.replay = [
+                        event for event in replay if event.workspace_id == workspace_id
+                    ]
+            self.__subscribers.setdefault(workspace_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.__lock:
+            subscribers = self.__subscribers.get(subscription.workspace_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.__subscribers[subscription.workspace_id]
+
+    async def stream(
+        self, workspace_id: int, last_event_id: Optional[int]
+    ) -> AsyncIterator[str]:
+        """the workspace's events as text/event-stream, with a comment as heartbeat.
+
+        Subscribes on the first iteration, so a response that never starts
+        streaming leaves nothing behind.
+        """
+        subscription = self.subscribe(workspace_id, last_event_id)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            for event in subscription.replay:
+                yield _format(event)
+            while True:
+                if subscription.reset_id is not None:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    reset_id, subscription.reset_id = subscription.reset_id, None
+                    with self.__lock:
+                        self.__lagged += 1
+                    yield f"id: {reset_id}\nevent: reset\ndata: {{}}\n\n"
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), self.__heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is not None and subscription.reset_id is None:
+                    yield _format(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "listening": self.__ready.is_set(),
+                "subscribers": sum(len(s) for s in self.__subscribers.values()),
+                "workspaces": len(self.__subscribers),
+                "received": self.__received,
+                "lagged": self.__lagged,
+            }
+
+    def close(self) -> None:
+        self.__closing.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout=2)
+
+    def __listen(self) -> None:
+        backoff = 0.5
+        reconnect = False
+        while not self.__closing.is_set():
+            connection = None
+            try:
+                connection = self.__repository.dedicated_connection()
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {BOARD_CHANNEL}")
+                    cursor.execute(
+                        "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END "
+                        "FROM board_event_id_seq"
+                    )
+                    (last_value,) = cursor.fetchone()
+                self.__listening(last_value, reconnect)
+                backoff = 0.5
+                while not self.__closing.is_set():
+                    if select.select([connection], [], [], 1.0)[0]:
+                        connection.poll()
+                        while connection.notifies:
+                            self.__publish(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("board events listener failed")
+            finally:
+                self.__ready.clear()
+                if connection is not None:
+                    connection.close()
+            reconnect = True
+            self.__closing.wait(backoff)
+            backoff = min(backoff * 2, _MAX_RECONNECT_BACKOFF_SECONDS)
+
+    def __listening(self, last_value: int, reconnect: bool) -> None:
+        with self.__lock:
+            # anything committed while not listening is gone, what is buffered
+            # cannot be resumed through to what is delivered from now on
+            self.__buffer.clear()
+            self.__origin = last_value
+            subscribers = [s for group in self.__subscribers.values() for s in group]
+            listeners = list(self.__listeners)
+        if reconnect:
+            for subscription in subscribers:
+                self.__hand_over(subscription, subscription.missed, last_value)
+            for listener in listeners:
+                listener.on_missed(last_value)
+        self.__ready.set()
+
+    def __publish(self, payload: str) -> None:
+        data = json.loads(payload)
+        event = BoardEvent(
+            data["id"], data["workspaceId"], data["type"], data.get("taskId"), payload
+        )
+        with self.__lock:
+            self.__received += 1
+            self.__buffer.append(event)
+            if len(self.__buffer) > self.__buffer_size:
+                self.__origin = self.__buffer.popleft().id
+            subscribers = list(self.__subscribers.get(event.workspace_id, ()))
+            listeners = list(self.__listeners)
+        for subscription in subscribers:
+            self.__hand_over(subscription, subscription.deliver, event)
+        for listener in listeners:
+            listener.on_event(event)
+
+    def __after(self, last_event_id: int) -> Optional[list[BoardEvent]]:
+        """the buffered events delivered after the given one, None when it is
+        not buffered"""
+        for position in range(len(self.__buffer) - 1, -1, -1):
+            if self.__buffer[position].id == last_event_id:
+                return list(self.__buffer)[position + 1 :]
+        if last_event_id == self.__origin:
+            return list(self.__buffer)
+        return None
+
+    def __hand_over(self, subscription: Subscription, fn, arg) -> None:
+        try:
+            subscription.loop.call_soon_threadsafe(fn, arg)
+        except RuntimeError:
+            # the stream's loop is closed, it unsubscribes on its way out
+            pass
+
+
+def _format(event: BoardEvent) -> str:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {event.data}\n\n"
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from typing import Iterable
+
+
+class ChangeSignal:
+    """wakes the change feed long polls of a tenant when its changes are appended.
+
+    Only appends made by this process's outbox dispatcher are signalled, a
+    long poll also looks again on its own every `changes_poll_seconds` for the
+    ones appended by another worker.
+    """
+
+    __watches: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]]
+    __lock: threading.Lock
+
+    def __init__(self):
+        self.__watches = {}
+        self.__lock = threading.Lock()
+
+    def watch(self, tenant_id: int) -> asyncio.Event:
+        """called on the poll's event loop, set on the tenant's next append"""
+        event = asyncio.Event()
+        with self.__lock:
+            self.__watches.setdefault(tenant_id, set()).add(
+                (asyncio.get_running_loop(), event)
+            )
+        return event
+
+    def unwatch(self, tenant_id: int, event: asyncio.Event) -> None:
+        with self.__lock:
+            watches = self.__watches.get(tenant_id)
+            if watches is None:
+                return
+            watches.difference_update([watch for watch in watches if watch[1] is event])
+            if not watches:
+                del self.__watches[tenant_id]
+
+    def notify(self, tenant_ids: Iterable[int]) -> None:
+        """called from any thread"""
+        with self.__lock:
+            watches = [
+                watch
+                for tenant_id in set(tenant_ids)
+                for watch in self.__watches.get(tenant_id, ())
+            ]
+        for loop, event in watches:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the poll's loop is closed, it unwatches on its way out
+                pass
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "tenants": len(self.__watches),
+                "polls": sum(len(watches) for watches in self.__watches.values()),
+            }
@@ -0,0 +1,278 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from starlette.websockets import WebSocket
+
+from src.common.config import Config
+from src.infrastructure.observability.logger import get_logger
+from src.infrastructure.realtime.boardEvents import (
+    BoardEvent,
+    BoardEventListener,
+    BoardEvents,
+)
+
+logger = get_logger(__name__)
+
+# close codes sent to a client the hub gives up on
+SLOW_CONSUMER = 1013
+GOING_AWAY = 1001
+
+
+class LiveConnection:
+    """one websocket and what is waiting to be sent to it.
+
+    Pending events are keyed by task, so a burst of changes to one task
+    within the coalescing window goes out once, as its latest event.
+    """
+
+    __slots__ = (
+        "websocket",
+        "loop",
+        "workspaces",
+        "pending",
+        "flushing",
+        "sending_since",
+        "closed",
+    )
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+        self.workspaces: set[int] = set()
+        self.pending: dict[tuple, str] = {}
+        self.flushing = False
+        # loop time the send in progress started at
+        self.sending_since: Optional[float] = None
+        self.closed = False
+
+
+class _LoopState:
+    """the connections of one event loop, only touched on that loop"""
+
+    __slots__ = ("connections", "dirty", "flush_scheduled", "watching")
+
+    def __init__(self):
+        self.connections: set[LiveConnection] = set()
+        # connections with events waiting for the coalescing window to end
+        self.dirty: list[LiveConnection] = []
+        self.flush_scheduled = False
+        self.watching = False
+
+
+class LiveHub:
+    """fans board events out to websockets, per workspace subscribed.
+
+    Fed by BoardEvents' one LISTEN connection, every event crosses over to the
+    event loop once however many connections get it. Events are sent in
+    frames of `{"type": "events", "events": [...]}`, gathered for
+    `ws_coalesce_ms` under one timer per loop. A connection with more than
+    `ws_send_buffer` events pending, or whose send does not complete within
+    `ws_send_timeout_seconds` (checked by a watchdog per loop rather than a
+    timeout per send), is closed with 1013 and reloads after reconnecting.
+    An idle connection costs its socket and a small LiveConnection, nothing
+    runs for it.
+    """
+
+    __events: BoardEvents
+    __workspaces: dict[int, set[LiveConnection]]
+    __loops: dict[asyncio.AbstractEventLoop, _LoopState]
+    __lock: threading.Lock
+
+    def __init__(self, config: Config, events: BoardEvents):
+        self.__events = events
+        self.__send_buffer = config.ws_send_buffer
+        self.__send_timeout = config.ws_send_timeout_seconds
+        self.__coalesce = config.ws_coalesce_ms / 1000
+        self.__max_subscriptions = config.ws_max_subscriptions
+        self.__workspaces = defaultdict(set)
+        self.__loops = {}
+        self.__lock = threading.Lock()
+        self.__started = False
+        self.__connections = 0
+        self.__frames = 0
+        self.__delivered = 0
+        self.__coalesced = 0
+        self.__slow = 0
+
+    def start(self) -> None:
+        """starts the board events listener, blocks until it is listening"""
+        with self.__lock:
+            if not self.__started:
+                self.__events.add_listener(
+                    BoardEventListener(self.__on_event, self.__on_missed)
+                )
+                self.__started = True
+        self.__events.start()
+
+    def connect(self, websocket: WebSocket) -> LiveConnection:
+        """called on the connection's event loop"""
+        connection = LiveConnection(websocket)
+        with self.__lock:
+            self.__connections += 1
+            state = self.__loops.setdefault(connection.loop, _LoopState())
+        state.connections.add(connection)
+        if not state.watching:
+            state.watching = True
+            connection.loop.call_later(self.__send_timeout / 2, self.__watch, state)
+        return connection
+
+    def subscribe(self, connection: LiveConnection, workspace_id: int) -> bool:
+        """False once the connection holds `ws_max_subscriptions` workspaces"""
+        if workspace_id in connection.workspaces:
+            return True
+        if len(connection.workspaces) >= self.__max_subscriptions:
+            return False
+        connection.workspaces.add(workspace_id)
+        with self.__lock:
+            self.__workspaces[workspace_id].add(connection)
+        return True
+
+    def unsubscribe(self, connection: LiveConnection, workspace_id: int) -> None:
+        connection.workspaces.discard(workspace_id)
+        with self.__lock:
+            self.__discard(connection, workspace_id)
+
+    def disconnect(self, connection: LiveConnection) -> None:
+        connection.closed = True
+        connection.pending.clear()
+        with self.__lock:
+            for workspace_id in connection.workspaces:
+                self.__discard(connection, workspace_id)
+            self.__connections -= 1
+            state = self.__loops[connection.loop]
+        state.connections.discard(connection)
+        connection.workspaces.clear()
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "connections": self.__connections,
+                "workspaces": len(self.__workspaces),
+                "subscriptions": sum(len(c) for c in self.__workspaces.values()),
+                "frames": self.__frames,
+                "delivered": self.__delivered,
+                "coalesced": self.__coalesced,
+                "slowConsumers": self.__slow,
+            }
+
+    def __discard(self, connection: LiveConnection, workspace_id: int) -> None:
+        connections = self.__workspaces.get(workspace_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.__workspaces[workspace_id]
+
+    def __on_event(self, event: BoardEvent) -> None:
+        # listener thread, one hand over per event loop
+        with self.__lock:
+            by_loop: dict[asyncio.AbstractEventLoop, list[LiveConnection]] = {}
+            for connection in self.__workspaces.get(event.workspace_id, ()):
+                by_loop.setdefault(connection.loop, []).append(connection)
+        for loop, connections in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self.__deliver, connections, event)
+            except RuntimeError:
+                pass
+
+    def __on_missed(self, event_id: int) -> None:
+        reset = f'{{"type": "reset", "id": {event_id}}}'
+        with self.__lock:
+            by_loop: dict[asyncio.AbstractEventLoop, list[LiveConnection]] = {}
+            for connections in self.__workspaces.values():
+                for connection in connections:
+                    by_loop.setdefault(connection.loop, []).append(connection)
+        for loop, connections in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self.__deliver_reset, connections, reset)
+            except RuntimeError:
+                pass
+
+    def __deliver(self, connections: list[LiveConnection], event: BoardEvent) -> None:
+        key = (event.workspace_id, "task", event.task_id) if event.task_id else (
+            event.workspace_id, "event", event.id
+        )
+        coalesced = 0
+        for connection in connections:
+            if connection.closed:
+                continue
+            if connection.pending.pop(key, None) is not None:
+                coalesced += 1
+            connection.pending[key] = event.data
+            self.__schedule(connection)
+        with self.__lock:
+            self.__coalesced += coalesced
+
+    def __deliver_reset(self, connections: list[LiveConnection], reset: str) -> None:
+        for connection in connections:
+            if not connection.closed:
+                connection.pending = {("reset",): reset}
+                self.__schedule(connection)
+
+    def __schedule(self, connection: LiveConnection) -> None:
+        if len(connection.pending) > self.__send_buffer:
+            self.__drop(connection)
+        elif not connection.flushing:
+            connection.flushing = True
+            state = self.__loops[connection.loop]
+            state.dirty.append(connection)
+            if not state.flush_scheduled:
+                state.flush_scheduled = True
+                connection.loop.call_later(self.__coalesce, self.__flush_dirty, state)
+
+    def __flush_dirty(self, state: _LoopState) -> None:
+        dirty, state.dirty = state.dirty, []
+        state.flush_scheduled = False
+        for connection in dirty:
+            connection.loop.create_task(self.__flush(connection))
+
+    async def __flush(self, connection: LiveConnection) -> None:
+        frames = delivered = 0
+        try:
+            while connection.pending and not connection.closed:
+                events, connection.pending = connection.pending, {}
+                frame = '{"type": "events", "events": [' + ", ".join(events.values()) + "]}"
+                connection.sending_since = connection.loop.time()
+                await connection.websocket.send_text(frame)
+                frames += 1
+                delivered += len(events)
+        except Exception:
+            # the socket is gone, its endpoint disconnects it
+            connection.closed = True
+        finally:
+            connection.sending_since = None
+            connection.flushing = False
+            with self.__lock:
+                self.__frames += frames
+                self.__delivered += delivered
+
+    def __watch(self, state: _LoopState) -> None:
+        if not state.connections:
+            state.watching = False
+            return
+        stuck_since = asyncio.get_running_loop().time() - self.__send_timeout
+        for connection in list(state.connections):
+            if connection.sending_since is not None and connection.sending_since < stuck_since:
+                self.__drop(connection)
+        asyncio.get_running_loop().call_later(self.__send_timeout / 2, self.__watch, state)
+
+    def __drop(self, connection: LiveConnection) -> None:
+        if connection.closed:
+            return
+        with self.__lock:
+            self.__slow += 1
+        logger.info(
+            "slow websocket consumer dropped",
+            extra={"fields": {"pending": len(connection.pending)}},
+        )
+        connection.closed = True
+        connection.pending.clear()
+        connection.loop.create_task(_close(connection.websocket, SLOW_CONSUMER))
+
+
+async def _close(websocket: WebSocket, code: int) -> None:
+    try:
+        await websocket.close(code)
+    except Exception:
+        pass
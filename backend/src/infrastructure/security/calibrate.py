@@ -0,0 +1,153 @@
+"""Picks argon2 parameters that hit a per-hash latency budget on this machine.
+
+    python -m src.infrastructure.security.calibrate --target-ms 250 --memory-mib 64
+
+writes the result to ARGON2_PARAMS_FILE, which the app loads at startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Optional
+
+import dotenv
+from argon2 import PasswordHasher
+
+from src.common.config import Config
+from src.infrastructure.observability.logger import get_logger
+
+logger = get_logger(__name__)
+
+# OWASP recommended floor for argon2id
+MIN_MEMORY_KIB = 19 * 1024
+MAX_TIME_COST = 10
+
+
+class MemoryBudgetTooLow(Exception):
+    def __init__(self, max_memory_kib: int):
+        self.message = (
+            f"argon2 memory budget of {max_memory_kib} KiB is below the "
+            f"{MIN_MEMORY_KIB} KiB floor, raise ARGON2_MAX_MEMORY_KIB"
+        )
+        super().__init__(self.message)
+
+
+def _measure(hasher: PasswordHasher, rounds: int = 3) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(target_ms: int, max_memory_kib: int, parallelism: int) -> dict:
+    """spends the whole memory budget first, then raises time_cost until the target is met.
+
+    When a single pass at full memory is already too slow, memory is halved
+    until it fits, down to MIN_MEMORY_KIB. A budget below that floor is
+    refused rather than exceeded, each pooled hash may use all of it.
+    """
+    if max_memory_kib < MIN_MEMORY_KIB:
+        raise MemoryBudgetTooLow(max_memory_kib)
+    memory_cost = max_memory_kib
+    elapsed = _measure(
+        PasswordHasher(time_cost=1, memory_cost=memory_cost, parallelism=parallelism)
+    )
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        elapsed = _measure(
+            PasswordHasher(
+                time_cost=1, memory_cost=memory_cost, parallelism=parallelism
+            )
+        )
+
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        candidate = _measure(
+            PasswordHasher(
+                time_cost=time_cost + 1,
+                memory_cost=memory_cost,
+                parallelism=parallelism,
+            )
+        )
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        elapsed = candidate
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "measured_ms": round(elapsed, 2),
+        "target_ms": target_ms,
+        "calibrated_at": int(time.time()),
+    }
+
+
+def save_parameters(path: str, parameters: dict) -> None:
+    with open(path, "w") as file:
+        json.dump(parameters, file, indent=2)
+
+
+def load_parameters(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def build_hasher(config: Config) -> PasswordHasher:
+    """library defaults unless calibrated parameters were persisted, or calibration is asked for"""
+    parameters = load_parameters(config.argon2_params_file)
+    if parameters is None and config.argon2_calibrate:
+        parameters = calibrate(
+            config.argon2_target_ms,
+            config.argon2_max_memory_kib,
+            config.argon2_parallelism,
+        )
+        save_parameters(config.argon2_params_file, parameters)
+        logger.info("argon2 calibrated", extra={"fields": parameters})
+
+    if parameters is None:
+        return PasswordHasher()
+    return PasswordHasher(
+        time_cost=parameters["time_cost"],
+        memory_cost=parameters["memory_cost"],
+        parallelism=parameters["parallelism"],
+    )
+
+
+def _default(name: str):
+    # the cli must work without the database and token secrets Config requires
+    return os.environ.get(name.upper(), Config.model_fields[name].default)
+
+
+def main():
+    dotenv.load_dotenv()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=int, default=_default("argon2_target_ms"))
+    parser.add_argument(
+        "--memory-mib",
+        type=int,
+        default=int(_default("argon2_max_memory_kib")) // 1024,
+    )
+    parser.add_argument(
+        "--parallelism", type=int, default=_default("argon2_parallelism")
+    )
+    parser.add_argument("--output", default=_default("argon2_params_file"))
+    args = parser.parse_args()
+
+    try:
+        parameters = calibrate(args.target_ms, args.memory_mib * 1024, args.parallelism)
+    except MemoryBudgetTooLow as exc:
+        parser.error(exc.message)
+    save_parameters(args.output, parameters)
+    print(json.dumps(parameters, indent=2))
+
+
+if __name__ == "__main__":
+    main()
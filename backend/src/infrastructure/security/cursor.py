@@ -0,0 +1,55 @@
+import base64
+import hashlib
+import hmac
+import json
+
+from src.common.config import Config
+
+
+class CursorCodec:
+    """Signed opaque pagination cursors, clients can pass them back but not forge them"""
+
+    __secret: bytes
+
+    def __init__(self, config: Config):
+        self.__secret = (config.cursor_secret or config.access_token_secret).encode()
+
+    def encode(self, sort: str, values: list) -> str:
+        body = _b64encode(
+            json.dumps([sort, values], separators=(",", ":"), default=str).encode()
+        )
+        return f"{body}.{self.__sign(body)}"
+
+    def decode(self, sort: str, cursor: str) -> list:
+        body, _, signature = cursor.partition(".")
+        if not hmac.compare_digest(signature.encode(), self.__sign(body).encode()):
+            raise InvalidCursor()
+
+        try:
+            cursor_sort, values = json.loads(_b64decode(body))
+        except (ValueError, TypeError):
+            raise InvalidCursor()
+
+        # a cursor is only meaningful for the order it was issued for
+        if cursor_sort != sort:
+            raise InvalidCursor("Cursor does not match the requested sort")
+        return values
+
+    def __sign(self, body: str) -> str:
+        return _b64encode(
+            hmac.new(self.__secret, body.encode(), hashlib.sha256).digest()[:16]
+        )
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class InvalidCursor(Exception):
+    def __init__(self, message="Invalid cursor"):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,254 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Protocol
+
+from sqlalchemy import text
+
+from src.common.config import Config
+from src.infrastructure.database.repository import Repository
+
+
+class ThrottleStore(Protocol):
+    """token buckets and failure windows keyed by an arbitrary string.
+
+    A bucket refills `rate` tokens per second up to `capacity` and every take
+    costs one token. A take while empty leaves the bucket at -1 at most, so
+    hammering a throttled key pushes its next allowed attempt back a little
+    instead of resetting it.
+    """
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        """seconds until the key may try again, 0 when this attempt is allowed"""
+        ...
+
+    def fail(self, key: str, window: int, threshold: int, lockout: int) -> None:
+        """records a failure, locking the key for `lockout` seconds once
+        `threshold` failures fall within the last `window` seconds"""
+        ...
+
+    def clear(self, key: str) -> None: ...
+
+    def prune(self, idle_seconds: int) -> None: ...
+
+
+class _Entry:
+    __slots__ = ("tokens", "updated_at", "failures", "locked_until")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        self.failures: deque[float] = deque()
+        self.locked_until = 0.0
+
+
+class MemoryThrottleStore:
+    """per process, limits multiply by the number of workers.
+
+    Holds at most `max_keys` entries, the least recently used one is evicted,
+    so a flood of random usernames cannot grow it without bound.
+    """
+
+    __entries: OrderedDict[str, _Entry]
+    __lock: threading.Lock
+
+    def __init__(self, max_keys: int = 100_000):
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__max_keys = max_keys
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entry(key, capacity, now)
+            if entry.locked_until > now:
+                return entry.locked_until - now
+            refilled = min(capacity, entry.tokens + (now - entry.updated_at) * rate)
+            entry.tokens = max(refilled - 1, -1)
+            entry.updated_at = now
+            return 0.0 if entry.tokens >= 0 else (1 - entry.tokens) / rate
+
+    def fail(self, key: str, window: int, threshold: int, lockout: int) -> None:
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return
+            while entry.failures and entry.failures[0] <= now - window:
+                entry.failures.popleft()
+            entry.failures.append(now)
+            if len(entry.failures) >= threshold:
+                entry.locked_until = now + lockout
+                entry.failures.clear()
+
+    def clear(self, key: str) -> None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                entry.failures.clear()
+
+    def prune(self, idle_seconds: int) -> None:
+        # eviction already bounds the size
+        pass
+
+    def __entry(self, key: str, capacity: int, now: float) -> _Entry:
+        entry = self.__entries.get(key)
+        if entry is None:
+            entry = self.__entries[key] = _Entry(capacity, now)
+            if len(self.__entries) > self.__max_keys:
+                self.__entries.popitem(last=False)
+        else:
+            self.__entries.move_to_end(key)
+        return entry
+
+
+class PostgresThrottleStore:
+    """shared by every worker through the unlogged login_throttle table.
+
+    Each take is one upsert, still well before the account lookup and argon2.
+    """
+
+    __repository: Repository
+
+    def __init__(self, repository: Repository):
+        self.__repository = repository
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        with self.__repository.session() as session:
+            tokens, locked_for = session.execute(
+                text(
+                    """
+                    INSERT INTO login_throttle AS t (key, tokens, updated_at)
+                    VALUES (:key, :capacity - 1, now())
+                    ON CONFLICT (key) DO UPDATE SET
+                        tokens = CASE WHEN t.locked_until > now() THEN t.tokens
+                            ELSE GREATEST(LEAST(:capacity, t.tokens
+                                + EXTRACT(EPOCH FROM now() - t.updated_at) * :rate) - 1, -1)
+                            END,
+                        updated_at = CASE WHEN t.locked_until > now() THEN t.updated_at
+                            ELSE now() END
+                    RETURNING tokens,
+                        GREATEST(EXTRACT(EPOCH FROM t.locked_until - now()), 0)
+                    """
+                ),
+                {"key": key, "capacity": capacity, "rate": rate},
+            ).one()
+        if locked_for:
+            return float(locked_for)
+        return 0.0 if tokens >= 0 else (1 - tokens) / rate
+
+    def fail(self, key: str, window: int, threshold: int, lockout: int) -> None:
+        with self.__repository.session() as session:
+            session.execute(
+                text(
+                    """
+                    UPDATE login_throttle SET
+                        failures = CASE WHEN cardinality(recent.failures) >= :threshold
+                            THEN '{}' ELSE recent.failures END,
+                        locked_until = CASE WHEN cardinality(recent.failures) >= :threshold
+                            THEN now() + make_interval(secs => :lockout)
+                            ELSE login_throttle.locked_until END
+                    FROM (
+                        SELECT key, array_append(ARRAY(
+                            SELECT f FROM unnest(failures) f
+                            WHERE f > now() - make_interval(secs => :window)
+                        ), now()) AS failures
+                        FROM login_throttle WHERE key = :key FOR UPDATE
+                    ) recent
+                    WHERE login_throttle.key = recent.key
+                    """
+                ),
+                {"key": key, "window": window, "threshold": threshold, "lockout": lockout},
+            )
+
+    def clear(self, key: str) -> None:
+        with self.__repository.session() as session:
+            session.execute(
+                text(
+                    "UPDATE login_throttle SET failures = '{}' "
+                    "WHERE key = :key AND cardinality(failures) > 0"
+                ),
+                {"key": key},
+            )
+
+    def prune(self, idle_seconds: int) -> None:
+        with self.__repository.session() as session:
+            session.execute(
+                text(
+                    "DELETE FROM login_throttle "
+                    "WHERE updated_at < now() - make_interval(secs => :idle) "
+                    "AND (locked_until IS NULL OR locked_until < now())"
+                ),
+                {"idle": idle_seconds},
+            )
+
+
+class LoginThrottle:
+    """token buckets per username and per client ip, plus a lockout after
+    repeated failures for one username, checked before the account lookup"""
+
+    __store: ThrottleStore
+    __lock: threading.Lock
+
+    def __init__(self, config: Config, store: ThrottleStore):
+        self.__store = store
+        self.__user_burst = config.login_user_burst
+        self.__user_rate = config.login_user_per_minute / 60
+        self.__ip_burst = config.login_ip_burst
+        self.__ip_rate = config.login_ip_per_minute / 60
+        self.__lockout_failures = config.login_lockout_failures
+        self.__lockout_window = config.login_lockout_window_seconds
+        self.__lockout_seconds = config.login_lockout_seconds
+        self.__lock = threading.Lock()
+        self.__throttled = 0
+
+    def check(self, username: str, client_ip: Optional[str]) -> None:
+        if client_ip:
+            wait = self.__store.take(f"ip:{client_ip}", self.__ip_burst, self.__ip_rate)
+            if wait:
+                self.__reject(wait)
+        wait = self.__store.take(
+            self.__user_key(username), self.__user_burst, self.__user_rate
+        )
+        if wait:
+            self.__reject(wait)
+
+    def failed(self, username: str) -> None:
+        self.__store.fail(
+            self.__user_key(username),
+            self.__lockout_window,
+            self.__lockout_failures,
+            self.__lockout_seconds,
+        )
+
+    def succeeded(self, username: str) -> None:
+        self.__store.clear(self.__user_key(username))
+
+    def prune(self) -> None:
+        self.__store.prune(self.__lockout_window + self.__lockout_seconds)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"throttled": self.__throttled}
+
+    def __user_key(self, username: str) -> str:
+        return f"user:{username.lower()}"
+
+    def __reject(self, wait: float):
+        with self.__lock:
+            self.__throttled += 1
+        raise LoginThrottled(retry_after=max(1, math.ceil(wait)))
+
+
+def build_throttle_store(config: Config, repository: Repository) -> ThrottleStore:
+    if config.login_throttle_backend == "postgres":
+        return PostgresThrottleStore(repository)
+    return MemoryThrottleStore(config.login_throttle_max_keys)
+
+
+class LoginThrottled(Exception):
+    def __init__(self, message="Too many login attempts", retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
@@ -0,0 +1,167 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+
+from src.common.config import Config
+from src.infrastructure.observability.logger import record_timing
+
+
+_worker_hasher: PasswordHasher
+
+
+def _init_worker(parameters: dict) -> None:
+    global _worker_hasher
+    _worker_hasher = PasswordHasher(**parameters)
+
+
+def _verify(hashed_password: str, password: str) -> bool:
+    try:
+        return _worker_hasher.verify(hashed_password, password)
+    except VerifyMismatchError:
+        return False
+
+
+def _hash(password: str) -> str:
+    return _worker_hasher.hash(password)
+
+
+class PasswordPool:
+    """argon2 in a size limited process pool, so a login burst cannot starve the request threads.
+
+    Mirrors the PasswordHasher verify/hash/check_needs_rehash interface, with
+    `verify_async` for the event loop. At most `password_queue_size` calls
+    wait or run at once, past that PasswordQueueFull is raised instead of
+    queueing unboundedly.
+    """
+
+    __hasher: PasswordHasher
+    __executor: ProcessPoolExecutor
+    __slots: threading.BoundedSemaphore
+    __lock: threading.Lock
+
+    def __init__(self, config: Config, hasher: PasswordHasher):
+        self.__hasher = hasher
+        self.__workers = config.password_workers
+        self.__queue_size = config.password_queue_size
+        self.__retry_after = config.password_retry_after_seconds
+        self.__executor = ProcessPoolExecutor(
+            max_workers=self.__workers,
+            # forking a process that already runs threads is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                {
+                    "time_cost": hasher.time_cost,
+                    "memory_cost": hasher.memory_cost,
+                    "parallelism": hasher.parallelism,
+                    "hash_len": hasher.hash_len,
+                    "salt_len": hasher.salt_len,
+                    "type": hasher.type,
+                },
+            ),
+        )
+        self.__slots = threading.BoundedSemaphore(self.__queue_size)
+        self.__lock = threading.Lock()
+        self.__in_flight = 0
+        self.__completed = 0
+        self.__rejected = 0
+        self.__latencies: deque[float] = deque(maxlen=1000)
+
+    def verify(self, hashed_password: str, password: str) -> bool:
+        future, start = self.__submit(_verify, hashed_password, password)
+        try:
+            verified = future.result()
+        finally:
+            record_timing("password", (time.perf_counter() - start) * 1000)
+        if not verified:
+            raise VerifyMismatchError()
+        return True
+
+    async def verify_async(self, hashed_password: str, password: str) -> bool:
+        """awaits the pool, no thread waits on the hash meanwhile"""
+        future, start = self.__submit(_verify, hashed_password, password)
+        try:
+            verified = await asyncio.wrap_future(future)
+        finally:
+            record_timing("password", (time.perf_counter() - start) * 1000)
+        if not verified:
+            raise VerifyMismatchError()
+        return True
+
+    def hash(self, password: str) -> str:
+        future, start = self.__submit(_hash, password)
+        try:
+            return future.result()
+        finally:
+            record_timing("password", (time.perf_counter() - start) * 1000)
+
+    def check_needs_rehash(self, hashed_password: str) -> bool:
+        # only parses the encoded parameters, cheap enough for the request thread
+        return self.__hasher.check_needs_rehash(hashed_password)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            latencies = sorted(self.__latencies)
+            in_flight = self.__in_flight
+            completed = self.__completed
+            rejected = self.__rejected
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            "workers": self.__workers,
+            "queueDepth": in_flight,
+            "queueLimit": self.__queue_size,
+            "completed": completed,
+            "rejected": rejected,
+            "latencyMs": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __submit(self, fn, *args) -> tuple[Future, float]:
+        if not self.__slots.acquire(blocking=False):
+            with self.__lock:
+                self.__rejected += 1
+            raise PasswordQueueFull(retry_after=self.__retry_after)
+
+        with self.__lock:
+            self.__in_flight += 1
+        start = time.perf_counter()
+        try:
+            future = self.__executor.submit(fn, *args)
+        except BaseException:
+            self.__finished(start)
+            raise
+        # the slot is held until the worker is done, even if the caller gave up
+        future.add_done_callback(lambda _: self.__finished(start))
+        return future, start
+
+    def __finished(self, start: float) -> None:
+        elapsed = (time.perf_counter() - start) * 1000
+        self.__slots.release()
+        with self.__lock:
+            self.__in_flight -= 1
+            self.__completed += 1
+            self.__latencies.append(elapsed)
+
+
+class PasswordQueueFull(Exception):
+    def __init__(self, message="Too many concurrent logins", retry_after: int = 1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
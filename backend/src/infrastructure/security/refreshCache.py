@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class RefreshCache:
+    """access tokens recently issued per refresh token.
+
+    Several tabs or a retrying client refreshing together get the same access
+    token instead of each paying a signature. Only ask once the refresh token
+    is known to be valid and not revoked, an entry outlives a logout on
+    another worker. Entries live for `ttl_seconds`, at most `max_entries`
+    are kept.
+    """
+
+    __entries: OrderedDict[str, tuple[str, int, float]]
+    __lock: threading.Lock
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 10_000):
+        self.__ttl = ttl_seconds
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, refresh_token: str) -> Optional[tuple[str, int]]:
+        """the cached access token and what is left of its expiresIn"""
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(refresh_token)
+            if entry is None or now - entry[2] >= self.__ttl:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+            access_token, expires_in, issued_at = entry
+            return access_token, max(0, expires_in - int(now - issued_at))
+
+    def put(self, refresh_token: str, access_token: str, expires_in: int) -> None:
+        if self.__ttl <= 0:
+            return
+        with self.__lock:
+            self.__entries[refresh_token] = (access_token, expires_in, time.monotonic())
+            self.__entries.move_to_end(refresh_token)
+            if len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def discard(self, refresh_token: str) -> None:
+        with self.__lock:
+            self.__entries.pop(refresh_token, None)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "entries": len(self.__entries),
+                "hits": self.__hits,
+                "misses": self.__misses,
+            }
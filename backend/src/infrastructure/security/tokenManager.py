@@ -1,6 +1,9 @@
+import datetime
+import random
 import time
+from typing import Optional
 import jwt
-import os
+from src.common.config import Config
 from src.common.token import TokenPayload
 import uuid
 
@@ -10,22 +13,26 @@ class JwtTokenManager:
     __refresh_token_secret: str
     __access_token_expiry_seconds: int
     __refresh_token_expiry_seconds: int
+    __grace_seconds: int
+    __jitter_ratio: float
+    __expires: bool
+    __verify_signature: bool
 
-    def __init__(self):
-        self.__access_token_secret = os.environ.get("ACCESS_TOKEN_SECRET")
-        self.__refresh_token_secret = os.environ.get("REFRESH_TOKEN_SECRET")
-        self.__access_token_expiry_seconds = os.environ.get(
-            "ACCESS_TOKEN_EXPIRY_SECONDS", 60
-        )  # 1 minute
-        self.__refresh_token_expiry_seconds = os.environ.get(
-            "REFRESH_TOKEN_EXPIRY_SECONDS", 60 * 60 * 24 * 30
-        )  # 30 days
+    def __init__(self, config: Config):
+        self.__access_token_secret = config.access_token_secret
+        self.__refresh_token_secret = config.refresh_token_secret
+        self.__access_token_expiry_seconds = config.access_token_expiry_seconds
+        self.__refresh_token_expiry_seconds = config.refresh_token_expiry_seconds
+        self.__grace_seconds = config.access_token_grace_seconds
+        self.__jitter_ratio = config.refresh_jitter_ratio
+        self.__expires = config.env == "production"
+        self.__verify_signature = not config.bypass_security
 
     def create_access_token(self, data: TokenPayload) -> str:
 
         payload = data.model_dump()
         payload["iat"] = int(time.time())
-        if os.environ.get("ENV") == "production":
+        if self.__expires:
             payload["exp"] = int(time.time()) + self.__access_token_expiry_seconds
         return jwt.encode(payload, self.__access_token_secret, algorithm="HS256")
 
@@ -34,11 +41,54 @@ class JwtTokenManager:
         payload = data.model_dump()
         payload["iat"] = int(time.time())
         payload["jti"] = str(uuid.uuid4())
-        if os.environ.get("ENV") == "production":
+        if self.__expires:
             payload["exp"] = int(time.time()) + self.__refresh_token_expiry_seconds
 
         return jwt.encode(payload, self.__refresh_token_secret, algorithm="HS256")
 
+    def access_token_expires_in(self) -> int:
+        """seconds until the client should refresh a token issued now, jittered
+        early so clients that logged in together spread their refreshes"""
+        jitter = random.uniform(0, self.__jitter_ratio)
+        return int(self.__access_token_expiry_seconds * (1 - jitter))
+
+    def refresh_token_expires_at(self) -> Optional[datetime.datetime]:
+        """when a refresh token issued now stops being valid, None when it never does"""
+        if not self.__expires:
+            return None
+        return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            seconds=self.__refresh_token_expiry_seconds
+        )
+
+    def read_refresh_token(self, token: str) -> Optional[TokenPayload]:
+        """claims of a token we signed, even an expired one, None when it is not ours"""
+        try:
+            payload = jwt.decode(
+                token,
+                self.__refresh_token_secret,
+                algorithms=["HS256"],
+                options={"verify_exp": False},
+            )
+            return TokenPayload.model_validate(payload)
+        except jwt.InvalidTokenError:
+            return None
+
+    def verify_access_token(self, token: str) -> TokenPayload:
+        try:
+            payload = jwt.decode(
+                token,
+                self.__access_token_secret,
+                algorithms=["HS256"],
+                options={"verify_signature": self.__verify_signature},
+                leeway=self.__grace_seconds,
+            )
+            return TokenPayload.model_validate(payload)
+
+        except jwt.ExpiredSignatureError:
+            raise JwtExpired()
+        except jwt.InvalidTokenError:
+            raise InvalidJwtToken()
+
     def verify_refresh_token(self, token: str) -> TokenPayload:
         try:
             payload = jwt.decode(
@@ -15,7 +15,8 @@ import sys
 sys.path.append('/home/hafidmahdi/personal/task-manager/backend')
 
 from main import app
-from src.infrastructure.database.repository import Repository
+from src.common.config import Config
+from src.infrastructure.container import Container, get_container
 from src.infrastructure.security.tokenManager import JwtTokenManager
 from src.common.token import TokenPayload
 from migrations.schema import Base, Account, Tenant, Authentication
@@ -30,8 +31,34 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture(scope="function")
-def test_engine():
+# contrib modules the schema creates, see the Typeahead section of the README
+REQUIRED_EXTENSIONS = ("pg_trgm", "btree_gin")
+
+@pytest.fixture(scope="session")
+def test_database_extensions():
+    """Stop the run at once when the test server lacks a contrib module the schema needs."""
+    engine = create_engine(TEST_DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            available = set(
+                connection.execute(
+                    text("SELECT name FROM pg_available_extensions WHERE name = ANY(:names)"),
+                    {"names": list(REQUIRED_EXTENSIONS)},
+                ).scalars()
+            )
+    finally:
+        engine.dispose()
+    missing = [name for name in REQUIRED_EXTENSIONS if name not in available]
+    if missing:
+        pytest.exit(
+            f"the test database at {TEST_DATABASE_URL} lacks the {', '.join(missing)} "
+            "extension(s); run the tests against the postgres image of docker-compose.yaml "
+            "or install the server's contrib package",
+            returncode=pytest.ExitCode.USAGE_ERROR,
+        )
+
+@pytest.fixture(scope="function")
+def test_engine(test_database_extensions):
     """Create a test database engine."""
     engine = create_engine(TEST_DATABASE_URL)
     Base.metadata.create_all(bind=engine)
@@ -49,12 +76,19 @@ def test_db_session(test_engine):
         session.close()
 
 @pytest.fixture(scope="function")
-def override_get_db_session(test_db_session):
-    """Override the database dependency for testing."""
-    def _override_get_db_session():
-        return test_db_session
-    
-    app.dependency_overrides[Repository] = _override_get_db_session
+def test_container(test_engine) -> Generator[Container, None, None]:
+    """Create the app container against the test database."""
+    container = Container(Config.from_env())
+    yield container
+    container.close()
+
+@pytest.fixture(scope="function")
+def override_get_db_session(test_db_session, test_container):
+    """Override the app container for testing."""
+    async def _override_get_container():
+        return test_container
+
+    app.dependency_overrides[get_container] = _override_get_container
     yield test_db_session
     app.dependency_overrides.clear()
 
@@ -122,7 +156,7 @@ def test_admin_user(test_db_session, test_tenant) -> Account:
 @pytest.fixture(scope="function")
 def token_manager() -> JwtTokenManager:
     """Create a JWT token manager for testing."""
-    return JwtTokenManager()
+    return JwtTokenManager(Config.from_env())
 
 @pytest.fixture(scope="function")
 def test_token_payload(test_user) -> TokenPayload:
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+login_flood.py
+
+Measures board read latency before and during a flood of bad logins, to check
+that login throttling keeps argon2 from starving the rest of the API.
+
+Usage:
+  python testing/load/login_flood.py --base-url http://localhost:8000
+  python testing/load/login_flood.py --flood-rate 100 --duration 20
+
+The reader logs in as --username and repeatedly fetches its first workspace
+board; the flood threads post wrong passwords for --target from this host,
+so they all land in one username bucket and one client ip bucket. The flood
+is paced to --flood-rate attempts per second like an attacker would send them,
+rather than as fast as the responses come back.
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def read_board(client: httpx.Client, workspace: str, stop: threading.Event) -> List[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = client.get(f"/api/v1/workspaces/by-name/{workspace}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def flood(base_url: str, target: str, interval: float, stop: threading.Event, statuses: Counter, lock: threading.Lock):
+    next_at = time.perf_counter()
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while not stop.is_set():
+            response = client.post(
+                "/api/v1/identity/login",
+                json={"username": target, "password": "not-the-password"},
+            )
+            with lock:
+                statuses[response.status_code] += 1
+            next_at += interval
+            stop.wait(max(0.0, next_at - time.perf_counter()))
+
+
+def run_phase(base_url: str, token: str, workspace: str, duration: float, flood_threads: int, flood_rate: float, target: str) -> Dict:
+    stop = threading.Event()
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    flooders = [
+        threading.Thread(
+            target=flood,
+            args=(base_url, target, flood_threads / flood_rate, stop, statuses, lock),
+        )
+        for _ in range(flood_threads)
+    ]
+    for thread in flooders:
+        thread.start()
+
+    with httpx.Client(
+        base_url=base_url, timeout=30, headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        timer = threading.Timer(duration, stop.set)
+        timer.start()
+        latencies = read_board(client, workspace, stop)
+
+    for thread in flooders:
+        thread.join()
+
+    return {
+        "reads": len(latencies),
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies) if latencies else 0.0,
+        "logins": dict(sorted(statuses.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board latency during a login flood")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="testuser")
+    parser.add_argument("--password", default="testpassword")
+    parser.add_argument("--target", default="loadtest1", help="username the flood guesses")
+    parser.add_argument("--flood-threads", type=int, default=16)
+    parser.add_argument("--flood-rate", type=float, default=50, help="login attempts per second")
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        login = client.post(
+            "/api/v1/identity/login",
+            json={"username": args.username, "password": args.password},
+        )
+        login.raise_for_status()
+        token = login.json()["accessToken"]
+        workspaces = client.get(
+            "/api/v1/workspaces/", headers={"Authorization": f"Bearer {token}"}
+        ).json()["workspaces"]
+        if not workspaces:
+            raise SystemExit(f"{args.username} has no workspace to read")
+        workspace = workspaces[0]["name"]
+
+    for name, threads in (("baseline", 0), ("flood", args.flood_threads)):
+        result = run_phase(
+            args.base_url, token, workspace, args.duration, threads, args.flood_rate, args.target
+        )
+        print(
+            f"{name:>8}: reads={result['reads']} p50={result['p50']:.1f}ms "
+            f"p95={result['p95']:.1f}ms p99={result['p99']:.1f}ms "
+            f"mean={result['mean']:.1f}ms logins={result['logins']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+outbox_benchmark.py
+
+Updates one task many times, concurrently, and watches the outbox dispatcher
+of the server catch up through /metrics: how fast the change events are
+written, how fast they are delivered, and how far behind the dispatcher got.
+
+Usage:
+  python testing/load/outbox_benchmark.py --base-url http://localhost:8000 --updates 5000
+  python testing/load/outbox_benchmark.py --updates 20000 --concurrency 64
+
+Run it against a single worker: /metrics answers for the worker it hits, and
+with several workers each one only counts the rows its own dispatcher claimed.
+The server's METRICS_TOKEN is read from the environment or --metrics-token.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+
+async def outbox_stats(client: httpx.AsyncClient, token: str) -> dict:
+    metrics = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    metrics.raise_for_status()
+    return metrics.json()["outbox"]
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        login = await client.post(
+            "/api/v1/identity/login",
+            json={"username": args.username, "password": args.password},
+        )
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['accessToken']}"
+        workspaces = (await client.get("/api/v1/workspaces/")).json()["workspaces"]
+        if not workspaces:
+            raise SystemExit(f"{args.username} has no workspace to update")
+        workspace = workspaces[0]
+        board = (await client.get(f"/api/v1/workspaces/by-name/{workspace['name']}")).json()
+        group_id = board["groups"][0]["groupId"]
+        tasks_url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+        task_id = (await client.post(tasks_url, json={"title": "outbox benchmark"})).json()["taskId"]
+
+        before = await outbox_stats(client, args.metrics_token)
+        if not before["running"]:
+            raise SystemExit("the server's outbox dispatcher is not running")
+        expected = before["dispatched"] + args.updates
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def update(i: int):
+            async with limit:
+                response = await client.patch(
+                    f"{tasks_url}/{task_id}", json={"title": f"outbox benchmark {i}"}
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(update(i) for i in range(args.updates)))
+        written = time.perf_counter() - started
+
+        max_lag = 0.0
+        while True:
+            stats = await outbox_stats(client, args.metrics_token)
+            max_lag = max(max_lag, stats["lagMs"])
+            if stats["dispatched"] >= expected:
+                break
+            if time.perf_counter() - started > args.timeout:
+                raise SystemExit(f"dispatcher still behind after {args.timeout}s: {stats}")
+            await asyncio.sleep(0.05)
+        drained = time.perf_counter() - started
+        await client.delete(f"{tasks_url}/{task_id}")
+
+        delivered = stats["dispatched"] - before["dispatched"]
+        batches = stats["batches"] - before["batches"]
+        print(f"written: {args.updates} changes in {written:.2f}s ({args.updates / written:.0f}/s)")
+        print(
+            f"delivered: {delivered} events in {drained:.2f}s ({delivered / drained:.0f}/s) "
+            f"in {batches} batches, drained {(drained - written) * 1000:.0f}ms after the last write"
+        )
+        print(f"lag: max {max_lag:.0f}ms seen, {stats['maxLagMs']:.0f}ms since start, last batch {stats['lastBatchMs']:.1f}ms")
+        print(f"outbox: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbox dispatcher benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="testuser")
+    parser.add_argument("--password", default="testpassword")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--metrics-token", default=os.environ.get("METRICS_TOKEN", ""))
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
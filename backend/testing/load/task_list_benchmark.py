@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+task_list_benchmark.py
+
+Times the cross-workspace task list (GET /api/v1/tasks) against the tenant
+seeded by task_search_benchmark.py, straight through the usecase.
+
+Usage:
+  DATABASE_URL=... python -m testing.load.task_search_benchmark --seed 3000000 --queries 0
+  DATABASE_URL=... python -m testing.load.task_list_benchmark --pages 50
+
+Each kind of list is read from its first page, then followed --pages pages
+deep through its cursor, to show a page costs the same wherever it is.
+"""
+from __future__ import annotations
+import argparse
+import datetime
+import time
+from typing import List
+
+import dotenv
+from sqlalchemy import text
+
+from src.common.config import Config
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.task_filter import TaskFilter
+from src.infrastructure.container import Container
+from testing.load.task_search_benchmark import percentile
+
+
+def run(container: Container, pages: int) -> None:
+    with container.repository.session() as session:
+        tenant_id, workspace_id, account_id, tasks = session.execute(
+            text(
+                "SELECT t.tenant_id, min(w.workspace_id), min(a.account_id), "
+                "(SELECT count(*) FROM task WHERE tenant_id = t.tenant_id) "
+                "FROM tenant t JOIN workspace w USING (tenant_id) JOIN account a USING (tenant_id) "
+                "WHERE t.name = 'search benchmark' GROUP BY t.tenant_id"
+            )
+        ).one()
+    auth = TokenPayload(id=account_id, tenant_id=tenant_id, username="searchbench1")
+    usecase = container.task_query_usecase
+    now = datetime.datetime.now(datetime.timezone.utc)
+    kinds = {
+        "all tasks": {},
+        "my tasks": {"assignee": "me"},
+        "my overdue": {"assignee": "me", "dueBefore": now},
+        "due this week": {"dueAfter": now, "dueBefore": now + datetime.timedelta(days=7)},
+        "in a workspace": {"workspaceId": workspace_id},
+        "my undated": {"assignee": "me", "cursor": None},
+    }
+    print(f"listing {tasks} tasks of tenant {tenant_id}")
+    for kind, fields in kinds.items():
+        if kind == "my undated":
+            # jump past the dated tasks, to where the undated ones start
+            fields["cursor"] = container.cursor.encode("due", [None, 0])
+        latencies: List[float] = []
+        cursor = fields.pop("cursor", None)
+        for _ in range(pages):
+            started = time.perf_counter()
+            response = usecase.list_tasks(auth, TaskFilter(**fields, cursor=cursor))
+            latencies.append((time.perf_counter() - started) * 1000)
+            cursor = response.nextCursor
+            if cursor is None:
+                break
+        print(
+            f"{kind:>14}: first page {latencies[0]:.1f}ms, "
+            f"{len(latencies)} pages p50={percentile(latencies, 0.50):.1f}ms "
+            f"p99={percentile(latencies, 0.99):.1f}ms max={max(latencies):.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task list benchmark")
+    parser.add_argument("--pages", type=int, default=50, help="pages followed per kind")
+    args = parser.parse_args()
+    dotenv.load_dotenv()
+    container = Container(Config.from_env())
+    try:
+        run(container, args.pages)
+    finally:
+        container.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+task_search_benchmark.py
+
+Seeds a tenant with millions of tasks and times task search against it,
+straight through the usecase so the numbers are the query, not HTTP.
+
+Usage:
+  DATABASE_URL=... python -m testing.load.task_search_benchmark --seed 3000000
+  DATABASE_URL=... python -m testing.load.task_search_benchmark --queries 200
+
+--seed adds a "search benchmark" tenant (accounts searchbench1..50, 20
+workspaces of 4 groups) whose task titles and descriptions are drawn from a
+small vocabulary with a skewed distribution, so some words match a quarter of
+the tasks, plus a reference like "ref1234" from a long tail where most match a
+handful. The query run then searches that tenant
+with one and two word queries, prefixes of words being typed, and filters,
+and prints latency percentiles per kind.
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import List
+
+import dotenv
+from sqlalchemy import text
+
+from src.common.config import Config
+from src.common.token import TokenPayload
+from src.domain.workspaces.entity.task_search import TaskSearchQuery
+from src.infrastructure.container import Container
+
+WORDS = """
+api auth backend bug build cache calendar cart checkout cleanup client config
+copy crash css customer dashboard data database deploy design docs email error
+export feature filter fix flaky form frontend header icon image import index
+invoice layout legacy load login logo migration mobile modal monitor navbar
+notification onboarding order page payment performance permission pipeline
+pricing profile query refactor release report request review route schema
+search security server session settings signup slow staging style subscription
+support sync table test theme timeout token tracking translation upload user
+validation webhook widget workflow account admin alert analytics archive audit
+backup banner billing board branch browser button campaign chart chat comment
+contract cookie coverage cron csv deadline dependency discount domain draft
+editor encryption endpoint event experiment feedback font gateway grid health
+history hotfix inbox integration inventory kanban label latency license link
+locale log map markdown memory menu metric milestone network newsletter note
+oauth offline package partner password patch plan plugin policy popup portal
+preview printer privacy queue quota rate readme recovery redirect refund region
+reminder render replica retry roadmap role rollback sandbox scanner screenshot
+script sdk seo shipping sidebar sitemap slack snapshot socket sprint ssl storage
+survey tag tax template tenant thumbnail ticket timezone toast tooltip trial
+tutorial upgrade usage vendor video warehouse wizard zip
+""".split()
+
+SEED_SQL = """
+WITH words AS (SELECT CAST(:words AS text[]) AS w)
+INSERT INTO task (tenant_id, group_id, position, title, description, due_date,
+                  assigned_to_user_id, created_by)
+SELECT
+    :tenant_id,
+    (CAST(:group_ids AS int[]))[1 + i % :groups],
+    lpad(to_hex(i), 10, '0'),
+    (SELECT string_agg(w[1 + floor(power(random(), 2.5) * array_length(w, 1))::int], ' ')
+       FROM words, generate_series(1, 2 + i % 4 + 0 * i)),
+    (SELECT string_agg(w[1 + floor(power(random(), 1.5) * array_length(w, 1))::int], ' ')
+       FROM words, generate_series(1, 6 + i % 9 + 0 * i))
+      || ' ref' || floor(power(random(), 3) * 200000)::int,
+    CASE WHEN i % 10 < 7 THEN now() + (random() * 730 - 365) * interval '1 day' END,
+    CASE WHEN i % 10 < 6 THEN (CAST(:account_ids AS int[]))[1 + i % :accounts] END,
+    (CAST(:account_ids AS int[]))[1]
+FROM generate_series(:start, :stop) AS i
+"""
+
+
+def seed(container: Container, tasks: int, chunk: int = 100_000) -> None:
+    with container.repository.session() as session:
+        tenant_id = session.execute(
+            text("INSERT INTO tenant (name) VALUES ('search benchmark') RETURNING tenant_id")
+        ).scalar_one()
+        account_ids = session.execute(
+            text(
+                "INSERT INTO account (tenant_id, username, full_name, email, hashed_password) "
+                "SELECT :tenant_id, 'searchbench' || i, 'Search Bench ' || i, "
+                "'searchbench' || i || '@example.com', 'x' FROM generate_series(1, 50) i "
+                "RETURNING account_id"
+            ),
+            {"tenant_id": tenant_id},
+        ).scalars().all()
+        group_ids = []
+        for n in range(20):
+            workspace_id = session.execute(
+                text(
+                    "INSERT INTO workspace (tenant_id, name, created_by) "
+                    "VALUES (:tenant_id, :name, :by) RETURNING workspace_id"
+                ),
+                {"tenant_id": tenant_id, "name": f"Search bench {n}", "by": account_ids[0]},
+            ).scalar_one()
+            group_ids += session.execute(
+                text(
+                    'INSERT INTO "group" (tenant_id, workspace_id, name, created_by) '
+                    "SELECT :tenant_id, :workspace_id, name, :by "
+                    "FROM unnest(ARRAY['To Do', 'In Progress', 'In Review', 'Done']) name "
+                    "RETURNING group_id"
+                ),
+                {"tenant_id": tenant_id, "workspace_id": workspace_id, "by": account_ids[0]},
+            ).scalars().all()
+
+    started = time.perf_counter()
+    for start in range(0, tasks, chunk):
+        with container.repository.session() as session:
+            session.execute(
+                text(SEED_SQL),
+                {
+                    "words": WORDS,
+                    "tenant_id": tenant_id,
+                    "group_ids": group_ids,
+                    "groups": len(group_ids),
+                    "account_ids": account_ids,
+                    "accounts": len(account_ids),
+                    "start": start,
+                    "stop": min(start + chunk, tasks) - 1,
+                },
+            )
+        done = min(start + chunk, tasks)
+        print(f"seeded {done} tasks ({done / (time.perf_counter() - started):.0f}/s)")
+    with container.repository.session() as session:
+        session.execute(text("ANALYZE task"))
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def queries(container: Container, count: int) -> None:
+    with container.repository.session() as session:
+        tenant_id, workspace_id, account_id, tasks = session.execute(
+            text(
+                "SELECT t.tenant_id, min(w.workspace_id), min(a.account_id), "
+                "(SELECT count(*) FROM task WHERE tenant_id = t.tenant_id) "
+                "FROM tenant t JOIN workspace w USING (tenant_id) JOIN account a USING (tenant_id) "
+                "WHERE t.name = 'search benchmark' GROUP BY t.tenant_id"
+            )
+        ).one()
+    auth = TokenPayload(id=account_id, tenant_id=tenant_id, username="searchbench1")
+    usecase = container.task_query_usecase
+    rng = random.Random(7)
+    kinds = {
+        "common word": lambda: TaskSearchQuery(q=rng.choice(WORDS[:10])),
+        "rare word": lambda: TaskSearchQuery(q=f"ref{rng.randrange(50_000, 200_000)}"),
+        "two words": lambda: TaskSearchQuery(q=f"{rng.choice(WORDS[:10])} {rng.choice(WORDS)}"),
+        "word prefix": lambda: TaskSearchQuery(q=rng.choice(WORDS)[:3]),
+        "typing a ref": lambda: TaskSearchQuery(q=f"ref{rng.randrange(1_000, 20_000)}"),
+        "no match": lambda: TaskSearchQuery(q=f"{rng.choice(WORDS)[:4]}zz"),
+        "in a workspace": lambda: TaskSearchQuery(q=rng.choice(WORDS), workspaceId=workspace_id),
+        "assigned to me": lambda: TaskSearchQuery(q=rng.choice(WORDS), assignee="me"),
+    }
+    print(f"searching {tasks} tasks of tenant {tenant_id}")
+    for kind, make in kinds.items():
+        latencies: List[float] = []
+        pages = 0
+        for _ in range(count):
+            query = make()
+            started = time.perf_counter()
+            response = usecase.search(auth, query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.nextCursor:
+                pages += 1
+        print(
+            f"{kind:>16}: p50={percentile(latencies, 0.50):.1f}ms "
+            f"p99={percentile(latencies, 0.99):.1f}ms max={max(latencies):.1f}ms "
+            f"({pages}/{count} with a next page)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task search benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="tasks to seed first")
+    parser.add_argument("--queries", type=int, default=100, help="queries per kind")
+    args = parser.parse_args()
+    dotenv.load_dotenv()
+    container = Container(Config.from_env())
+    try:
+        if args.seed:
+            seed(container, args.seed)
+        if args.queries:
+            queries(container, args.queries)
+    finally:
+        container.close()
+
+
+if __name__ == "__main__":
+    main()
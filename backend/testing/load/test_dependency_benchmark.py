@@ -0,0 +1,85 @@
+"""Benchmark of per-request dependency resolution.
+
+Compares resolving the usecases from the app container with building them on
+every request the way the routes used to (engine, argon2 hasher, token manager
+and env reads per request). Run with ``pytest load/test_dependency_benchmark.py``.
+"""
+
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("pytest_benchmark")
+
+from src.common.config import Config
+from src.common.token import TokenPayload
+from src.infrastructure.container import (
+    Container,
+    get_container,
+    get_identity_usecase,
+    get_workspace_usecase,
+)
+from src.infrastructure.http.guarded import get_current_user
+
+
+def _per_request_container() -> Container:
+    return Container(Config.from_env())
+
+
+def _build_app(container: Container) -> FastAPI:
+    app = FastAPI()
+
+    async def _get_container():
+        return container
+
+    app.dependency_overrides[get_container] = _get_container
+
+    @app.get("/container")
+    def app_scoped(
+        auth: Annotated[TokenPayload, Depends(get_current_user)],
+        identity=Depends(get_identity_usecase),
+        workspace=Depends(get_workspace_usecase),
+    ):
+        return {"ok": True}
+
+    @app.get("/per-request")
+    def per_request(
+        auth: Annotated[TokenPayload, Depends(get_current_user)],
+        container: Annotated[Container, Depends(_per_request_container)],
+    ):
+        container.close()
+        return {"ok": True}
+
+    return app
+
+
+@pytest.fixture(scope="function")
+def bench_client(token_manager, test_token_payload):
+    container = Container(Config.from_env())
+    client = TestClient(_build_app(container))
+    client.headers.update(
+        {"Authorization": f"Bearer {token_manager.create_access_token(test_token_payload)}"}
+    )
+    yield client
+    container.close()
+
+
+@pytest.fixture(scope="function")
+def test_token_payload() -> TokenPayload:
+    return TokenPayload(tenant_id=1, id=1, username="testuser")
+
+
+@pytest.mark.load
+@pytest.mark.slow
+class TestDependencyResolution:
+    """Per-request overhead of resolving the route dependencies."""
+
+    def test_app_scoped_container(self, benchmark, bench_client):
+        response = benchmark(bench_client.get, "/container")
+        assert response.status_code == 200
+
+    def test_per_request_construction(self, benchmark, bench_client):
+        response = benchmark(bench_client.get, "/per-request")
+        assert response.status_code == 200
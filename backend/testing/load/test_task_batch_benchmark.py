@@ -0,0 +1,51 @@
+"""Benchmark of importing tasks one request at a time against the batch endpoint.
+
+Both create ``TASKS`` tasks in the same group; compare the per-round times to
+get the throughput ratio. Run with ``pytest load/test_task_batch_benchmark.py``.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("pytest_benchmark")
+
+from utils import AuthHelper, WorkspaceHelper
+
+TASKS = 100
+
+
+@pytest.fixture(scope="function")
+def board(test_client: TestClient, test_user):
+    session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+    workspace = WorkspaceHelper.create_workspace(test_client, session)
+    headers = AuthHelper.create_authenticated_headers(session.access_token)
+    resp = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+    group_id = resp.json()["groups"][0]["groupId"]
+    return f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks", headers
+
+
+@pytest.mark.load
+@pytest.mark.slow
+class TestTaskImport:
+    """Creating TASKS tasks in one group."""
+
+    def test_single_task_requests(self, benchmark, test_client: TestClient, board):
+        url, headers = board
+
+        def import_tasks():
+            for i in range(TASKS):
+                response = test_client.post(url, json={"title": f"Task {i}"}, headers=headers)
+                assert response.status_code == 200
+
+        benchmark.pedantic(import_tasks, rounds=5, iterations=1)
+
+    def test_batch_request(self, benchmark, test_client: TestClient, board):
+        url, headers = board
+        tasks = [{"title": f"Task {i}"} for i in range(TASKS)]
+
+        def import_tasks():
+            response = test_client.post(f"{url}/batch", json={"tasks": tasks}, headers=headers)
+            assert response.status_code == 200
+            assert len(response.json()["tasks"]) == TASKS
+
+        benchmark.pedantic(import_tasks, rounds=5, iterations=1)
@@ -0,0 +1,50 @@
+"""Benchmark of the streaming task import, in rows per second.
+
+Streams ``ROWS`` CSV rows spread over the default groups to
+``POST /workspaces/{id}/tasks:import`` each round. Run with
+``pytest load/test_task_import_benchmark.py``; the rate is in the extra info
+of the report. For bigger files use the cli, see the README.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("pytest_benchmark")
+
+from utils import AuthHelper, WorkspaceHelper
+
+ROWS = 20_000
+GROUPS = ["To Do", "In Progress", "In Review", "Done"]
+
+
+@pytest.fixture(scope="function")
+def workspace(test_client: TestClient, test_user):
+    session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+    workspace = WorkspaceHelper.create_workspace(test_client, session)
+    headers = AuthHelper.create_authenticated_headers(session.access_token)
+    return f"/api/v1/workspaces/{workspace['workspaceId']}/tasks:import", headers
+
+
+def _csv():
+    yield b"group,title,description,dueDate,assignee\n"
+    for i in range(ROWS):
+        yield (
+            f"{GROUPS[i % len(GROUPS)]},Imported task {i},Migrated,2030-01-01T09:00:00Z,testuser\n"
+        ).encode()
+
+
+@pytest.mark.load
+@pytest.mark.slow
+class TestTaskImportThroughput:
+    def test_csv_import(self, benchmark, test_client: TestClient, workspace):
+        url, headers = workspace
+
+        def import_tasks():
+            response = test_client.post(
+                url, content=_csv(), headers={**headers, "Content-Type": "text/csv"}
+            )
+            assert response.status_code == 200
+            assert response.json()["imported"] == ROWS
+
+        benchmark.pedantic(import_tasks, rounds=3, iterations=1)
+        benchmark.extra_info["rowsPerSecond"] = round(ROWS / benchmark.stats["median"])
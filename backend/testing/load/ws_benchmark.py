@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+ws_benchmark.py
+
+Holds many idle websocket connections on /api/v1/live, all subscribed to one
+workspace, then measures how long a task update takes to reach every one of
+them, and how the server copes with consumers that stop reading.
+
+Usage:
+  python testing/load/ws_benchmark.py --base-url http://localhost:8000 --connections 2000
+  python testing/load/ws_benchmark.py --server-pid $(pgrep -f "uvicorn main:app") --slow 10
+
+The clients log in once as --username and subscribe to its first workspace.
+With --server-pid the server's resident memory is read before and after the
+connections open, to report the cost of one idle connection. --slow clients
+subscribe but never read, so their socket buffers fill up and the server has
+to drop them instead of buffering without bound.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List, Optional
+
+import httpx
+import websockets
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def rss_kib(pid: Optional[int]) -> Optional[int]:
+    if pid is None:
+        return None
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return None
+
+
+async def open_connection(url: str, token: str, workspace_id: int, max_queue: Optional[int] = None):
+    ws = await websockets.connect(url, max_queue=max_queue, open_timeout=60)
+    await ws.send(json.dumps({"type": "auth", "token": token}))
+    await ws.recv()  # ready
+    await ws.send(json.dumps({"type": "subscribe", "workspaceId": workspace_id}))
+    reply = json.loads(await ws.recv())
+    if reply["type"] != "subscribed":
+        raise SystemExit(f"subscribe failed: {reply}")
+    return ws
+
+
+async def wait_for_task(ws, task_id: int, sent_at: List[float], latencies: List[float]):
+    while True:
+        frame = json.loads(await ws.recv())
+        if frame["type"] != "events":
+            continue
+        if any(event.get("taskId") == task_id for event in frame["events"]):
+            latencies.append((time.perf_counter() - sent_at[0]) * 1000)
+            return
+
+
+async def run(args) -> None:
+    ws_url = args.base_url.replace("http", "ws", 1) + "/api/v1/live"
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        login = await client.post(
+            "/api/v1/identity/login",
+            json={"username": args.username, "password": args.password},
+        )
+        login.raise_for_status()
+        token = login.json()["accessToken"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        workspaces = (await client.get("/api/v1/workspaces/")).json()["workspaces"]
+        if not workspaces:
+            raise SystemExit(f"{args.username} has no workspace to subscribe to")
+        workspace = workspaces[0]
+        board = (await client.get(f"/api/v1/workspaces/by-name/{workspace['name']}")).json()
+        group_id = board["groups"][0]["groupId"]
+        tasks_url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+
+        before = rss_kib(args.server_pid)
+        started = time.perf_counter()
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def connect():
+            async with limit:
+                return await open_connection(ws_url, token, workspace["workspaceId"])
+
+        sockets = await asyncio.gather(*(connect() for _ in range(args.connections)))
+        opened = time.perf_counter() - started
+        await asyncio.sleep(1)
+        after = rss_kib(args.server_pid)
+        print(
+            f"connections: {len(sockets)} opened in {opened:.1f}s "
+            f"({len(sockets) / opened:.0f}/s)"
+        )
+        if before is not None and after is not None:
+            print(
+                f"server rss: {before / 1024:.1f} MiB -> {after / 1024:.1f} MiB, "
+                f"{(after - before) / len(sockets):.1f} KiB per idle connection"
+            )
+
+        slow = [
+            await open_connection(ws_url, token, workspace["workspaceId"], max_queue=1)
+            for _ in range(args.slow)
+        ]
+
+        task_id = (await client.post(tasks_url, json={"title": "ws benchmark"})).json()["taskId"]
+        per_update: List[float] = []
+        all_latencies: List[float] = []
+        for i in range(args.updates):
+            latencies: List[float] = []
+            sent_at = [0.0]
+            waiting = [asyncio.create_task(wait_for_task(ws, task_id, sent_at, latencies)) for ws in sockets]
+            sent_at[0] = time.perf_counter()
+            await client.patch(f"{tasks_url}/{task_id}", json={"title": f"ws benchmark {i}"})
+            await asyncio.wait_for(asyncio.gather(*waiting), 30)
+            per_update.append(max(latencies))
+            all_latencies += latencies
+        await client.delete(f"{tasks_url}/{task_id}")
+
+        print(
+            f"fan-out of {args.updates} updates to {len(sockets)} connections: "
+            f"p50={percentile(all_latencies, 0.50):.1f}ms p99={percentile(all_latencies, 0.99):.1f}ms "
+            f"last delivery p50={percentile(per_update, 0.50):.1f}ms max={max(per_update):.1f}ms"
+        )
+        metrics = (
+            await client.get(
+                "/metrics", headers={"Authorization": f"Bearer {args.metrics_token}"}
+            )
+        ).json().get("liveHub", {})
+        print(f"hub: {metrics}")
+
+        for ws in sockets + slow:
+            await ws.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Websocket fan-out benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="testuser")
+    parser.add_argument("--password", default="testpassword")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="handshakes in flight")
+    parser.add_argument("--updates", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=0, help="clients that never read")
+    parser.add_argument("--server-pid", type=int)
+    parser.add_argument("--metrics-token", default=os.environ.get("METRICS_TOKEN", ""))
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
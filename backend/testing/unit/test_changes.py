@@ -0,0 +1,84 @@
+"""Unit tests for the change feed."""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.domain.changes.usecase.changes import ChangeFeedUsecase
+from utils import WorkspaceHelper, TaskHelper
+
+
+@pytest.mark.unit
+class TestChangeFeed:
+    """Test the tenant change feed appended from the outbox."""
+
+    def test_changes_are_paged_in_order(self, test_client: TestClient, test_user, test_container):
+        """Test the feed returns the dispatched changes by seq, a page at a time."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, headers, workspace_id, group_id = board.session, board.headers, board.workspace_id, board.group_ids[0]
+        task = TaskHelper.create_task(test_client, session, workspace_id, group_id)
+        TaskHelper.update_task(
+            test_client, session, workspace_id, group_id, task["taskId"], {"title": "Renamed"}
+        )
+        test_container.outbox.dispatch()
+
+        first = test_client.get("/api/v1/changes?limit=2", headers=headers).json()
+        rest = test_client.get(
+            f"/api/v1/changes?after={first['next']}&limit=2", headers=headers
+        ).json()
+
+        assert [c["type"] for c in first["changes"]] == ["workspace.created", "task.created"]
+        assert first["hasMore"] is True
+        assert [c["type"] for c in rest["changes"]] == ["task.updated"]
+        assert rest["changes"][0]["payload"]["title"] == "Renamed"
+        assert rest["changes"][0]["seq"] > first["next"]
+        assert rest["hasMore"] is False
+        assert rest["retentionSeconds"] == test_container.config.change_log_retention_seconds
+
+    def test_caught_up_reader_waits_for_the_next_change(self, test_client: TestClient, test_user, test_container):
+        """Test a long poll returns once a change is appended, not at its timeout."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, headers, workspace_id, group_id = board.session, board.headers, board.workspace_id, board.group_ids[0]
+        test_container.outbox.dispatch()
+        after = test_client.get("/api/v1/changes", headers=headers).json()["next"]
+        result = {}
+
+        def poll():
+            started = time.perf_counter()
+            result["page"] = test_client.get(
+                f"/api/v1/changes?after={after}&wait=10", headers=headers
+            ).json()
+            result["seconds"] = time.perf_counter() - started
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        time.sleep(0.3)
+        TaskHelper.create_task(test_client, session, workspace_id, group_id)
+        test_container.outbox.dispatch()
+        poller.join(10)
+
+        assert [c["type"] for c in result["page"]["changes"]] == ["task.created"]
+        assert result["seconds"] < 5
+        assert test_container.change_signal.stats()["polls"] == 0
+
+    def test_reader_behind_the_pruned_changes(self, test_client: TestClient, test_user, test_container):
+        """Test a cursor older than the pruned changes is gone, 0 starts over."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, headers, workspace_id, group_id = board.session, board.headers, board.workspace_id, board.group_ids[0]
+        TaskHelper.create_task(test_client, session, workspace_id, group_id)
+        test_container.outbox.dispatch()
+        seqs = [
+            c["seq"] for c in test_client.get("/api/v1/changes", headers=headers).json()["changes"]
+        ]
+        ChangeFeedUsecase(
+            test_container.repository, test_container.job_queue, test_container.change_signal, 0
+        ).prune()
+
+        expired = test_client.get(f"/api/v1/changes?after={seqs[0]}", headers=headers)
+        restart = test_client.get("/api/v1/changes?after=0", headers=headers)
+
+        assert expired.status_code == 410
+        assert restart.status_code == 200
+        assert restart.json()["changes"] == []
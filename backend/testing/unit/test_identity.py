@@ -1,9 +1,19 @@
 """Unit tests for identity domain functionality."""
 
+import json
+import threading
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
+from main import app
+from migrations.schema import Account, AuditEvent, Authentication
+from src.common.config import Config
+from src.infrastructure.background.jobQueue import JobQueue
+from src.infrastructure.container import Container, get_container
+from src.infrastructure.security.calibrate import MIN_MEMORY_KIB, MemoryBudgetTooLow, calibrate
+from src.infrastructure.security.loginThrottle import PostgresThrottleStore
 from utils import AuthHelper, TestDataFactory
 
 
@@ -37,6 +47,88 @@ class TestIdentityLogin:
         
         assert response.status_code == 404
     
+    def test_login_password_queue_full(self, test_client: TestClient, test_user):
+        """Test login is shed with 503 when the password pool queue is full."""
+        container = Container(Config.from_env().model_copy(update={"password_queue_size": 0}))
+
+        async def _full_container():
+            return container
+
+        app.dependency_overrides[get_container] = _full_container
+        try:
+            login_data = TestDataFactory.create_user_data("testuser", "testpassword")
+            response = test_client.post("/api/v1/identity/login", json=login_data)
+        finally:
+            container.close()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_login_rehashes_to_calibrated_parameters(self, test_client: TestClient, test_user, test_db_session, tmp_path):
+        """Test login migrates the stored hash to the persisted calibration."""
+        params_file = tmp_path / "argon2.json"
+        params_file.write_text(json.dumps({"time_cost": 1, "memory_cost": 8192, "parallelism": 1}))
+        container = Container(Config.from_env().model_copy(update={"argon2_params_file": str(params_file)}))
+
+        async def _calibrated_container():
+            return container
+
+        app.dependency_overrides[get_container] = _calibrated_container
+        try:
+            AuthHelper.login_user(test_client, "testuser", "testpassword")
+        finally:
+            container.close()
+
+        test_db_session.expire_all()
+        account = test_db_session.query(Account).where(Account.username == "testuser").one()
+        assert "$m=8192,t=1,p=1$" in account.hashed_password
+
+    def test_calibration_refuses_budget_below_floor(self):
+        """Test a memory budget under the OWASP floor is an error, not silently exceeded."""
+        with pytest.raises(MemoryBudgetTooLow):
+            calibrate(target_ms=250, max_memory_kib=MIN_MEMORY_KIB - 1, parallelism=1)
+
+    def test_password_pool_metrics(self, test_client: TestClient, test_user, test_container):
+        """Test the password pool reports its queue and latency, to the metrics token only."""
+        AuthHelper.login_user(test_client, "testuser", "testpassword")
+        config = test_container.config
+        test_container.config = config.model_copy(update={"metrics_token": "scrape"})
+        try:
+            anonymous = test_client.get("/metrics")
+            session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+            user = test_client.get(
+                "/metrics", headers=AuthHelper.create_authenticated_headers(session.access_token)
+            )
+            response = test_client.get("/metrics", headers={"Authorization": "Bearer scrape"})
+        finally:
+            test_container.config = config
+
+        assert anonymous.status_code == 401
+        assert user.status_code == 401
+        # with no METRICS_TOKEN set not even an empty bearer gets in
+        assert test_client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+        assert response.status_code == 200
+        pool = response.json()["passwordPool"]
+        assert pool["completed"] >= 1
+        assert pool["queueDepth"] == 0
+        assert pool["latencyMs"]["max"] > 0
+
+    def test_login_audit_event_written_off_request(self, test_client: TestClient, test_user, test_container, test_db_session):
+        """Test login queues its audit event and the queue drains it on close."""
+        response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+            headers={"X-Request-ID": "login-audit"},
+        )
+        assert response.status_code == 200
+
+        test_container.close()
+
+        event = test_db_session.query(AuditEvent).one()
+        assert event.action == "login"
+        assert event.account_id == test_user.account_id
+        assert event.request_id == "login-audit"
+
     def test_login_missing_fields(self, test_client: TestClient):
         """Test login with missing fields."""
         response = test_client.post("/api/v1/identity/login", json={"username": "testuser"})
@@ -53,6 +145,93 @@ class TestIdentityLogin:
         assert response.status_code in [400, 422, 404]
 
 
+@pytest.mark.unit
+@pytest.mark.auth
+class TestLoginThrottle:
+    """Test login throttling."""
+
+    @pytest.fixture
+    def throttled_client(self, test_client: TestClient, test_user):
+        """Point the app at a container with the given throttle limits."""
+        containers = []
+
+        def _configure(**limits):
+            container = Container(Config.from_env().model_copy(update=limits))
+            containers.append(container)
+
+            async def _throttled_container():
+                return container
+
+            app.dependency_overrides[get_container] = _throttled_container
+            return container
+
+        yield _configure
+        for container in containers:
+            container.close()
+
+    def test_login_throttled_per_username(self, test_client: TestClient, throttled_client):
+        """Test the username bucket rejects with 429 before hashing."""
+        container = throttled_client(login_user_burst=2, login_user_per_minute=1)
+        login_data = TestDataFactory.create_user_data("testuser", "wrongpassword")
+
+        assert test_client.post("/api/v1/identity/login", json=login_data).status_code == 401
+        assert test_client.post("/api/v1/identity/login", json=login_data).status_code == 401
+        response = test_client.post("/api/v1/identity/login", json=login_data)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        metrics = container.metrics()
+        assert metrics["passwordPool"]["completed"] == 2
+        assert metrics["loginThrottle"]["throttled"] == 1
+
+    def test_login_throttled_per_ip(self, test_client: TestClient, throttled_client):
+        """Test the client ip bucket covers attempts against many usernames."""
+        throttled_client(login_ip_burst=3, login_ip_per_minute=1)
+
+        statuses = [
+            test_client.post(
+                "/api/v1/identity/login",
+                json=TestDataFactory.create_user_data(f"nobody{i}", "password"),
+            ).status_code
+            for i in range(4)
+        ]
+
+        assert statuses == [404, 404, 404, 429]
+
+    def test_login_locked_out_after_failures(self, test_client: TestClient, throttled_client):
+        """Test repeated failures lock the username even for the right password."""
+        throttled_client(login_user_burst=100, login_lockout_failures=3)
+        for _ in range(3):
+            failed = test_client.post(
+                "/api/v1/identity/login",
+                json=TestDataFactory.create_user_data("testuser", "wrongpassword"),
+            )
+            assert failed.status_code == 401
+
+        response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+        )
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 60
+
+    def test_postgres_store_shares_limits(self, test_container):
+        """Test the postgres store keeps one bucket and lockout per key."""
+        first = PostgresThrottleStore(test_container.repository)
+        second = PostgresThrottleStore(test_container.repository)
+
+        assert first.take("user:shared", 2, 0.01) == 0
+        assert second.take("user:shared", 2, 0.01) == 0
+        assert first.take("user:shared", 2, 0.01) > 0
+
+        first.take("user:locked", 10, 1)
+        first.fail("user:locked", 60, 2, 300)
+        assert second.take("user:locked", 10, 1) == 0
+        second.fail("user:locked", 60, 2, 300)
+        assert 290 < first.take("user:locked", 10, 1) <= 300
+
+
 @pytest.mark.unit
 @pytest.mark.auth
 class TestIdentityRefresh:
@@ -74,6 +253,77 @@ class TestIdentityRefresh:
         data = response.json()
         assert "accessToken" in data
     
+    def test_refresh_expires_in_is_jittered_early(self, test_client: TestClient, test_user):
+        """Test refresh hints an expiresIn within the jitter window, in body and header."""
+        config = Config.from_env()
+        login_response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+        )
+        response = test_client.put(
+            "/api/v1/identity/refresh",
+            cookies={"refresh_token": login_response.json()["refreshToken"]},
+        )
+
+        assert response.status_code == 200
+        expires_in = response.json()["expiresIn"]
+        lowest = config.access_token_expiry_seconds * (1 - config.refresh_jitter_ratio)
+        assert int(lowest) <= expires_in <= config.access_token_expiry_seconds
+        assert response.headers["X-Expires-In"] == str(expires_in)
+        assert "expiresIn" in login_response.json()
+
+    def test_repeat_refresh_reuses_access_token(self, test_client: TestClient, test_user, test_container):
+        """Test refreshing one refresh token twice in the window reuses the access token."""
+        login_response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+        )
+        cookies = {"refresh_token": login_response.json()["refreshToken"]}
+
+        first = test_client.put("/api/v1/identity/refresh", cookies=cookies)
+        second = test_client.put("/api/v1/identity/refresh", cookies=cookies)
+
+        assert first.json()["accessToken"] == second.json()["accessToken"]
+        assert test_container.refresh_cache.stats()["hits"] == 1
+
+    def test_refresh_after_logout_not_served_from_cache(self, test_client: TestClient, test_user):
+        """Test logout drops the cached access token of its refresh token."""
+        login_response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+        )
+        cookies = {"refresh_token": login_response.json()["refreshToken"]}
+        assert test_client.put("/api/v1/identity/refresh", cookies=cookies).status_code == 200
+
+        test_client.cookies = cookies
+        assert test_client.delete("/api/v1/identity/logout").status_code == 204
+
+        test_client.cookies = cookies
+        response = test_client.put("/api/v1/identity/refresh")
+        assert response.status_code == 401
+
+    def test_refresh_revoked_elsewhere_not_served_from_cache(
+        self, test_client: TestClient, test_user, test_db_session
+    ):
+        """Test a refresh token deleted by another worker's logout stops refreshing."""
+        login_response = test_client.post(
+            "/api/v1/identity/login",
+            json=TestDataFactory.create_user_data("testuser", "testpassword"),
+        )
+        refresh_token = login_response.json()["refreshToken"]
+        cookies = {"refresh_token": refresh_token}
+        assert test_client.put("/api/v1/identity/refresh", cookies=cookies).status_code == 200
+
+        # the logout ran on another worker, this one's cache still holds the token
+        test_db_session.query(Authentication).where(
+            Authentication.token == refresh_token
+        ).delete()
+        test_db_session.commit()
+
+        test_client.cookies = cookies
+        response = test_client.put("/api/v1/identity/refresh")
+        assert response.status_code == 401
+
     def test_refresh_token_invalid(self, test_client: TestClient):
         """Test refresh with invalid token."""
         refresh_data = {"refreshToken": "invalid_token"}
@@ -136,6 +386,55 @@ class TestIdentityUsers:
         assert len(res["users"]) >= 1
         
     
+    def test_get_users_cursor_by_name(self, test_client: TestClient, test_user, test_admin_user):
+        """Test paging users by name with an opaque cursor and a total."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        first = test_client.get(
+            "/api/v1/identity/users?sort=name&limit=1&withTotal=true", headers=headers
+        ).json()
+        second = test_client.get(
+            f"/api/v1/identity/users?sort=name&limit=1&cursor={first['nextCursor']}",
+            headers=headers,
+        ).json()
+
+        assert first["total"] == 2
+        assert [u["fullName"] for u in first["users"]] == ["Admin User"]
+        assert [u["fullName"] for u in second["users"]] == ["Test User"]
+        assert second["nextCursor"] is None
+
+    def test_get_users_typeahead(self, test_client: TestClient, test_user, test_admin_user):
+        """Test q returns only the users whose name or username is like it."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get("/api/v1/identity/users?q=adm", headers=headers)
+        blank = test_client.get("/api/v1/identity/users?q=%20", headers=headers)
+
+        assert response.status_code == 200
+        assert [u["fullName"] for u in response.json()["users"]] == ["Admin User"]
+        assert response.json()["nextCursor"] is None
+        assert len(blank.json()["users"]) == 2
+
+    def test_get_users_tampered_cursor(self, test_client: TestClient, test_user, test_admin_user):
+        """Test a cursor that was not issued by the server is rejected."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        cursor = test_client.get(
+            "/api/v1/identity/users?sort=name&limit=1", headers=headers
+        ).json()["nextCursor"]
+        response = test_client.get(
+            f"/api/v1/identity/users?sort=username&limit=1&cursor={cursor}", headers=headers
+        )
+        assert response.status_code == 400
+
+        response = test_client.get(
+            f"/api/v1/identity/users?sort=name&limit=1&cursor={cursor[:-2]}xx", headers=headers
+        )
+        assert response.status_code == 400
+
     def test_get_users_without_auth(self, test_client: TestClient):
         """Test get users without authentication."""
         response = test_client.get("/api/v1/identity/users")
@@ -159,6 +458,18 @@ class TestIdentityMe:
         data = response.json()
         assert data["username"] == "testuser"
     
+    def test_get_me_request_id(self, test_client: TestClient, test_user):
+        """Test the request id is generated, or propagated when the caller sends one."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get("/api/v1/identity/me", headers=headers)
+        assert response.headers["X-Request-ID"]
+
+        headers["X-Request-ID"] = "client-request-id"
+        response = test_client.get("/api/v1/identity/me", headers=headers)
+        assert response.headers["X-Request-ID"] == "client-request-id"
+
     def test_get_me_without_auth(self, test_client: TestClient):
         """Test get me without authentication."""
         response = test_client.get("/api/v1/identity/me")
@@ -172,3 +483,65 @@ class TestIdentityMe:
         
         assert response.status_code == 401
 
+
+@pytest.mark.unit
+class TestJobQueue:
+    """Test the background job queue."""
+
+    def _queue(self, **overrides):
+        defaults = {"job_workers": 1, "job_retry_backoff_seconds": 0.01}
+        return JobQueue(Config.from_env().model_copy(update={**defaults, **overrides}))
+
+    def test_job_retried_until_success(self):
+        """Test a failing job is retried and then counted as completed."""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("transient")
+
+        jobs = self._queue(job_max_attempts=3)
+        assert jobs.submit("flaky", flaky)
+        jobs.close()
+
+        assert len(attempts) == 3
+        stats = jobs.stats()
+        assert stats["retried"] == 2
+        assert stats["completed"] == 1
+        assert stats["failed"] == 0
+
+    def test_job_failed_after_max_attempts(self):
+        """Test a job that keeps failing is given up on."""
+        def broken():
+            raise RuntimeError("permanent")
+
+        jobs = self._queue(job_max_attempts=2)
+        jobs.submit("broken", broken)
+        jobs.close()
+
+        assert jobs.stats()["failed"] == 1
+
+    def test_full_queue_drops_without_blocking(self):
+        """Test submit drops jobs past the queue size instead of waiting."""
+        release = threading.Event()
+        jobs = self._queue(job_queue_size=1)
+        jobs.submit("blocker", release.wait)
+        # the worker may not have picked up the blocker yet, so fill until a drop
+        results = [jobs.submit("noop", lambda: None) for _ in range(3)]
+        release.set()
+        jobs.close()
+
+        assert False in results
+        assert jobs.stats()["dropped"] >= 1
+
+    def test_close_drains_pending_jobs(self):
+        """Test close runs what is already queued and rejects new jobs."""
+        done = []
+        jobs = self._queue()
+        for i in range(20):
+            jobs.submit("append", done.append, i)
+        jobs.close()
+
+        assert done == list(range(20))
+        assert jobs.submit("late", done.append, 20) is False
@@ -3,9 +3,23 @@
 from tokenize import group
 from wsgiref import headers
 from testing.conftest import test_client
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
+from starlette.websockets import WebSocketDisconnect
 
+from src.domain.workspaces.entity.create_task import MAX_TASK_BATCH
+from src.domain.workspaces.usecase.task_counters import TaskCounterUsecase
+from src.domain.workspaces.usecase.task_query import TaskQueryUsecase
+from src.infrastructure.background.outboxDispatcher import OutboxDispatcher
+from src.infrastructure.database.notify import notify_board
+from src.infrastructure.database.position import key_between
 from utils import AuthHelper, WorkspaceHelper, TaskHelper, TestDataFactory
 
 
@@ -60,6 +74,41 @@ class TestWorkspacesCRUD:
         assert "Workspace 1" in workspace_names
         assert "Workspace 2" in workspace_names
     
+    def test_get_workspaces_recent_cursor(self, test_client: TestClient, test_user):
+        """Test paging workspaces by recency with an opaque cursor and a total."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        for name in ["Workspace 1", "Workspace 2", "Workspace 3"]:
+            WorkspaceHelper.create_workspace(test_client, session, TestDataFactory.create_workspace_data(name))
+
+        first = test_client.get(
+            "/api/v1/workspaces/?sort=recent&limit=2&withTotal=true", headers=headers
+        ).json()
+        second = test_client.get(
+            f"/api/v1/workspaces/?sort=recent&limit=2&cursor={first['nextCursor']}",
+            headers=headers,
+        ).json()
+
+        assert first["total"] == 3
+        assert [w["name"] for w in first["workspaces"]] == ["Workspace 3", "Workspace 2"]
+        assert [w["name"] for w in second["workspaces"]] == ["Workspace 1"]
+        assert second["nextCursor"] is None
+
+    def test_get_workspaces_typeahead(self, test_client: TestClient, test_user):
+        """Test q returns the workspaces whose name is like it, closest first."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        for name in ["Marketing Launch", "Engineering Roadmap", "Market Research"]:
+            WorkspaceHelper.create_workspace(test_client, session, TestDataFactory.create_workspace_data(name))
+
+        response = test_client.get("/api/v1/workspaces/?q=market", headers=headers)
+
+        assert response.status_code == 200
+        assert [w["name"] for w in response.json()["workspaces"]] == [
+            "Market Research",
+            "Marketing Launch",
+        ]
+
     def test_get_workspaces_without_auth(self, test_client: TestClient):
         """Test get workspaces without authentication."""
         response = test_client.get("/api/v1/workspaces/")
@@ -362,4 +411,1420 @@ class TestWorkspacePermissions:
         # Should be able to access workspace from same tenant
         assert response.status_code == 200
         retrieved_workspace = response.json()
-        assert retrieved_workspace["workspaceId"] == workspace["workspaceId"]
\ No newline at end of file
+        assert retrieved_workspace["workspaceId"] == workspace["workspaceId"]
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestSparseFieldsets:
+    """Test fields= pruning on board and task endpoints."""
+
+    def test_board_with_fields(self, test_client: TestClient, test_user):
+        """Test board only returns the requested task fields."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        resp = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = resp.json()["groups"][0]["groupId"]
+        TaskHelper.create_task(test_client, session, workspace["workspaceId"], group_id)
+
+        response = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}?fields=title,assignedTo,dueDate",
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        task = response.json()["groups"][0]["tasks"][0]
+        assert set(task.keys()) == {"taskId", "title", "assignedTo", "dueDate"}
+
+    def test_get_task_with_fields(self, test_client: TestClient, test_user):
+        """Test get task only returns the requested fields."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        resp = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = resp.json()["groups"][0]["groupId"]
+        task = TaskHelper.create_task(test_client, session, workspace["workspaceId"], group_id)
+
+        response = test_client.get(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks/{task['taskId']}?fields=title",
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"taskId": task["taskId"], "title": task["title"]}
+
+    def test_unknown_field(self, test_client: TestClient, test_user):
+        """Test unknown fields are rejected."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}?fields=hashedPassword",
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestGroupTaskPagination:
+    """Test per-group keyset pagination of tasks."""
+
+    def test_board_limit_per_group(self, test_client: TestClient, test_user):
+        """Test board returns at most limit tasks per group with a cursor."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        resp = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = resp.json()["groups"][0]["groupId"]
+        for i in range(3):
+            TaskHelper.create_task(
+                test_client, session, workspace["workspaceId"], group_id,
+                TestDataFactory.create_task_data(f"Task {i}"),
+            )
+
+        response = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}?limit=2", headers=headers
+        )
+
+        assert response.status_code == 200
+        groups = response.json()["groups"]
+        assert len(groups) == 4
+        assert [t["title"] for t in groups[0]["tasks"]] == ["Task 0", "Task 1"]
+        assert groups[0]["nextCursor"] is not None
+        assert groups[1]["tasks"] == []
+        assert groups[1]["nextCursor"] is None
+
+    def test_list_group_tasks_after_cursor(self, test_client: TestClient, test_user):
+        """Test infinite scroll continues from the cursor."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        resp = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = resp.json()["groups"][0]["groupId"]
+        for i in range(3):
+            TaskHelper.create_task(
+                test_client, session, workspace["workspaceId"], group_id,
+                TestDataFactory.create_task_data(f"Task {i}"),
+            )
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+
+        first = test_client.get(f"{url}?limit=2", headers=headers).json()
+        second = test_client.get(
+            f"{url}?limit=2&cursor={first['nextCursor']}", headers=headers
+        ).json()
+
+        assert [t["title"] for t in second["tasks"]] == ["Task 2"]
+        assert second["nextCursor"] is None
+
+    def test_cursor_survives_its_task_moving(self, test_client: TestClient, test_user):
+        """Test the next page follows on after the last task seen was moved or deleted."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        groups = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers
+        ).json()["groups"]
+        group_id, other_id = groups[0]["groupId"], groups[1]["groupId"]
+        task_ids = [
+            t["taskId"]
+            for t in test_client.post(
+                f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks/batch",
+                json={"tasks": [{"title": f"Task {i}"} for i in range(5)]},
+                headers=headers,
+            ).json()["tasks"]
+        ]
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+
+        first = test_client.get(f"{url}?limit=2", headers=headers).json()
+        test_client.put(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks/{task_ids[1]}/position",
+            json={"toGroupId": other_id},
+            headers=headers,
+        )
+        second = test_client.get(f"{url}?limit=2&cursor={first['nextCursor']}", headers=headers).json()
+        test_client.delete(f"{url}/{task_ids[3]}", headers=headers)
+        third = test_client.get(f"{url}?limit=2&cursor={second['nextCursor']}", headers=headers).json()
+        forged = test_client.get(f"{url}?cursor={task_ids[0]}", headers=headers)
+
+        assert [t["title"] for t in second["tasks"]] == ["Task 2", "Task 3"]
+        assert [t["title"] for t in third["tasks"]] == ["Task 4"]
+        assert third["nextCursor"] is None
+        assert forged.status_code == 400
+
+    def test_list_group_tasks_invalid_group(self, test_client: TestClient, test_user):
+        """Test listing tasks of a group outside the workspace."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/groups/99999/tasks",
+            headers=headers,
+        )
+
+        assert response.status_code == 404
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestTaskBatch:
+    """Test bulk task creation."""
+
+    def test_create_tasks_batch(self, test_client: TestClient, test_user):
+        """Test a batch is inserted in order and returned in one response."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, group_id, headers = board.workspace, board.group_ids[0], board.headers
+        tasks = [
+            {"title": "Unassigned", "description": "first"},
+            {"title": "Assigned", "assignedToUserId": test_user.account_id},
+        ]
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks/batch",
+            json={"tasks": tasks},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        created = response.json()["tasks"]
+        assert [t["title"] for t in created] == ["Unassigned", "Assigned"]
+        assert created[0]["taskId"] < created[1]["taskId"]
+        assert created[0]["description"] == "first"
+        assert created[0]["assignedTo"] is None
+        assert created[1]["assignedTo"] == "Test User"
+        assert created[1]["createdBy"] == test_user.account_id
+
+        board = test_client.get(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks",
+            headers=headers,
+        ).json()
+        assert [t["taskId"] for t in board["tasks"]] == [t["taskId"] for t in created]
+
+    def test_create_tasks_batch_invalid_group(self, test_client: TestClient, test_user):
+        """Test a batch into a group outside the workspace is rejected whole."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, headers = board.workspace, board.headers
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/groups/99999/tasks/batch",
+            json={"tasks": [{"title": "Lost"}]},
+            headers=headers,
+        )
+
+        assert response.status_code == 404
+
+    def test_create_tasks_batch_size_limits(self, test_client: TestClient, test_user):
+        """Test empty and oversized batches are rejected."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, group_id, headers = board.workspace, board.group_ids[0], board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks/batch"
+
+        empty = test_client.post(url, json={"tasks": []}, headers=headers)
+        oversized = test_client.post(
+            url,
+            json={"tasks": [{"title": f"Task {i}"} for i in range(MAX_TASK_BATCH + 1)]},
+            headers=headers,
+        )
+
+        assert empty.status_code == 400
+        assert oversized.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestBulkTasks:
+    """Test bulk move and bulk delete of tasks."""
+
+    def _group_task_ids(self, test_client, workspace_id, group_id, headers):
+        return [
+            t["taskId"]
+            for t in test_client.get(
+                f"/api/v1/workspaces/{workspace_id}/groups/{group_id}/tasks", headers=headers
+            ).json()["tasks"]
+        ]
+
+    def test_move_selected_tasks(self, test_client: TestClient, test_user):
+        """Test moving a selection returns and moves exactly those tasks."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, task_ids, headers = board.workspace_id, board.group_ids, board.task_ids, board.headers
+
+        response = test_client.patch(
+            f"/api/v1/workspaces/{workspace_id}/tasks:move",
+            json={"taskIds": task_ids[:2], "toGroupId": group_ids[1]},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["taskIds"] == task_ids[:2]
+        assert self._group_task_ids(test_client, workspace_id, group_ids[1], headers) == task_ids[:2]
+        assert self._group_task_ids(test_client, workspace_id, group_ids[0], headers) == task_ids[2:]
+
+    def test_move_whole_group(self, test_client: TestClient, test_user):
+        """Test moving every task of a source group."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, task_ids, headers = board.workspace_id, board.group_ids, board.task_ids, board.headers
+
+        response = test_client.patch(
+            f"/api/v1/workspaces/{workspace_id}/tasks:move",
+            json={"fromGroupId": group_ids[0], "toGroupId": group_ids[3]},
+            headers=headers,
+        )
+
+        assert response.json()["taskIds"] == task_ids
+        assert self._group_task_ids(test_client, workspace_id, group_ids[0], headers) == []
+
+    def test_move_to_group_outside_workspace(self, test_client: TestClient, test_user):
+        """Test the target group must belong to the workspace."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, task_ids, headers = board.workspace_id, board.task_ids, board.headers
+
+        response = test_client.patch(
+            f"/api/v1/workspaces/{workspace_id}/tasks:move",
+            json={"taskIds": task_ids, "toGroupId": 99999},
+            headers=headers,
+        )
+
+        assert response.status_code == 404
+
+    def test_move_from_group_outside_workspace(self, test_client: TestClient, test_user):
+        """Test the source group must belong to the workspace."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, headers = board.workspace_id, board.group_ids, board.headers
+
+        response = test_client.patch(
+            f"/api/v1/workspaces/{workspace_id}/tasks:move",
+            json={"fromGroupId": 99999, "toGroupId": group_ids[1]},
+            headers=headers,
+        )
+
+        assert response.status_code == 404
+
+    def test_move_requires_one_selection(self, test_client: TestClient, test_user):
+        """Test passing both or neither of taskIds and fromGroupId is rejected."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, task_ids, headers = board.workspace_id, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace_id}/tasks:move"
+
+        both = test_client.patch(
+            url,
+            json={"taskIds": task_ids, "fromGroupId": group_ids[0], "toGroupId": group_ids[1]},
+            headers=headers,
+        )
+        neither = test_client.patch(url, json={"toGroupId": group_ids[1]}, headers=headers)
+
+        assert both.status_code == 400
+        assert neither.status_code == 400
+
+    def test_delete_selected_tasks(self, test_client: TestClient, test_user):
+        """Test bulk delete returns the deleted ids and skips unknown ones."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, task_ids, headers = board.workspace_id, board.group_ids, board.task_ids, board.headers
+
+        response = test_client.request(
+            "DELETE",
+            f"/api/v1/workspaces/{workspace_id}/tasks",
+            json={"taskIds": [task_ids[0], 99999]},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["taskIds"] == [task_ids[0]]
+        assert self._group_task_ids(test_client, workspace_id, group_ids[0], headers) == task_ids[1:]
+
+    def test_clear_group(self, test_client: TestClient, test_user):
+        """Test clearing a column deletes every task of the group."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace_id, group_ids, task_ids, headers = board.workspace_id, board.group_ids, board.task_ids, board.headers
+
+        response = test_client.request(
+            "DELETE",
+            f"/api/v1/workspaces/{workspace_id}/tasks",
+            json={"groupId": group_ids[0]},
+            headers=headers,
+        )
+
+        assert response.json()["taskIds"] == task_ids
+        assert self._group_task_ids(test_client, workspace_id, group_ids[0], headers) == []
+
+    def test_bulk_delete_other_tenant_workspace(self, test_client: TestClient, test_user):
+        """Test a workspace outside the tenant is not found."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.request(
+            "DELETE", "/api/v1/workspaces/99999/tasks", json={"taskIds": [1]}, headers=headers
+        )
+
+        assert response.status_code == 404
+
+
+@pytest.mark.unit
+@pytest.mark.workspace
+class TestBatchRequests:
+    """Test the batch multiplexing endpoint."""
+
+    def test_page_load_reads_in_one_batch(self, test_client: TestClient, test_user):
+        """Test the page load reads come back per item with their own status."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+
+        response = test_client.post(
+            "/api/v1/batch",
+            json={
+                "requests": [
+                    {"id": "me", "path": "/identity/me"},
+                    {"id": "users", "path": "/identity/users?limit=5"},
+                    {"id": "workspaces", "path": "/workspaces/"},
+                    {"id": "board", "path": f"/workspaces/by-name/{workspace['name']}"},
+                    {"id": "missing", "path": "/workspaces/by-name/nope"},
+                ]
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        items = {item["id"]: item for item in response.json()["responses"]}
+        assert items["me"]["status"] == 200
+        assert items["me"]["body"]["username"] == "testuser"
+        assert items["users"]["body"]["users"][0]["username"] == "testuser"
+        assert items["workspaces"]["body"]["workspaces"][0]["name"] == workspace["name"]
+        assert len(items["board"]["body"]["groups"]) == 4
+        assert items["missing"]["status"] == 404
+
+    def test_atomic_batch_rolls_back_on_failure(self, test_client: TestClient, test_user):
+        """Test an atomic batch keeps none of its writes when one fails."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        board = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = board.json()["groups"][0]["groupId"]
+        tasks_path = f"/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+
+        response = test_client.post(
+            "/api/v1/batch",
+            json={
+                "atomic": True,
+                "requests": [
+                    {"method": "POST", "path": tasks_path, "body": {"title": "Kept?"}},
+                    {"method": "POST", "path": f"/workspaces/{workspace['workspaceId']}/groups/99999/tasks", "body": {"title": "Lost"}},
+                    {"method": "POST", "path": tasks_path, "body": {"title": "Skipped"}},
+                ],
+            },
+            headers=headers,
+        )
+
+        assert [item["status"] for item in response.json()["responses"]] == [200, 404, 424]
+        tasks = test_client.get(f"/api/v1{tasks_path}", headers=headers).json()["tasks"]
+        assert tasks == []
+
+    def test_non_atomic_batch_keeps_successful_writes(self, test_client: TestClient, test_user):
+        """Test a plain batch commits each write on its own."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        workspace = WorkspaceHelper.create_workspace(test_client, session)
+        board = test_client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        group_id = board.json()["groups"][0]["groupId"]
+        tasks_path = f"/workspaces/{workspace['workspaceId']}/groups/{group_id}/tasks"
+
+        response = test_client.post(
+            "/api/v1/batch",
+            json={
+                "requests": [
+                    {"method": "POST", "path": tasks_path, "body": {"title": "Kept"}},
+                    {"method": "POST", "path": f"/workspaces/{workspace['workspaceId']}/groups/99999/tasks", "body": {"title": "Lost"}},
+                    {"path": tasks_path},
+                ],
+            },
+            headers=headers,
+        )
+
+        statuses = [item["status"] for item in response.json()["responses"]]
+        assert statuses == [200, 404, 200]
+        assert [t["title"] for t in response.json()["responses"][2]["body"]["tasks"]] == ["Kept"]
+
+    def test_batch_requires_auth(self, test_client: TestClient):
+        """Test the batch itself is authenticated."""
+        response = test_client.post(
+            "/api/v1/batch", json={"requests": [{"path": "/identity/me"}]}
+        )
+
+        assert response.status_code == 401
+
+    def test_batch_rejects_nested_batch(self, test_client: TestClient, test_user):
+        """Test a batch cannot contain another batch."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.post(
+            "/api/v1/batch",
+            json={"requests": [{"method": "POST", "path": "/batch", "body": {}}]},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_batch_rejects_streams_and_long_polls(self, test_client: TestClient, test_user):
+        """Test sub-requests that would never finish are turned away up front."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        statuses = [
+            test_client.post(
+                "/api/v1/batch", json={"requests": [request]}, headers=headers
+            ).status_code
+            for request in [
+                {"path": "/workspaces/1/events"},
+                {"path": "/changes?wait=30"},
+                {"method": "POST", "path": "/workspaces/1/tasks:import", "body": {}},
+                {"path": "/changes"},
+            ]
+        ]
+
+        assert statuses == [400, 400, 400, 200]
+
+    def test_batch_item_timeout(
+        self, test_client: TestClient, test_user, test_container, test_engine
+    ):
+        """Test a sub-request past the item timeout gets a 504 and stops a shared batch."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        config = test_container.config
+        batch = {"requests": [{"path": "/workspaces/"}, {"path": "/identity/me"}]}
+        test_container.config = config.model_copy(update={"batch_item_timeout_seconds": 0.2})
+        # the first sub-request blocks mid-query until the lock goes, past its timeout
+        with test_engine.connect() as connection:
+            connection.execute(text("LOCK TABLE workspace IN ACCESS EXCLUSIVE MODE"))
+            release = threading.Timer(0.5, connection.rollback)
+            release.start()
+            try:
+                response = test_client.post("/api/v1/batch", json=batch, headers=headers)
+            finally:
+                release.join()
+                test_container.config = config
+
+        assert response.status_code == 200
+        assert [item["status"] for item in response.json()["responses"]] == [504, 424]
+        # its session was closed only once the handler was done, the pool is sound
+        for _ in range(3):
+            response = test_client.post("/api/v1/batch", json=batch, headers=headers)
+            assert [item["status"] for item in response.json()["responses"]] == [200, 200]
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestTaskPositions:
+    """Test fractional-index ordering of tasks within a group."""
+
+    def _board_task_ids(self, test_client, workspace, headers):
+        groups = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers
+        ).json()["groups"]
+        return [[t["taskId"] for t in group["tasks"]] for group in groups]
+
+    def test_key_between_keeps_order(self):
+        """Test keys placed at random spots always sort between their neighbours."""
+        keys: list[str] = []
+        rng = random.Random(7)
+        for _ in range(2000):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index else None
+            after = keys[index] if index < len(keys) else None
+            keys.insert(index, key_between(before, after))
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_move_between_neighbours(self, test_client: TestClient, test_user):
+        """Test a task dropped between two others shows up there on the board."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace, task_ids, headers = board.workspace, board.task_ids, board.headers
+
+        response = test_client.put(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks/{task_ids[2]}/position",
+            json={"afterTaskId": task_ids[0], "beforeTaskId": task_ids[1]},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert self._board_task_ids(test_client, workspace, headers)[0] == [
+            task_ids[0], task_ids[2], task_ids[1]
+        ]
+
+    def test_move_with_one_neighbour(self, test_client: TestClient, test_user):
+        """Test the missing neighbour is looked up, to the top and into another group."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/tasks"
+
+        test_client.put(
+            f"{url}/{task_ids[2]}/position", json={"beforeTaskId": task_ids[0]}, headers=headers
+        )
+        test_client.put(
+            f"{url}/{task_ids[1]}/position", json={"toGroupId": group_ids[1]}, headers=headers
+        )
+        response = test_client.put(
+            f"{url}/{task_ids[0]}/position",
+            json={"toGroupId": group_ids[1], "afterTaskId": task_ids[1]},
+            headers=headers,
+        )
+
+        assert response.json()["groupId"] == group_ids[1]
+        board = self._board_task_ids(test_client, workspace, headers)
+        assert board[0] == [task_ids[2]]
+        assert board[1] == [task_ids[1], task_ids[0]]
+
+    def test_move_rejects_bad_neighbours(self, test_client: TestClient, test_user):
+        """Test neighbours must be other tasks of the target group, in order."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/tasks/{task_ids[0]}/position"
+
+        itself = test_client.put(url, json={"afterTaskId": task_ids[0]}, headers=headers)
+        elsewhere = test_client.put(
+            url, json={"toGroupId": group_ids[1], "afterTaskId": task_ids[1]}, headers=headers
+        )
+        reversed_ = test_client.put(
+            url, json={"afterTaskId": task_ids[2], "beforeTaskId": task_ids[1]}, headers=headers
+        )
+        unknown = test_client.put(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks/99999/position",
+            json={},
+            headers=headers,
+        )
+
+        assert itself.status_code == 400
+        assert elsewhere.status_code == 400
+        assert reversed_.status_code == 400
+        assert unknown.status_code == 404
+
+    def test_bulk_move_appends_after_target_tasks(self, test_client: TestClient, test_user):
+        """Test bulk moved tasks land after the target group's tasks, in their order."""
+        board = WorkspaceHelper.create_board(test_client, tasks=4)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/tasks"
+        test_client.put(
+            f"{url}/{task_ids[3]}/position", json={"toGroupId": group_ids[1]}, headers=headers
+        )
+
+        test_client.patch(
+            f"{url}:move",
+            json={"fromGroupId": group_ids[0], "toGroupId": group_ids[1]},
+            headers=headers,
+        )
+
+        assert self._board_task_ids(test_client, workspace, headers)[1] == [
+            task_ids[3], task_ids[0], task_ids[1], task_ids[2]
+        ]
+
+    def test_rebalance_shortens_keys_in_order(self, test_client: TestClient, test_user, test_container):
+        """Test rebalancing rewrites long keys evenly spaced without reordering."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        test_client.put(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks/{task_ids[2]}/position",
+            json={"beforeTaskId": task_ids[0]},
+            headers=headers,
+        )
+        with test_container.repository.session() as session:
+            session.execute(
+                text("UPDATE task SET position = position || repeat('V', 40) WHERE group_id = :g"),
+                {"g": group_ids[0]},
+            )
+
+        test_container.workspace_usecase.rebalance_positions(group_ids[0])
+
+        with test_container.repository.session() as session:
+            positions = session.execute(
+                text("SELECT position FROM task WHERE group_id = :g ORDER BY position"),
+                {"g": group_ids[0]},
+            ).scalars().all()
+        assert positions == ["d0000", "d0001", "d0002"]
+        assert self._board_task_ids(test_client, workspace, headers)[0] == [
+            task_ids[2], task_ids[0], task_ids[1]
+        ]
+
+    def test_concurrent_moves_needing_a_rebalance(
+        self, test_client: TestClient, test_user, test_engine
+    ):
+        """Test two moves that both rebalance the group take turns instead of deadlocking."""
+        board = WorkspaceHelper.create_board(test_client, tasks=6)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/tasks"
+        # two pairs of neighbours sharing a key, as concurrent moves leave them
+        with test_engine.begin() as connection:
+            for task_id, position in zip(task_ids, ["a0", "a0", "a1", "a1", "a2", "a3"]):
+                connection.execute(
+                    text("UPDATE task SET position = :p WHERE task_id = :t"),
+                    {"p": position, "t": task_id},
+                )
+        moves = [
+            (task_ids[4], {"afterTaskId": task_ids[0], "beforeTaskId": task_ids[1]}),
+            (task_ids[5], {"afterTaskId": task_ids[2], "beforeTaskId": task_ids[3]}),
+        ]
+
+        # both moves take the shared lock and then need the group alone
+        with test_engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock_shared(:k, :g)"),
+                {"k": 0x706F73, "g": group_ids[0]},
+            )
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                responses = pool.map(
+                    lambda move: test_client.put(
+                        f"{url}/{move[0]}/position", json=move[1], headers=headers
+                    ),
+                    moves,
+                )
+                threading.Event().wait(0.5)
+                connection.rollback()
+                statuses = [response.status_code for response in responses]
+
+        assert statuses == [200, 200]
+        assert self._board_task_ids(test_client, workspace, headers)[0] == [
+            task_ids[0], task_ids[4], task_ids[1], task_ids[2], task_ids[5], task_ids[3]
+        ]
+
+    def test_append_waits_for_a_rebalance(self, test_client: TestClient, test_user, test_engine):
+        """Test a task created while its group is rebalanced lands after the new keys."""
+        board = WorkspaceHelper.create_board(test_client, tasks=3)
+        workspace, group_ids, task_ids, headers = board.workspace, board.group_ids, board.task_ids, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_ids[0]}/tasks"
+
+        # a rebalance holding the group rewrites the keys before it commits
+        with test_engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:k, :g)"),
+                {"k": 0x706F73, "g": group_ids[0]},
+            )
+            connection.execute(
+                text("UPDATE task SET position = 'd000' || right(position, 1) WHERE group_id = :g"),
+                {"g": group_ids[0]},
+            )
+            release = threading.Timer(0.3, connection.commit)
+            release.start()
+            created = test_client.post(
+                url, json=TestDataFactory.create_task_data("Last"), headers=headers
+            ).json()
+            release.join()
+
+        assert self._board_task_ids(test_client, workspace, headers)[0] == [
+            *task_ids, created["taskId"]
+        ]
+
+
+@pytest.mark.unit
+@pytest.mark.workspace
+class TestWorkspaceClone:
+    """Test server-side cloning of a workspace."""
+
+    def _template(self, test_client: TestClient):
+        board = WorkspaceHelper.create_board(test_client)
+        for group_id, titles in ((board.group_ids[0], ["Plan", "Design"]), (board.group_ids[2], ["Review"])):
+            test_client.post(
+                f"{board.url}/groups/{group_id}/tasks/batch",
+                json={"tasks": [{"title": title} for title in titles]},
+                headers=board.headers,
+            )
+        return board.workspace, board.headers
+
+    def _board(self, test_client, name, headers):
+        return test_client.get(f"/api/v1/workspaces/by-name/{name}", headers=headers).json()
+
+    def test_clone_copies_groups_and_tasks(self, test_client: TestClient, test_user):
+        """Test the clone has the same groups and tasks in order, under new ids."""
+        workspace, headers = self._template(test_client)
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/clone",
+            json={"name": "Sprint 2"},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == "Sprint 2"
+        assert data["groupCount"] == 4
+        assert data["taskCount"] == 3
+        source = self._board(test_client, workspace["name"], headers)
+        clone = self._board(test_client, "Sprint 2", headers)
+        assert clone["workspaceId"] == data["workspaceId"] != source["workspaceId"]
+        assert [g["name"] for g in clone["groups"]] == [g["name"] for g in source["groups"]]
+        assert [[t["title"] for t in g["tasks"]] for g in clone["groups"]] == [
+            ["Plan", "Design"], [], ["Review"], []
+        ]
+        source_ids = {t["taskId"] for g in source["groups"] for t in g["tasks"]}
+        assert not source_ids & {t["taskId"] for g in clone["groups"] for t in g["tasks"]}
+
+    def test_clone_groups_only(self, test_client: TestClient, test_user):
+        """Test includeTasks false copies an empty board."""
+        workspace, headers = self._template(test_client)
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/clone",
+            json={"name": "Empty board", "includeTasks": False},
+            headers=headers,
+        )
+
+        assert response.json()["groupCount"] == 4
+        assert response.json()["taskCount"] == 0
+        clone = self._board(test_client, "Empty board", headers)
+        assert all(group["tasks"] == [] for group in clone["groups"])
+
+    def test_clone_rejects_taken_name_and_unknown_source(self, test_client: TestClient, test_user):
+        """Test the new name must be free and the source must be the caller's."""
+        workspace, headers = self._template(test_client)
+
+        taken = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/clone",
+            json={"name": workspace["name"]},
+            headers=headers,
+        )
+        unknown = test_client.post(
+            "/api/v1/workspaces/99999/clone", json={"name": "Nope"}, headers=headers
+        )
+
+        assert taken.status_code == 400
+        assert unknown.status_code == 404
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestTaskImport:
+    """Test streaming CSV and NDJSON task imports."""
+
+    def _board(self, test_client, workspace, headers):
+        groups = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers
+        ).json()["groups"]
+        return {group["name"]: group["tasks"] for group in groups}
+
+    def test_import_csv_in_chunks(self, test_client: TestClient, test_user):
+        """Test a streamed CSV lands in its groups by name, in file order."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, headers = board.workspace, board.headers
+        TaskHelper.create_task(
+            test_client,
+            board.session,
+            board.workspace_id,
+            board.group_ids[0],
+            TestDataFactory.create_task_data("Existing"),
+        )
+        lines = ["group,title,dueDate,assignee\n"] + [
+            f"To Do,Imported {i},2030-01-0{i % 9 + 1},testuser\n" for i in range(5)
+        ] + ['Done,"Shipped, finally",,\n']
+
+        def body():
+            # one chunk per line, like a slow upload
+            for line in lines:
+                yield line.encode()
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks:import",
+            content=body(),
+            headers={**headers, "Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 6
+        board = self._board(test_client, workspace, headers)
+        assert [t["title"] for t in board["To Do"]] == ["Existing"] + [
+            f"Imported {i}" for i in range(5)
+        ]
+        assert board["To Do"][1]["assignedTo"] is not None
+        assert [t["title"] for t in board["Done"]] == ["Shipped, finally"]
+
+    def test_import_ndjson(self, test_client: TestClient, test_user):
+        """Test NDJSON rows are imported, the format taken from the content type."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, headers = board.workspace, board.headers
+        body = "\n".join(
+            [
+                '{"group": "In Review", "title": "Review A", "description": "first"}',
+                "",
+                '{"group": "In Review", "title": "Review B"}',
+            ]
+        )
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks:import",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert [t["title"] for t in self._board(test_client, workspace, headers)["In Review"]] == [
+            "Review A", "Review B"
+        ]
+
+    def test_import_rejects_invalid_rows(self, test_client: TestClient, test_user):
+        """Test every invalid row is reported with its line and nothing is imported."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, headers = board.workspace, board.headers
+        body = (
+            "group,title,dueDate,assignee\n"
+            "To Do,Fine,,\n"
+            "Backlog,Unknown group,,\n"
+            "To Do,,,\n"
+            "To Do,Bad date,not-a-date,\n"
+            "To Do,Nobody,,no-such-user\n"
+        )
+
+        response = test_client.post(
+            f"/api/v1/workspaces/{workspace['workspaceId']}/tasks:import?format=csv",
+            content=body,
+            headers=headers,
+        )
+
+        assert response.status_code == 422
+        assert response.json()["errorCount"] == 4
+        assert [error["line"] for error in response.json()["errors"]] == [3, 4, 5, 6]
+        assert self._board(test_client, workspace, headers)["To Do"] == []
+
+    def test_import_rejects_malformed_upload(self, test_client: TestClient, test_user):
+        """Test a bad header or bad JSON fails the whole upload."""
+        board = WorkspaceHelper.create_board(test_client)
+        workspace, headers = board.workspace, board.headers
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}/tasks:import"
+
+        header = test_client.post(url, content="name,title\nx,y\n", headers=headers)
+        json_line = test_client.post(
+            f"{url}?format=ndjson", content='{"group": "To Do", "title": "ok"}\n{oops\n', headers=headers
+        )
+        empty = test_client.post(url, content="group,title\n", headers=headers)
+
+        assert header.status_code == 400
+        assert json_line.status_code == 400
+        assert "Line 2" in json_line.json()["detail"]
+        assert empty.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestIdempotencyKeys:
+    """Test POST and PATCH requests sent with an Idempotency-Key run once."""
+
+    def _titles(self, test_client: TestClient, url: str, headers):
+        return [task["title"] for task in test_client.get(url, headers=headers).json()["tasks"]]
+
+    def test_retry_replays_the_stored_response(self, test_client: TestClient, test_user):
+        """Test a retried create returns the first response without a second task."""
+        board = WorkspaceHelper.create_board(test_client)
+        url, headers = f"{board.url}/groups/{board.group_ids[0]}/tasks", board.headers
+        headers = {**headers, "Idempotency-Key": "create-1"}
+        task_data = TestDataFactory.create_task_data("Once")
+
+        first = test_client.post(url, json=task_data, headers=headers)
+        retry = test_client.post(url, json=task_data, headers=headers)
+
+        assert first.status_code == 200
+        assert retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert self._titles(test_client, url, headers) == ["Once"]
+
+    def test_same_key_from_another_user_runs_again(
+        self, test_client: TestClient, test_user, test_admin_user
+    ):
+        """Test two users of one tenant sending the same key each get their own task."""
+        board = WorkspaceHelper.create_board(test_client)
+        url, headers = f"{board.url}/groups/{board.group_ids[0]}/tasks", board.headers
+        admin = AuthHelper.login_user(test_client, "admin", "adminpassword")
+        admin_headers = AuthHelper.create_authenticated_headers(admin.access_token)
+        task_data = TestDataFactory.create_task_data("Mine")
+
+        first = test_client.post(
+            url, json=task_data, headers={**headers, "Idempotency-Key": "shared"}
+        )
+        other = test_client.post(
+            url, json=task_data, headers={**admin_headers, "Idempotency-Key": "shared"}
+        )
+
+        assert other.status_code == 200
+        assert "Idempotent-Replayed" not in other.headers
+        assert other.json()["taskId"] != first.json()["taskId"]
+        assert other.json()["createdBy"] == test_admin_user.account_id
+        assert self._titles(test_client, url, headers) == ["Mine", "Mine"]
+
+    def test_key_reused_for_another_request(self, test_client: TestClient, test_user):
+        """Test a key sent again with a different body is rejected."""
+        board = WorkspaceHelper.create_board(test_client)
+        url, headers = f"{board.url}/groups/{board.group_ids[0]}/tasks", board.headers
+        headers = {**headers, "Idempotency-Key": "create-2"}
+
+        test_client.post(url, json=TestDataFactory.create_task_data("A"), headers=headers)
+        response = test_client.post(
+            url, json=TestDataFactory.create_task_data("B"), headers=headers
+        )
+
+        assert response.status_code == 422
+        assert self._titles(test_client, url, headers) == ["A"]
+
+    def test_concurrent_duplicates_wait_for_the_first(self, test_client: TestClient, test_user):
+        """Test duplicates sent together all get the one task that was created."""
+        board = WorkspaceHelper.create_board(test_client)
+        url, headers = f"{board.url}/groups/{board.group_ids[0]}/tasks", board.headers
+        headers = {**headers, "Idempotency-Key": "create-3"}
+        task_data = TestDataFactory.create_task_data("Raced")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(
+                pool.map(lambda _: test_client.post(url, json=task_data, headers=headers), range(4))
+            )
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert len({response.json()["taskId"] for response in responses}) == 1
+        assert self._titles(test_client, url, headers) == ["Raced"]
+
+    def test_failed_request_releases_the_key(self, test_client: TestClient, test_user):
+        """Test a request failing with an error is not replayed, the retry runs again."""
+        board = WorkspaceHelper.create_board(test_client)
+        url, headers = f"{board.url}/groups/{board.group_ids[0]}/tasks", board.headers
+        headers = {**headers, "Idempotency-Key": "create-4"}
+        missing = url.rsplit("/groups/", 1)[0] + "/groups/999999/tasks"
+
+        first = test_client.post(missing, json=TestDataFactory.create_task_data(), headers=headers)
+        retry = test_client.post(missing, json=TestDataFactory.create_task_data(), headers=headers)
+
+        assert first.status_code == 404
+        assert retry.status_code == 404
+        assert "Idempotent-Replayed" not in retry.headers
+
+
+@pytest.mark.unit
+@pytest.mark.workspace
+class TestBoardEvents:
+    """Test board changes streamed as server-sent events."""
+
+    def test_mutation_is_streamed_and_replayed(self, test_client: TestClient, test_user, test_container):
+        """Test a created task reaches a subscriber, and a reconnect resumes after it."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+        events = test_container.board_events
+
+        async def scenario():
+            await asyncio.to_thread(events.start)
+            stream = events.stream(workspace_id, None)
+            assert (await anext(stream)).startswith("retry:")
+            task = await asyncio.to_thread(
+                TaskHelper.create_task, test_client, session, workspace_id, group_id
+            )
+            created = await asyncio.wait_for(anext(stream), 5)
+            await asyncio.to_thread(
+                TaskHelper.create_task, test_client, session, workspace_id, group_id
+            )
+            following = await asyncio.wait_for(anext(stream), 5)
+            await stream.aclose()
+
+            event_id = int(created.split("\n")[0].removeprefix("id: "))
+            resumed = events.stream(workspace_id, event_id)
+            await anext(resumed)
+            replayed = await asyncio.wait_for(anext(resumed), 5)
+            await resumed.aclose()
+            return task, created, following, replayed
+
+        task, created, following, replayed = asyncio.run(scenario())
+
+        assert "event: task.created" in created
+        assert f'"taskId" : {task["taskId"]}' in created
+        assert replayed == following
+        assert test_container.board_events.stats()["subscribers"] == 0
+
+    def test_replay_follows_delivery_order(self, test_client: TestClient, test_user, test_container):
+        """Test resuming after an event replays one with a lower id committed after it."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+        events = test_container.board_events
+        repository = test_container.repository
+
+        def commit_out_of_order():
+            with repository.session() as earlier:
+                notify_board(earlier, workspace_id, "task.updated", taskId=1)
+                with repository.shared_session() as later:
+                    notify_board(later, workspace_id, "task.updated", taskId=2)
+                    later.commit()
+
+        async def scenario():
+            await asyncio.to_thread(events.start)
+            stream = events.stream(workspace_id, None)
+            await anext(stream)
+            await asyncio.to_thread(commit_out_of_order)
+            delivered = [await asyncio.wait_for(anext(stream), 5) for _ in range(2)]
+            await stream.aclose()
+
+            first_id = int(delivered[0].split("\n")[0].removeprefix("id: "))
+            resumed = events.stream(workspace_id, first_id)
+            await anext(resumed)
+            replayed = await asyncio.wait_for(anext(resumed), 5)
+            await resumed.aclose()
+            return delivered, replayed
+
+        delivered, replayed = asyncio.run(scenario())
+
+        assert ['"taskId" : 2' in event for event in delivered] == [True, False]
+        assert replayed == delivered[1]
+
+    def test_events_of_other_tenant_workspace(self, test_client: TestClient, test_user):
+        """Test subscribing to a workspace outside the tenant is not found."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get("/api/v1/workspaces/999999/events", headers=headers)
+
+        assert response.status_code == 404
+
+
+class TestLiveHub:
+    """Test board events fanned out over the live websocket."""
+
+    def test_subscribed_socket_gets_mutations(self, test_client: TestClient, test_user, test_container):
+        """Test a subscribed socket receives a created task as an events frame."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+
+        with test_client.websocket_connect("/api/v1/live") as websocket:
+            websocket.send_json({"type": "auth", "token": session.access_token})
+            assert websocket.receive_json() == {"type": "ready"}
+            websocket.send_json({"type": "subscribe", "workspaceId": workspace_id})
+            assert websocket.receive_json() == {"type": "subscribed", "workspaceId": workspace_id}
+
+            task = TaskHelper.create_task(test_client, session, workspace_id, group_id)
+            frame = websocket.receive_json()
+
+            websocket.send_json({"type": "subscribe", "workspaceId": 999999})
+            error = websocket.receive_json()
+
+        assert frame["type"] == "events"
+        assert [(e["type"], e["taskId"]) for e in frame["events"]] == [
+            ("task.created", task["taskId"])
+        ]
+        assert error["type"] == "error" and error["workspaceId"] == 999999
+        assert test_container.live_hub.stats()["subscriptions"] == 0
+
+    def test_invalid_token_is_closed(self, test_client: TestClient):
+        """Test a socket authenticating with a bad token is closed as a policy violation."""
+        with test_client.websocket_connect("/api/v1/live") as websocket:
+            websocket.send_json({"type": "auth", "token": "not-a-token"})
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+
+        assert closed.value.code == 1008
+
+
+class TestOutbox:
+    """Test change events written to the outbox and delivered by the dispatcher."""
+
+    def test_mutations_are_dispatched_in_order(self, test_client: TestClient, test_user, test_container):
+        """Test a create, update and delete each leave one event, delivered once."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+        task = TaskHelper.create_task(test_client, session, workspace_id, group_id)
+        TaskHelper.update_task(
+            test_client, session, workspace_id, group_id, task["taskId"], {"title": "Renamed"}
+        )
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        test_client.delete(
+            f"/api/v1/workspaces/{workspace_id}/groups/{group_id}/tasks/{task['taskId']}",
+            headers=headers,
+        )
+        delivered = []
+        test_container.outbox.add_handler("test", lambda _, batch: delivered.extend(batch))
+
+        dispatched = test_container.outbox.dispatch()
+
+        assert dispatched == len(delivered)
+        assert [m.type for m in delivered] == [
+            "workspace.created",
+            "task.created",
+            "task.updated",
+            "task.deleted",
+        ]
+        assert [m.id for m in delivered] == sorted(m.id for m in delivered)
+        assert delivered[2].payload["title"] == "Renamed"
+        assert delivered[3].aggregate_id == task["taskId"]
+        assert test_container.outbox.dispatch() == 0
+        assert test_container.outbox.stats()["dispatched"] == dispatched
+
+    def test_failed_handler_keeps_the_batch(self, test_client: TestClient, test_user, test_container):
+        """Test a batch whose handler fails is delivered again, then pruned once delivered."""
+        WorkspaceHelper.create_board(test_client)
+        attempts = []
+
+        def flaky(_, batch):
+            attempts.append(len(batch))
+            if len(attempts) == 1:
+                raise RuntimeError("unreachable")
+
+        dispatcher = OutboxDispatcher(
+            test_container.config.model_copy(update={"outbox_retention_seconds": 0}),
+            test_container.repository,
+        )
+        dispatcher.add_handler("flaky", flaky)
+
+        with pytest.raises(RuntimeError):
+            dispatcher.dispatch()
+        dispatched = dispatcher.dispatch()
+
+        assert attempts == [1, 1]
+        assert dispatched == 1
+        assert dispatcher.prune() == 1
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestTaskSearch:
+    """Test full text search over the tenant's tasks."""
+
+    def _tasks(self, test_client: TestClient, *tasks):
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+        created = [
+            TaskHelper.create_task(
+                test_client, session, workspace_id, group_id,
+                TestDataFactory.create_task_data(title, description),
+            )
+            for title, description in tasks
+        ]
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        return headers, workspace_id, group_id, created
+
+    def test_title_match_ranks_first(self, test_client: TestClient, test_user):
+        """Test a word in the title outranks it in the description, and prefixes match."""
+        headers, workspace_id, group_id, (described, titled, other) = self._tasks(
+            test_client,
+            ("Fix the login page", "Broken on the checkout flow"),
+            ("Checkout timeout", "Payments hang"),
+            ("Unrelated", "Nothing to see"),
+        )
+
+        found = test_client.get("/api/v1/tasks/search?q=checkout", headers=headers).json()
+        prefix = test_client.get("/api/v1/tasks/search?q=CHECK", headers=headers).json()
+        both = test_client.get("/api/v1/tasks/search?q=check+pay", headers=headers).json()
+
+        assert [t["taskId"] for t in found["tasks"]] == [titled["taskId"], described["taskId"]]
+        assert found["tasks"][0]["workspaceId"] == workspace_id
+        assert found["tasks"][0]["groupId"] == group_id
+        assert found["nextCursor"] is None
+        assert [t["taskId"] for t in prefix["tasks"]] == [titled["taskId"], described["taskId"]]
+        assert [t["taskId"] for t in both["tasks"]] == [titled["taskId"]]
+
+    def test_filters_and_pagination(self, test_client: TestClient, test_user):
+        """Test filters narrow the search and the cursor walks every match once."""
+        headers, workspace_id, group_id, created = self._tasks(
+            test_client, *[(f"Roadmap item {i}", "quarterly roadmap") for i in range(5)]
+        )
+        url = "/api/v1/tasks/search?q=roadmap"
+
+        first = test_client.get(f"{url}&limit=3", headers=headers).json()
+        second = test_client.get(
+            f"{url}&limit=3&cursor={first['nextCursor']}", headers=headers
+        ).json()
+        in_workspace = test_client.get(f"{url}&workspaceId={workspace_id}", headers=headers).json()
+        other_group = test_client.get(f"{url}&groupId={group_id + 1}", headers=headers).json()
+        unassigned = test_client.get(f"{url}&assignee=me", headers=headers).json()
+
+        pages = [t["taskId"] for t in first["tasks"] + second["tasks"]]
+        assert sorted(pages) == sorted(t["taskId"] for t in created)
+        assert len(first["tasks"]) == 3 and second["nextCursor"] is None
+        assert len(in_workspace["tasks"]) == 5
+        assert other_group["tasks"] == []
+        assert unassigned["tasks"] == []
+
+    def test_pages_past_the_ranked_window(self, test_client: TestClient, test_user, test_container):
+        """Test matches older than the ranked candidates are still paged to, newest first."""
+        headers, _, _, created = self._tasks(
+            test_client, *[(f"Milestone {i}", "release milestone") for i in range(5)]
+        )
+        ids = [t["taskId"] for t in reversed(created)]
+        url = "/api/v1/tasks/search?q=milestone&limit=3"
+        usecase = test_container.task_query_usecase
+        test_container.task_query_usecase = TaskQueryUsecase(
+            test_container.repository, test_container.cursor, candidates=2
+        )
+        try:
+            first = test_client.get(url, headers=headers).json()
+            second = test_client.get(f"{url}&cursor={first['nextCursor']}", headers=headers).json()
+        finally:
+            test_container.task_query_usecase = usecase
+
+        assert [t["taskId"] for t in first["tasks"] + second["tasks"]] == ids
+        assert [t["ranked"] for t in first["tasks"]] == [True, True, False]
+        assert [t["ranked"] for t in second["tasks"]] == [False, False]
+        assert second["nextCursor"] is None
+
+    def test_query_without_words(self, test_client: TestClient, test_user):
+        """Test a query with nothing to search for is rejected."""
+        session = AuthHelper.login_user(test_client, "testuser", "testpassword")
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = test_client.get("/api/v1/tasks/search?q=%27%26!", headers=headers)
+
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.task
+class TestTaskFilter:
+    """Test listing the tenant's tasks across workspaces by due date."""
+
+    def test_my_tasks_by_due_date(self, test_client: TestClient, test_user, test_admin_user):
+        """Test tasks come soonest due first, undated last, across pages and filters."""
+        board = WorkspaceHelper.create_board(test_client)
+        session, workspace_id, group_id = board.session, board.workspace_id, board.group_ids[0]
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+        me = test_client.get("/api/v1/identity/me", headers=headers).json()["accountId"]
+        others = [
+            u["accountId"]
+            for u in test_client.get("/api/v1/identity/users", headers=headers).json()["users"]
+            if u["accountId"] != me
+        ]
+        tasks = {
+            title: TaskHelper.create_task(
+                test_client, session, workspace_id, group_id,
+                {"title": title, "dueDate": due, "assignedToUserId": assignee},
+            )["taskId"]
+            for title, due, assignee in [
+                ("Third", "2030-01-03T09:00:00Z", me),
+                ("First", "2030-01-01T09:00:00Z", me),
+                ("Someday", None, me),
+                ("Second", "2030-01-02T09:00:00Z", others[0]),
+            ]
+        }
+
+        first = test_client.get("/api/v1/tasks?limit=2", headers=headers).json()
+        second = test_client.get(
+            f"/api/v1/tasks?limit=2&cursor={first['nextCursor']}", headers=headers
+        ).json()
+        mine = test_client.get("/api/v1/tasks?assignee=me", headers=headers).json()
+        due = test_client.get(
+            f"/api/v1/tasks?workspaceId={workspace_id}"
+            "&dueAfter=2030-01-02T00:00:00Z&dueBefore=2030-01-03T00:00:00Z",
+            headers=headers,
+        ).json()
+
+        assert [t["title"] for t in first["tasks"]] == ["First", "Second"]
+        assert [t["title"] for t in second["tasks"]] == ["Third", "Someday"]
+        assert second["nextCursor"] is None
+        assert [t["title"] for t in mine["tasks"]] == ["First", "Third", "Someday"]
+        assert [t["taskId"] for t in due["tasks"]] == [tasks["Second"]]
+        assert due["tasks"][0]["workspaceId"] == workspace_id
+
+
+@pytest.mark.unit
+@pytest.mark.workspace
+class TestTaskCounters:
+    """Test the task counters kept on groups and workspaces."""
+
+    KEYS = ("taskCount", "assignedTaskCount", "overdueTaskCount")
+
+    def _board(self, test_client: TestClient, test_container):
+        board = WorkspaceHelper.create_board(test_client)
+        me = test_client.get("/api/v1/identity/me", headers=board.headers).json()["accountId"]
+        # a past due date only counts as overdue once the horizon passes it
+        with test_container.repository.session() as db:
+            db.execute(text("UPDATE tenant SET overdue_horizon = '2020-01-01'"))
+        task_ids = [
+            t["taskId"]
+            for t in test_client.post(
+                f"{board.url}/groups/{board.group_ids[0]}/tasks/batch",
+                json={
+                    "tasks": [
+                        {"title": "Late", "dueDate": "2021-01-01T09:00:00Z", "assignedToUserId": me},
+                        {"title": "Ancient", "dueDate": "2019-01-01T09:00:00Z"},
+                        {"title": "Someday", "assignedToUserId": me},
+                    ]
+                },
+                headers=board.headers,
+            ).json()["tasks"]
+        ]
+        return board.workspace, board.group_ids, task_ids, board.headers
+
+    def _counters(self, test_client, workspace, headers):
+        listed = next(
+            w
+            for w in test_client.get("/api/v1/workspaces/?sort=recent", headers=headers).json()["workspaces"]
+            if w["workspaceId"] == workspace["workspaceId"]
+        )
+        groups = test_client.get(
+            f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers
+        ).json()["groups"]
+        return (
+            tuple(listed[k] for k in self.KEYS),
+            [tuple(group[k] for k in self.KEYS) for group in groups],
+        )
+
+    def test_counters_follow_task_changes(self, test_client: TestClient, test_user, test_container):
+        """Test creates, moves, unassigns and deletes show in the list and board counters."""
+        workspace, group_ids, task_ids, headers = self._board(test_client, test_container)
+        url = f"/api/v1/workspaces/{workspace['workspaceId']}"
+        created = self._counters(test_client, workspace, headers)
+
+        test_client.put(
+            f"{url}/tasks/{task_ids[1]}/position", json={"toGroupId": group_ids[1]}, headers=headers
+        )
+        test_client.patch(
+            f"{url}/groups/{group_ids[0]}/tasks/{task_ids[2]}",
+            json={"assignedToUserId": None},
+            headers=headers,
+        )
+        moved = self._counters(test_client, workspace, headers)
+        test_client.delete(f"{url}/groups/{group_ids[0]}/tasks/{task_ids[0]}", headers=headers)
+        deleted = self._counters(test_client, workspace, headers)
+
+        assert created == ((3, 2, 1), [(3, 2, 1), (0, 0, 0), (0, 0, 0), (0, 0, 0)])
+        assert moved == ((3, 1, 1), [(2, 1, 0), (1, 0, 1), (0, 0, 0), (0, 0, 0)])
+        assert deleted == ((2, 0, 1), [(1, 0, 0), (1, 0, 1), (0, 0, 0), (0, 0, 0)])
+
+    def test_overdue_advances_and_drift_is_repaired(self, test_client: TestClient, test_user, test_container):
+        """Test tasks gone past due are counted, and reconcile recounts a corrupted counter."""
+        workspace, group_ids, task_ids, headers = self._board(test_client, test_container)
+        counters = test_container.task_counters
+
+        assert counters.advance_overdue() >= 1
+        advanced = self._counters(test_client, workspace, headers)
+        with test_container.repository.session() as db:
+            db.execute(
+                text('UPDATE "group" SET task_count = 40 WHERE group_id = :g'),
+                {"g": group_ids[2]},
+            )
+        repaired = counters.reconcile()
+
+        assert advanced == ((3, 2, 2), [(3, 2, 2), (0, 0, 0), (0, 0, 0), (0, 0, 0)])
+        assert repaired >= 1
+        assert self._counters(test_client, workspace, headers) == advanced
+        assert counters.reconcile() == 0
+        assert counters.stats()["countersRepaired"] >= 1
+
+    def test_jobs_run_on_one_worker(self, test_container):
+        """Test only the worker holding the jobs lock runs them, and another takes over when it exits."""
+        workers = [
+            TaskCounterUsecase(test_container.repository, overdue_interval_seconds=0.05)
+            for _ in range(2)
+        ]
+
+        def leaders():
+            return [w for w in workers if w.stats()["leading"]]
+
+        def wait_for_leader():
+            deadline = time.monotonic() + 5
+            while not leaders() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            return leaders()
+
+        for worker in workers:
+            worker.start()
+        try:
+            first = wait_for_leader()
+            time.sleep(0.2)
+            assert leaders() == first and len(first) == 1
+            first[0].close()
+            second = wait_for_leader()
+        finally:
+            for worker in workers:
+                worker.close()
+
+        assert len(second) == 1 and second[0] is not first[0]
@@ -15,6 +15,24 @@ class UserSession:
     refresh_token: str
 
 
+@dataclass
+class Board:
+    """A freshly created workspace with its default groups, as its owner sees it."""
+    session: UserSession
+    headers: Dict[str, str]
+    workspace: Dict[str, Any]
+    group_ids: List[int]
+    task_ids: List[int]
+
+    @property
+    def workspace_id(self) -> int:
+        return self.workspace["workspaceId"]
+
+    @property
+    def url(self) -> str:
+        return f"/api/v1/workspaces/{self.workspace_id}"
+
+
 class TestDataFactory:
     """Factory for creating test data."""
     
@@ -131,6 +149,37 @@ class WorkspaceHelper:
         
         return response.json()
     
+    @staticmethod
+    def create_board(
+        client: TestClient,
+        session: Optional[UserSession] = None,
+        workspace_data: Optional[Dict] = None,
+        tasks: int = 0,
+    ) -> Board:
+        """Create a workspace, with `tasks` tasks in its first group, and return its board."""
+        if session is None:
+            session = AuthHelper.login_user(client, "testuser", "testpassword")
+        workspace = WorkspaceHelper.create_workspace(client, session, workspace_data)
+        headers = AuthHelper.create_authenticated_headers(session.access_token)
+
+        response = client.get(f"/api/v1/workspaces/by-name/{workspace['name']}", headers=headers)
+        if response.status_code != 200:
+            raise Exception(f"Get board failed: {response.status_code} - {response.text}")
+        group_ids = [group["groupId"] for group in response.json()["groups"]]
+
+        task_ids = []
+        if tasks:
+            response = client.post(
+                f"/api/v1/workspaces/{workspace['workspaceId']}/groups/{group_ids[0]}/tasks/batch",
+                json={"tasks": [{"title": f"Task {i}"} for i in range(tasks)]},
+                headers=headers,
+            )
+            if response.status_code != 200:
+                raise Exception(f"Task batch failed: {response.status_code} - {response.text}")
+            task_ids = [task["taskId"] for task in response.json()["tasks"]]
+
+        return Board(session, headers, workspace, group_ids, task_ids)
+
     @staticmethod
     def get_workspaces(client: TestClient, session: UserSession) -> List[Dict[str, Any]]:
         """Get all workspaces for a user."""
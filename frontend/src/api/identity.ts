@@ -6,6 +6,7 @@ const identity = `${api}/identity`;
 const loginResponse = z.object({
   accessToken: z.string(),
   refreshToken: z.string(),
+  expiresIn: z.number(),
 });
 export async function login(username: string, password: string) {
   const response = await fetch(`${identity}/login`, {
@@ -24,6 +25,8 @@ export async function login(username: string, password: string) {
 
 const refreshResponse = z.object({
   accessToken: z.string(),
+  // jittered by the server so tabs and users do not refresh in lockstep
+  expiresIn: z.number(),
 });
 export async function refreshToken() {
   const response = await fetch(`${identity}/refresh`, {
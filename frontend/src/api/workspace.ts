@@ -273,3 +273,78 @@ export async function deleteTask(accessToken: string, payload: TaskIdentifier) {
     }
   );
 }
+
+const boardEventSchema = z.object({
+  id: z.number(),
+  workspaceId: z.number(),
+  type: z.string(),
+  groupId: z.number().nullish(),
+  taskId: z.number().nullish(),
+});
+
+export type BoardEvent = z.infer<typeof boardEventSchema>;
+
+// a fetch stream instead of EventSource, which cannot send the bearer token
+export function subscribeBoardEvents(
+  getAccessToken: () => string | null,
+  workspaceId: number,
+  onEvent: (event: BoardEvent | "reset") => void
+) {
+  const controller = new AbortController();
+  let lastEventId: string | null = null;
+  let retryMs = 3000;
+
+  const connect = async () => {
+    const accessToken = getAccessToken();
+    const headers: Record<string, string> = { Accept: "text/event-stream" };
+    if (accessToken) headers.Authorization = `Bearer ${accessToken}`;
+    if (lastEventId) headers["Last-Event-ID"] = lastEventId;
+
+    const response = await fetch(`${workspace}/${workspaceId}/events`, {
+      credentials: "include",
+      headers,
+      signal: controller.signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error("Failed to subscribe to board events", { cause: response });
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) return;
+      buffer += value;
+      let end: number;
+      while ((end = buffer.indexOf("\n\n")) >= 0) {
+        const message = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+        let type = "message";
+        let data = "";
+        for (const line of message.split("\n")) {
+          if (line.startsWith("id: ")) lastEventId = line.slice(4);
+          else if (line.startsWith("event: ")) type = line.slice(7);
+          else if (line.startsWith("data: ")) data = line.slice(6);
+          else if (line.startsWith("retry: ")) retryMs = Number(line.slice(7));
+        }
+        if (type === "reset") onEvent("reset");
+        else if (data) onEvent(boardEventSchema.parse(JSON.parse(data)));
+      }
+    }
+  };
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        await connect();
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error("Board events disconnected:", err);
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs));
+    }
+  };
+  run();
+
+  return () => controller.abort();
+}
@@ -12,6 +12,7 @@ export function Auth({ children }: AuthProviderProps) {
   const [accessToken, setAccessToken] = useState<string | null>(
     localStorage.getItem("accessToken")
   );
+  const [refreshAt, setRefreshAt] = useState<number | null>(null);
   let session: DecodedAccessToken | null = null;
   if (accessToken) {
     const [, payloadBase64] = accessToken.split(".");
@@ -37,6 +38,7 @@ export function Auth({ children }: AuthProviderProps) {
     const refreshToken = async () => {
       try {
         const res = await identity.refreshToken();
+        setRefreshAt(Date.now() + res.expiresIn * 1000);
         setAccessToken(res.accessToken);
       } catch (err) {
         console.error("Refresh failed:", err);
@@ -48,13 +50,13 @@ export function Auth({ children }: AuthProviderProps) {
 
     const expiresAt = session.exp ? session.exp * 1000 : 0;
     const now = Date.now();
-    const refreshTime = expiresAt - now - 5000;
+    const refreshTime = (refreshAt ?? expiresAt - 5000) - now;
 
     if (refreshTime > 0) {
       const id = setTimeout(() => refreshToken(), refreshTime);
       return () => clearTimeout(id);
     }
-  }, [session]);
+  }, [session, refreshAt]);
 
   return (
     <AuthContext
@@ -62,12 +62,40 @@ export default function Home() {
 
   const title = params.workspaceName || defaultWorkspaceName;
 
+  // read by the board event stream, which outlives token refreshes
+  const accessToken = useRef(session.accessToken);
+  useEffect(() => {
+    accessToken.current = session.accessToken;
+  }, [session.accessToken]);
+  const signedIn = session.accessToken !== null;
+  const [workspaceId, setWorkspaceId] = useState<number | null>(null);
+  const [boardVersion, setBoardVersion] = useState(0);
+
+  useEffect(() => {
+    if (workspaceId === null) return;
+    let pending: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = workspace.subscribeBoardEvents(
+      () => accessToken.current,
+      workspaceId,
+      () => {
+        // a burst of changes reloads the board once
+        clearTimeout(pending);
+        pending = setTimeout(() => setBoardVersion((v) => v + 1), 200);
+      }
+    );
+    return () => {
+      clearTimeout(pending);
+      unsubscribe();
+    };
+  }, [workspaceId]);
+
   useEffect(() => {
     const inittialLoad = () => {
-      if (!session?.accessToken) return;
+      if (!accessToken.current) return;
       workspace
-        .getWorkspaceByName(session.accessToken, title)
+        .getWorkspaceByName(accessToken.current, title)
         .then((res) => {
+          setWorkspaceId(res.workspaceId);
           setTaskGroups(
             res.groups.map<TaskGroup>((g) => ({
               state: "Idle",
@@ -114,10 +142,7 @@ export default function Home() {
     };
 
     inittialLoad();
-
-    const interval = setInterval(inittialLoad, 10000);
-    return () => clearInterval(interval);
-  }, [session.accessToken, title]);
+  }, [title, boardVersion, signedIn]);
 
   const handleLogout = async () => {
     await identity.logout();